@@ -1,20 +1,26 @@
 import json
 
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from typing import Dict, List, Union
 
-from numpy import array_equal
+import numpy as np
 from pandas import DataFrame, read_csv
 
 from DataSynthesizer.datatypes.AbstractAttribute import AbstractAttribute
-from DataSynthesizer.datatypes.DateTimeAttribute import is_datetime, DateTimeAttribute
+from DataSynthesizer.datatypes.DateTimeAttribute import infer_datetime_format, DateTimeAttribute
 from DataSynthesizer.datatypes.FloatAttribute import FloatAttribute
 from DataSynthesizer.datatypes.IntegerAttribute import IntegerAttribute
-from DataSynthesizer.datatypes.SocialSecurityNumberAttribute import is_ssn, SocialSecurityNumberAttribute
+from DataSynthesizer.datatypes.SocialSecurityNumberAttribute import SocialSecurityNumberAttribute
 from DataSynthesizer.datatypes.StringAttribute import StringAttribute
+from DataSynthesizer.datatypes.utils.ColumnStatistics import ColumnStatistics
 from DataSynthesizer.datatypes.utils.DataType import DataType
-from DataSynthesizer.lib import utils
-from DataSynthesizer.lib.PrivBayes import greedy_bayes, construct_noisy_conditional_distributions
+from DataSynthesizer.datatypes.utils.DataTypeInferrer import DataTypeInferrer
+from DataSynthesizer.lib import file_io, utils
+from DataSynthesizer.lib.tracing import NO_OP_TRACER, Tracer
+from DataSynthesizer.lib.PrivBayes import (greedy_bayes, construct_noisy_conditional_distributions,
+                                           construct_noisy_conditional_distributions_from_counts)
+from DataSynthesizer.PartialDescription import PartialDescription
 
 
 class DataDescriber:
@@ -30,6 +36,18 @@ class DataDescriber:
     null_values: str or list
         Additional strings to recognize as missing values.
         By default missing values already include {‘’, ‘NULL’, ‘N/A’, ‘NA’, ‘NaN’, ‘nan’}.
+    sketch_precision : int
+        Precision of the HyperLogLog sketches ruling out candidate keys before checking exactly whether their values
+        are unique, see `utils.is_unique`. If None, all attributes are checked exactly.
+    data_type_inferrer : DataTypeInferrer
+        Infers the data types of attributes not in attribute_to_datatype from samples of their values.
+    columns : list
+        Attributes to read from the input dataset, all of them by default. Parquet and Arrow files only read these
+        columns from disk.
+    tracer : Tracer
+        Receives the phases of describing the dataset, i.e., 'read_dataset', 'infer_data_types', 'attribute_domains',
+        'attribute_distributions', 'encode_dataset', and those of `greedy_bayes` and
+        `construct_noisy_conditional_distributions`. See `tracing.LoggingTracer`.
     attr_to_datatype : dict
         Dictionary of {attribute: datatype}, e.g., {"age": "Integer", "gender": "String"}.
     attr_to_is_categorical : dict
@@ -39,19 +57,28 @@ class DataDescriber:
     data_description: dict
         Nested dictionary (equivalent to JSON) recording the mined dataset information.
     df_input : DataFrame
-        The input dataset to be analyzed.
+        The input dataset to be analyzed. When it is read in chunks, only the first chunk is kept for type inference.
+    attr_to_statistics : dict
+        Dictionary of {attribute: ColumnStatistics}, when the input dataset is read in chunks.
     attr_to_column : Dict
         Dictionary of {attribute: AbstractAttribute}
     bayesian_network : list
         List of [child, [parent,]] to represent a Bayesian Network.
     df_encoded : DataFrame
-        Input dataset encoded into integers, taken as input by PrivBayes algorithm in correlated attribute mode.
+        Input dataset encoded into integers, taken as input by PrivBayes algorithm in correlated attribute mode. It is a
+        view of an array of one row per attribute, see `encode_dataset_into_binning_indices`.
     """
 
-    def __init__(self, histogram_bins: Union[int, str] = 20, category_threshold=20, null_values=None):
+    def __init__(self, histogram_bins: Union[int, str] = 20, category_threshold=20, null_values=None,
+                 sketch_precision: int = 14, data_type_inferrer: DataTypeInferrer = None, columns: List[str] = None,
+                 tracer: Tracer = None):
         self.histogram_bins: Union[int, str] = histogram_bins
         self.category_threshold: int = category_threshold
         self.null_values = null_values
+        self.sketch_precision = sketch_precision
+        self.data_type_inferrer = data_type_inferrer or DataTypeInferrer()
+        self.columns = columns
+        self.tracer = tracer or NO_OP_TRACER
 
         self.attr_to_datatype: Dict[str, DataType] = None
         self.attr_to_is_categorical: Dict[str, bool] = None
@@ -59,6 +86,8 @@ class DataDescriber:
 
         self.data_description: Dict = {}
         self.df_input: DataFrame = None
+        self.attr_to_statistics: Dict[str, ColumnStatistics] = None
+        self.working_directory: TemporaryDirectory = None
         self.attr_to_column: Dict[str, AbstractAttribute] = None
         self.bayesian_network: List = None
         self.df_encoded: DataFrame = None
@@ -70,39 +99,17 @@ class DataDescriber:
                                         attribute_to_is_candidate_key: Dict[str, bool] = None,
                                         categorical_attribute_domain_file: str = None,
                                         numerical_attribute_ranges: Dict[str, List] = None,
-                                        seed=0):
-        attribute_to_datatype = attribute_to_datatype or {}
-        attribute_to_is_categorical = attribute_to_is_categorical or {}
-        attribute_to_is_candidate_key = attribute_to_is_candidate_key or {}
-        numerical_attribute_ranges = numerical_attribute_ranges or {}
-
-        if categorical_attribute_domain_file:
-            categorical_attribute_to_domain = utils.read_json_file(categorical_attribute_domain_file)
-        else:
-            categorical_attribute_to_domain = {}
-
-        utils.set_random_seed(seed)
-        self.attr_to_datatype = {attr: DataType(datatype) for attr, datatype in attribute_to_datatype.items()}
-        self.attr_to_is_categorical = attribute_to_is_categorical
-        self.attr_to_is_candidate_key = attribute_to_is_candidate_key
-        self.read_dataset_from_csv(dataset_file)
-        self.infer_attribute_data_types()
-        self.analyze_dataset_meta()
-        self.represent_input_dataset_by_columns()
-
-        for column in self.attr_to_column.values():
-            attr_name = column.name
-            if attr_name in categorical_attribute_to_domain:
-                column.infer_domain(categorical_domain=categorical_attribute_to_domain[attr_name])
-            elif attr_name in numerical_attribute_ranges:
-                column.infer_domain(numerical_range=numerical_attribute_ranges[attr_name])
-            else:
-                column.infer_domain()
-
-        # record attribute information in json format
-        self.data_description['attribute_description'] = {}
-        for attr, column in self.attr_to_column.items():
-            self.data_description['attribute_description'][attr] = column.to_json()
+                                        seed=0,
+                                        chunk_size: int = None):
+        self.describe_attribute_domains(dataset_file,
+                                        attribute_to_datatype,
+                                        attribute_to_is_categorical,
+                                        attribute_to_is_candidate_key,
+                                        categorical_attribute_domain_file,
+                                        numerical_attribute_ranges,
+                                        seed,
+                                        chunk_size)
+        self.record_attribute_description()
 
     def describe_dataset_in_independent_attribute_mode(self,
                                                        dataset_file,
@@ -112,23 +119,21 @@ class DataDescriber:
                                                        attribute_to_is_candidate_key: Dict[str, bool] = None,
                                                        categorical_attribute_domain_file: str = None,
                                                        numerical_attribute_ranges: Dict[str, List] = None,
-                                                       seed=0):
-        self.describe_dataset_in_random_mode(dataset_file,
-                                             attribute_to_datatype,
-                                             attribute_to_is_categorical,
-                                             attribute_to_is_candidate_key,
-                                             categorical_attribute_domain_file,
-                                             numerical_attribute_ranges,
-                                             seed=seed)
-
-        for column in self.attr_to_column.values():
-            column.infer_distribution()
-
-        self.inject_laplace_noise_into_distribution_per_attribute(epsilon)
-        # record attribute information in json format
-        self.data_description['attribute_description'] = {}
-        for attr, column in self.attr_to_column.items():
-            self.data_description['attribute_description'][attr] = column.to_json()
+                                                       seed=0,
+                                                       chunk_size: int = None):
+        try:
+            self.describe_attribute_domains(dataset_file,
+                                            attribute_to_datatype,
+                                            attribute_to_is_categorical,
+                                            attribute_to_is_candidate_key,
+                                            categorical_attribute_domain_file,
+                                            numerical_attribute_ranges,
+                                            seed,
+                                            chunk_size,
+                                            keep_values=True)
+            self.describe_attribute_distributions(epsilon)
+        finally:
+            self.remove_working_directory()
 
     def describe_dataset_in_correlated_attribute_mode(self,
                                                       dataset_file,
@@ -139,13 +144,18 @@ class DataDescriber:
                                                       attribute_to_is_candidate_key: Dict[str, bool] = None,
                                                       categorical_attribute_domain_file: str = None,
                                                       numerical_attribute_ranges: Dict[str, List] = None,
-                                                      seed=0):
+                                                      seed=0,
+                                                      max_dense_domain_size: int = None,
+                                                      chunk_size: int = None,
+                                                      encoded_dataset_file: str = None,
+                                                      streaming=False,
+                                                      block_size=65536):
         """Generate dataset description using correlated attribute mode.
 
         Parameters
         ----------
         dataset_file : str
-            File name (with directory) of the sensitive dataset as input in csv format.
+            File name (with directory) of the sensitive dataset as input in CSV, Parquet or Arrow format.
         k : int
             Maximum number of parents in Bayesian network.
         epsilon : float
@@ -163,30 +173,251 @@ class DataDescriber:
             Dictionary of {attribute: [min, max]}, e.g., {"age": [25, 65]}
         seed : int or float
             Seed the random number generator.
+        max_dense_domain_size : int
+            Conditional distributions whose domains have more value combinations than this number are stored sparsely,
+            i.e., only for the parents instances that are likely to occur. If None, all of them are stored densely.
+        chunk_size : int
+            If given, read the dataset in one pass over chunks of this number of rows instead of loading it into memory.
+            See `read_dataset_in_chunks`.
+        encoded_dataset_file : str
+            Write the binning indices of the attributes in the Bayesian network to this .npy file, of shape
+            (num_attributes_in_BN, num_tuples), and keep df_encoded as a view of it mapped into memory. Together with
+            chunk_size, datasets whose encoding does not fit into memory can be described.
+        streaming : bool
+            Whether to choose the parents in the Bayesian network over blocks of block_size candidates, so that memory
+            does not grow with the number of candidates, e.g., for many attributes and a large k. See
+            `PrivBayes.greedy_bayes`.
+        block_size : int
+            Number of candidate parent sets scored at a time when streaming.
         """
-        self.describe_dataset_in_independent_attribute_mode(dataset_file,
-                                                            epsilon,
-                                                            attribute_to_datatype,
-                                                            attribute_to_is_categorical,
-                                                            attribute_to_is_candidate_key,
-                                                            categorical_attribute_domain_file,
-                                                            numerical_attribute_ranges,
-                                                            seed)
-        self.df_encoded = self.encode_dataset_into_binning_indices()
+        try:
+            self.describe_attribute_domains(dataset_file,
+                                            attribute_to_datatype,
+                                            attribute_to_is_categorical,
+                                            attribute_to_is_candidate_key,
+                                            categorical_attribute_domain_file,
+                                            numerical_attribute_ranges,
+                                            seed,
+                                            chunk_size,
+                                            keep_values=True,
+                                            keep_codes=True)
+            self.describe_attribute_distributions(epsilon)
+            self.df_encoded = self.encode_dataset_into_binning_indices(encoded_dataset_file)
+        finally:
+            self.remove_working_directory()
+
         if self.df_encoded.shape[1] < 2:
             raise Exception("Correlated Attribute Mode requires at least 2 attributes(i.e., columns) in dataset.")
 
-        self.bayesian_network = greedy_bayes(self.df_encoded, k, epsilon / 2, seed=seed)
+        self.bayesian_network = greedy_bayes(self.df_encoded, k, epsilon / 2, seed=seed, tracer=self.tracer,
+                                             streaming=streaming, block_size=block_size)
         self.data_description['bayesian_network'] = self.bayesian_network
         self.data_description['conditional_probabilities'] = construct_noisy_conditional_distributions(
-            self.bayesian_network, self.df_encoded, epsilon / 2)
+            self.bayesian_network, self.df_encoded, epsilon / 2, max_dense_domain_size, self.tracer)
+
+    def describe_partition(self,
+                           dataset_file,
+                           attribute_to_datatype: Dict[str, DataType] = None,
+                           attribute_to_is_categorical: Dict[str, bool] = None,
+                           attribute_to_is_candidate_key: Dict[str, bool] = None,
+                           numerical_attribute_ranges: Dict[str, List] = None,
+                           dataset_description: Dict = None,
+                           chunk_size=100000,
+                           max_distinct_values=10000) -> PartialDescription:
+        """Describe a partition of the dataset, e.g., the file of one day, by raw counts without noise.
+
+        The partial descriptions of all partitions are merged by `PartialDescription.merge_all`, and the dataset
+        description is computed from the merge by describe_dataset_from_partial_description.
+
+        Parameters
+        ----------
+        dataset_file : str
+            File name (with directory) of the partition in CSV, Parquet or Arrow format, read in chunks of chunk_size rows.
+        attribute_to_datatype : dict
+            Dictionary of {attribute: datatype}. Data types inferred from different partitions may differ, so they
+            should be given for attributes whose values may look different, e.g., mostly missing ones.
+        attribute_to_is_categorical : dict
+            Dictionary of {attribute: boolean}, e.g., {"gender":True, "age":False}.
+        attribute_to_is_candidate_key: dict
+            Dictionary of {attribute: boolean}, e.g., {"id":True, "name":False}.
+        numerical_attribute_ranges: dict
+            Dictionary of {attribute: [min, max]}, over which the histograms of numerical attributes are accumulated.
+        dataset_description : dict
+            Description of the dataset with a Bayesian network, e.g., computed from the merged partial descriptions of
+            a first round over the partitions. If given, the value combinations needed for the conditional
+            distributions of the Bayesian network are counted with the bins of this description.
+        chunk_size : int
+            Number of rows in each chunk.
+        max_distinct_values : int
+            Value counts of numerical attributes are kept up to this number of distinct values, from which their
+            histograms are computed if their ranges are not in numerical_attribute_ranges.
+        """
+        self.attr_to_datatype = {attr: DataType(datatype) for attr, datatype in (attribute_to_datatype or {}).items()}
+        self.attr_to_is_categorical = dict(attribute_to_is_categorical or {})
+        self.attr_to_is_candidate_key = dict(attribute_to_is_candidate_key or {})
+        partial_description = PartialDescription(self.attr_to_datatype,
+                                                 dict(self.attr_to_is_categorical),
+                                                 dict(self.attr_to_is_candidate_key),
+                                                 numerical_attribute_ranges,
+                                                 dataset_description)
+        self.read_dataset_in_chunks(dataset_file, chunk_size, partial_description=partial_description,
+                                    max_distinct_values=max_distinct_values)
+        return partial_description
+
+    def describe_dataset_from_partial_description(self,
+                                                  partial_description: PartialDescription,
+                                                  epsilon=0.1,
+                                                  categorical_attribute_domain_file: str = None,
+                                                  seed=0,
+                                                  max_dense_domain_size: int = None):
+        """Generate dataset description from the merged partial descriptions of all partitions of the dataset.
+
+        The description is in independent attribute mode, or in correlated attribute mode if the partial descriptions
+        count the conditional distributions of a Bayesian network. Laplace noises are injected here, once for the whole
+        dataset, with the same budget as describe_dataset_in_correlated_attribute_mode, i.e., epsilon for the
+        distributions of attributes and epsilon / 2 for the conditional distributions.
+
+        Parameters
+        ----------
+        partial_description : PartialDescription
+            Partial description of the whole dataset, merged by `PartialDescription.merge_all`.
+        epsilon : float
+            A parameter in Differential Privacy. Set epsilon=0 to turn off Differential Privacy.
+        categorical_attribute_domain_file: str
+            File name of a JSON file of some categorical attribute domains.
+        seed : int or float
+            Seed the random number generator.
+        max_dense_domain_size : int
+            See describe_dataset_in_correlated_attribute_mode.
+        """
+        if categorical_attribute_domain_file:
+            categorical_attribute_to_domain = utils.read_json_file(categorical_attribute_domain_file)
+        else:
+            categorical_attribute_to_domain = {}
+
+        utils.set_random_seed(seed)
+        self.attr_to_datatype = dict(partial_description.attr_to_datatype)
+        self.attr_to_is_categorical = dict(partial_description.attr_to_is_categorical)
+        self.attr_to_is_candidate_key = dict(partial_description.attr_to_is_candidate_key)
+        self.attr_to_statistics = partial_description.attr_to_statistics
+        self.df_input = DataFrame(columns=partial_description.attributes)
+        self.finalize_statistics(partial_description.attributes_with_unknown_datatype)
+        with self.tracer.phase('attribute_domains', attributes=len(partial_description.attributes)):
+            self.analyze_dataset_meta()
+            self.represent_input_dataset_by_columns()
+            self.infer_attribute_domains(categorical_attribute_to_domain, partial_description.numerical_attribute_ranges)
+        self.describe_attribute_distributions(epsilon)
+
+        if not partial_description.bayesian_network:
+            return
+        for attr, column in partial_description.attr_to_column.items():
+            if self.attr_to_column[attr].distribution_bins.tolist() != column.distribution_bins:
+                raise ValueError(f'The bins of attribute {attr} differ from those the partitions are described with.')
+        self.bayesian_network = partial_description.bayesian_network
+        self.data_description['bayesian_network'] = self.bayesian_network
+        self.data_description['conditional_probabilities'] = construct_noisy_conditional_distributions_from_counts(
+            self.bayesian_network, partial_description.attributes_to_counts, self.data_description['meta']['num_tuples'],
+            self.data_description['meta']['num_attributes_in_BN'], epsilon / 2, max_dense_domain_size, self.tracer)
+
+    def describe_attribute_domains(self,
+                                   dataset_file,
+                                   attribute_to_datatype: Dict[str, DataType] = None,
+                                   attribute_to_is_categorical: Dict[str, bool] = None,
+                                   attribute_to_is_candidate_key: Dict[str, bool] = None,
+                                   categorical_attribute_domain_file: str = None,
+                                   numerical_attribute_ranges: Dict[str, List] = None,
+                                   seed=0,
+                                   chunk_size: int = None,
+                                   keep_values=False,
+                                   keep_codes=False):
+        """Read the dataset and infer the data types, the meta information, and the domains of the attributes.
+
+        With chunk_size, the dataset is read in chunks, and the values needed later for histograms are kept in a temporary
+        working directory if keep_values, as well as those needed for binning indices if keep_codes. Histograms of
+        attributes in numerical_attribute_ranges are accumulated over their ranges instead.
+        """
+        attribute_to_datatype = attribute_to_datatype or {}
+        attribute_to_is_categorical = attribute_to_is_categorical or {}
+        attribute_to_is_candidate_key = attribute_to_is_candidate_key or {}
+        numerical_attribute_ranges = numerical_attribute_ranges or {}
+
+        if categorical_attribute_domain_file:
+            categorical_attribute_to_domain = utils.read_json_file(categorical_attribute_domain_file)
+        else:
+            categorical_attribute_to_domain = {}
+
+        utils.set_random_seed(seed)
+        self.attr_to_datatype = {attr: DataType(datatype) for attr, datatype in attribute_to_datatype.items()}
+        self.attr_to_is_categorical = attribute_to_is_categorical
+        self.attr_to_is_candidate_key = attribute_to_is_candidate_key
+        if chunk_size:
+            self.read_dataset_in_chunks(dataset_file, chunk_size, keep_values,
+                                        numerical_attribute_ranges=numerical_attribute_ranges, keep_codes=keep_codes)
+        else:
+            self.attr_to_statistics = None
+            self.read_dataset(dataset_file)
+            self.infer_attribute_data_types()
+        with self.tracer.phase('attribute_domains', attributes=self.df_input.shape[1]):
+            self.analyze_dataset_meta()
+            self.represent_input_dataset_by_columns()
+            self.infer_attribute_domains(categorical_attribute_to_domain, numerical_attribute_ranges)
+
+    def infer_attribute_domains(self, categorical_attribute_to_domain: Dict, numerical_attribute_ranges: Dict):
+        for attr, column in self.attr_to_column.items():
+            domain = {}
+            if attr in categorical_attribute_to_domain:
+                domain['categorical_domain'] = categorical_attribute_to_domain[attr]
+            elif attr in numerical_attribute_ranges:
+                domain['numerical_range'] = numerical_attribute_ranges[attr]
+
+            if self.attr_to_statistics:
+                self.attr_to_statistics[attr].infer_domain(column, **domain)
+            else:
+                column.infer_domain(**domain)
+
+    def describe_attribute_distributions(self, epsilon=0.1):
+        with self.tracer.phase('attribute_distributions', attributes=len(self.attr_to_column)):
+            for attr, column in self.attr_to_column.items():
+                if self.attr_to_statistics:
+                    self.attr_to_statistics[attr].infer_distribution(column)
+                else:
+                    column.infer_distribution()
+
+            self.inject_laplace_noise_into_distribution_per_attribute(epsilon)
+            self.record_attribute_description()
+
+    def record_attribute_description(self):
+        # record attribute information in json format
+        self.data_description['attribute_description'] = {}
+        for attr, column in self.attr_to_column.items():
+            self.data_description['attribute_description'][attr] = column.to_json()
+
+    def read_dataset(self, file_name):
+        """Read the dataset from a CSV, Parquet or Arrow file, see `file_io.infer_file_format`.
+
+        Integer and temporal columns of Parquet and Arrow files are described by the data types of their schemas, unless
+        given in attribute_to_datatype.
+        """
+        with self.tracer.phase('read_dataset', file=str(file_name)) as phase:
+            if file_io.infer_file_format(file_name) == 'csv':
+                self.read_dataset_from_csv(file_name)
+            else:
+                self.read_data_types_from_schema(file_name)
+                self.df_input = file_io.read_arrow_dataset(file_name, columns=self.columns, null_values=self.null_values)
+            phase.update(rows=self.df_input.shape[0], columns=self.df_input.shape[1])
+
+    def read_data_types_from_schema(self, file_name):
+        attr_to_datatype = file_io.read_data_types_from_arrow_schema(file_name)
+        self.attr_to_datatype = {**attr_to_datatype, **self.attr_to_datatype}
 
     def read_dataset_from_csv(self, file_name=None):
         try:
-            self.df_input = read_csv(file_name, skipinitialspace=True, na_values=self.null_values)
+            self.df_input = read_csv(file_name, skipinitialspace=True, na_values=self.null_values, usecols=self.columns)
         except (UnicodeDecodeError, NameError):
-            self.df_input = read_csv(file_name, skipinitialspace=True, na_values=self.null_values,
+            self.df_input = read_csv(file_name, skipinitialspace=True, na_values=self.null_values, usecols=self.columns,
                                      encoding='latin1')
+        if self.columns is not None:
+            self.df_input = self.df_input[self.columns]
 
         # Remove columns with empty active domain, i.e., all values are missing.
         attributes_before = set(self.df_input.columns)
@@ -195,32 +426,114 @@ class DataDescriber:
         if len(attributes_before) > len(attributes_after):
             print(f'Empty columns are removed, including {attributes_before - attributes_after}.')
 
-    def infer_attribute_data_types(self):
+    def read_dataset_in_chunks(self, file_name, chunk_size, keep_values=False,
+                               partial_description: PartialDescription = None, max_distinct_values: int = None,
+                               numerical_attribute_ranges: Dict[str, List] = None, keep_codes=False):
+        """Read the dataset in one pass over chunks of chunk_size rows, accumulating the statistics of its attributes.
+
+        Data types are inferred from the first chunk, except that inferred Integer attributes having non-integral values
+        in later chunks are Float. Afterwards, df_input only holds the columns of the dataset, and attr_to_statistics the
+        statistics to describe the attributes. If keep_values, the values needed for histograms are kept in files in a
+        temporary working directory, as well as those needed for binning indices if keep_codes, see `ColumnStatistics`.
+        Histograms of the attributes in numerical_attribute_ranges are accumulated over their ranges without files.
+
+        If partial_description is given, the statistics are left unfinalized to be merged with those of other
+        partitions, and the value combinations of its Bayesian network are also counted.
+        """
+        try:
+            self.accumulate_statistics_over_chunks(file_name, chunk_size, keep_values, None, partial_description,
+                                                   max_distinct_values, numerical_attribute_ranges, keep_codes)
+        except (UnicodeDecodeError, NameError):
+            self.accumulate_statistics_over_chunks(file_name, chunk_size, keep_values, 'latin1', partial_description,
+                                                   max_distinct_values, numerical_attribute_ranges, keep_codes)
+
+    def accumulate_statistics_over_chunks(self, file_name, chunk_size, keep_values=False, encoding=None,
+                                          partial_description: PartialDescription = None,
+                                          max_distinct_values: int = None,
+                                          numerical_attribute_ranges: Dict[str, List] = None, keep_codes=False):
+        if file_io.infer_file_format(file_name) != 'csv':
+            self.read_data_types_from_schema(file_name)
+        chunks = self.iterate_over_chunks(file_name, chunk_size, encoding)
+        self.df_input = next(chunks)
+        chunks.close()
         attributes_with_unknown_datatype = set(self.df_input.columns) - set(self.attr_to_datatype)
-        inferred_numerical_attributes = utils.infer_numerical_attributes_in_dataframe(self.df_input)
+        self.infer_attribute_data_types()
+
+        self.remove_working_directory()
+        if keep_values:
+            self.working_directory = TemporaryDirectory()
+        self.attr_to_statistics = {}
+        if partial_description:
+            numerical_attribute_ranges = partial_description.numerical_attribute_ranges
+        numerical_attribute_ranges = numerical_attribute_ranges or {}
+        for attr in self.df_input:
+            data_type = self.attr_to_datatype[attr]
+            datetime_format = infer_datetime_format(self.df_input[attr]) if data_type is DataType.DATETIME else None
+            self.attr_to_statistics[attr] = ColumnStatistics(attr,
+                                                             data_type,
+                                                             self.attr_to_is_categorical.get(attr),
+                                                             self.category_threshold,
+                                                             self.attr_to_is_candidate_key.get(attr),
+                                                             datetime_format,
+                                                             self.working_directory.name if keep_values else None,
+                                                             numerical_attribute_ranges.get(attr),
+                                                             self.histogram_bins,
+                                                             max_distinct_values,
+                                                             self.sketch_precision,
+                                                             keep_codes)
+        if partial_description:
+            partial_description.attributes = self.df_input.columns.tolist()
+            partial_description.attributes_with_unknown_datatype = attributes_with_unknown_datatype
+            partial_description.attr_to_statistics = self.attr_to_statistics
+            partial_description.attributes_to_counts = {}
+
+        non_numerical_attributes = {attr: str for attr, data_type in self.attr_to_datatype.items()
+                                    if data_type not in {DataType.INTEGER, DataType.FLOAT}}
+        with self.tracer.phase('read_dataset', file=str(file_name), chunk_size=chunk_size) as phase:
+            num_rows = 0
+            for chunk in self.iterate_over_chunks(file_name, chunk_size, encoding, non_numerical_attributes):
+                for attr, statistics in self.attr_to_statistics.items():
+                    statistics.update(chunk[attr])
+                if partial_description and partial_description.bayesian_network:
+                    partial_description.count_value_combinations(chunk)
+                num_rows += chunk.shape[0]
+                self.tracer.event('chunk_read', rows=num_rows)
+            phase.update(rows=num_rows, columns=self.df_input.shape[1])
+
+        if not partial_description:
+            self.finalize_statistics(attributes_with_unknown_datatype)
+        self.df_input = self.df_input.head(0)
+
+    def iterate_over_chunks(self, file_name, chunk_size, encoding=None, dtype=None):
+        """Iterate over chunks of chunk_size rows of the dataset. Columns of CSV files are read as dtype if given, while
+        those of Parquet and Arrow files keep the types of their schemas."""
+        if file_io.infer_file_format(file_name) == 'csv':
+            with read_csv(file_name, chunksize=chunk_size, dtype=dtype, skipinitialspace=True, na_values=self.null_values,
+                          encoding=encoding, usecols=self.columns) as reader:
+                for chunk in reader:
+                    yield chunk if self.columns is None else chunk[self.columns]
+        else:
+            yield from file_io.read_arrow_dataset_in_chunks(file_name, chunk_size, columns=self.columns,
+                                                            null_values=self.null_values)
 
-        for attr in attributes_with_unknown_datatype:
-            column_dropna = self.df_input[attr].dropna()
+    def finalize_statistics(self, attributes_with_unknown_datatype):
+        for attr, statistics in self.attr_to_statistics.items():
+            statistics.finalize()
+            if attr in attributes_with_unknown_datatype and self.attr_to_datatype[attr] is DataType.INTEGER:
+                if not statistics.is_integer:
+                    self.attr_to_datatype[attr] = statistics.data_type = DataType.FLOAT
 
-            # current attribute is either Integer or Float.
-            if attr in inferred_numerical_attributes:
-                # TODO Comparing all values may be too slow for large datasets.
-                if array_equal(column_dropna, column_dropna.astype(int, copy=False)):
-                    self.attr_to_datatype[attr] = DataType.INTEGER
-                else:
-                    self.attr_to_datatype[attr] = DataType.FLOAT
+    def remove_working_directory(self):
+        if self.working_directory is not None:
+            self.working_directory.cleanup()
+            self.working_directory = None
 
-            # current attribute is either String, DateTime, or SocialSecurityNumber.
-            else:
-                # Sample 20 values to test its data_type.
-                samples = column_dropna.sample(20, replace=True)
-                if all(samples.map(is_datetime)):
-                    self.attr_to_datatype[attr] = DataType.DATETIME
-                else:
-                    if all(samples.map(is_ssn)):
-                        self.attr_to_datatype[attr] = DataType.SOCIAL_SECURITY_NUMBER
-                    else:
-                        self.attr_to_datatype[attr] = DataType.STRING
+    def infer_attribute_data_types(self):
+        attributes_with_unknown_datatype = [attr for attr in self.df_input if attr not in self.attr_to_datatype]
+        with self.tracer.phase('infer_data_types', rows=self.df_input.shape[0],
+                               attributes=len(attributes_with_unknown_datatype)):
+            self.attr_to_datatype.update(self.data_type_inferrer.infer_data_types(self.df_input,
+                                                                                  attributes_with_unknown_datatype))
 
     def analyze_dataset_meta(self):
         all_attributes = set(self.df_input.columns)
@@ -229,8 +542,10 @@ class DataDescriber:
         for attr in all_attributes - set(self.attr_to_is_candidate_key):
             if self.attr_to_datatype[attr] in {DataType.FLOAT, DataType.DATETIME}:
                 self.attr_to_is_candidate_key[attr] = False
+            elif self.attr_to_statistics:
+                self.attr_to_is_candidate_key[attr] = self.attr_to_statistics[attr].is_unique
             else:
-                self.attr_to_is_candidate_key[attr] = self.df_input[attr].is_unique
+                self.attr_to_is_candidate_key[attr] = utils.is_unique(self.df_input[attr], self.sketch_precision)
 
         candidate_keys = {attr for attr, is_key in self.attr_to_is_candidate_key.items() if is_key}
 
@@ -247,7 +562,11 @@ class DataDescriber:
                             attr not in candidate_keys and attr not in non_categorical_string_attributes]
         non_categorical_string_attributes = list(non_categorical_string_attributes)
 
-        self.data_description['meta'] = {"num_tuples": self.df_input.shape[0],
+        if self.attr_to_statistics:
+            num_tuples = next(iter(self.attr_to_statistics.values())).num_tuples
+        else:
+            num_tuples = self.df_input.shape[0]
+        self.data_description['meta'] = {"num_tuples": num_tuples,
                                          "num_attributes": self.df_input.shape[1],
                                          "num_attributes_in_BN": len(attributes_in_BN),
                                          "all_attributes": self.df_input.columns.tolist(),
@@ -264,8 +583,11 @@ class DataDescriber:
         """
         if attribute_name in self.attr_to_is_categorical:
             return self.attr_to_is_categorical[attribute_name]
+        elif self.attr_to_statistics:
+            return bool(self.attr_to_statistics[attribute_name].num_distinct_values <= self.category_threshold)
         else:
-            return self.df_input[attribute_name].dropna().unique().size <= self.category_threshold
+            num_distinct_values = utils.count_distinct_values(self.df_input[attribute_name], self.category_threshold)
+            return bool(num_distinct_values <= self.category_threshold)
 
     def represent_input_dataset_by_columns(self):
         self.attr_to_column = {}
@@ -280,6 +602,8 @@ class DataDescriber:
                 self.attr_to_column[attr] = FloatAttribute(*paras)
             elif data_type is DataType.DATETIME:
                 self.attr_to_column[attr] = DateTimeAttribute(*paras)
+                if self.attr_to_statistics:
+                    self.attr_to_column[attr].datetime_format = self.attr_to_statistics[attr].datetime_format
             elif data_type is DataType.STRING:
                 self.attr_to_column[attr] = StringAttribute(*paras)
             elif data_type is DataType.SOCIAL_SECURITY_NUMBER:
@@ -289,16 +613,40 @@ class DataDescriber:
 
     def inject_laplace_noise_into_distribution_per_attribute(self, epsilon=0.1):
         num_attributes_in_BN = self.data_description['meta']['num_attributes_in_BN']
+        num_tuples = self.data_description['meta']['num_tuples']
         for column in self.attr_to_column.values():
             assert isinstance(column, AbstractAttribute)
-            column.inject_laplace_noise(epsilon, num_attributes_in_BN)
-
-    def encode_dataset_into_binning_indices(self):
-        """Before constructing Bayesian network, encode input dataset into binning indices."""
-        encoded_dataset = DataFrame()
-        for attr in self.data_description['meta']['attributes_in_BN']:
-            encoded_dataset[attr] = self.attr_to_column[attr].encode_values_into_bin_idx()
-        return encoded_dataset
+            column.inject_laplace_noise(epsilon, num_attributes_in_BN, num_tuples)
+
+    def encode_dataset_into_binning_indices(self, encoded_dataset_file: str = None):
+        """Before constructing Bayesian network, encode input dataset into binning indices.
+
+        The binning indices are written into an array of shape (num_attributes_in_BN, num_tuples) of the narrowest
+        unsigned integer dtype, i.e., one row per attribute. If encoded_dataset_file is given, the array is saved to
+        that .npy file and mapped into memory, so that the encoded dataset does not have to fit into memory, and the
+        processes of `greedy_bayes` map the same file instead of copying it. The returned DataFrame is a view of the
+        array.
+        """
+        attributes_in_BN = self.data_description['meta']['attributes_in_BN']
+        num_bins = max((len(self.attr_to_column[attr].distribution_bins) for attr in attributes_in_BN), default=0)
+        shape = (len(attributes_in_BN), self.data_description['meta']['num_tuples'])
+        if encoded_dataset_file:
+            encoded = np.lib.format.open_memmap(encoded_dataset_file, mode='w+', dtype=np.min_scalar_type(num_bins),
+                                                shape=shape)
+        else:
+            encoded = np.empty(shape, dtype=np.min_scalar_type(num_bins))
+        with self.tracer.phase('encode_dataset', rows=shape[1], attributes=shape[0], bytes=encoded.nbytes):
+            for i, attr in enumerate(attributes_in_BN):
+                if self.attr_to_statistics:
+                    self.attr_to_statistics[attr].encode_values_into_bin_idx(self.attr_to_column[attr], encoded[i])
+                else:
+                    encoded[i] = self.attr_to_column[attr].encode_values_into_bin_idx().to_numpy()
+        if encoded_dataset_file:
+            encoded.flush()
+            del encoded
+            encoded = np.load(encoded_dataset_file, mmap_mode='r')
+        # the transpose is stored as a single block of shape (num_attributes_in_BN, num_tuples), without a copy.
+        return DataFrame(encoded.T, columns=attributes_in_BN, copy=False)
 
     def save_dataset_description_to_file(self, file_name):
         Path(file_name).touch()
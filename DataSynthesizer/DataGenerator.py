@@ -1,123 +1,111 @@
 from pathlib import Path
 
-from numpy import random
-from pandas import DataFrame
-
-from DataSynthesizer.datatypes.utils.AttributeLoader import parse_json
-from DataSynthesizer.lib.utils import set_random_seed, read_json_file, generate_random_string
+from DataSynthesizer.SynthesizerModel import SynthesizerModel
+from DataSynthesizer.lib.file_io import SyntheticDataWriter
+from DataSynthesizer.lib.tracing import NO_OP_TRACER, Tracer
+from DataSynthesizer.lib.utils import read_json_file
 
 
 class DataGenerator(object):
-    def __init__(self):
+    """Generate synthetic datasets from dataset descriptions.
+
+    Every call parses the description file into a SynthesizerModel. To generate many datasets from one description,
+    create the SynthesizerModel once and call its sample() method instead.
+
+    The datasets are generated in chunks of chunk_size tuples, spread over a pool of processes if processes > 1. For the
+    same seed and chunk_size, the generated dataset does not depend on the number of processes.
+
+    Parameters
+    ----------
+    tracer : Tracer
+        Receives the phases 'load_model', 'generate' and 'write', see `tracing.LoggingTracer`.
+    """
+
+    def __init__(self, tracer: Tracer = None):
         self.n = 0
         self.synthetic_dataset = None
         self.description = {}
         self.encoded_dataset = None
-
-    def generate_dataset_in_random_mode(self, n, description_file, seed=0, minimum=0, maximum=100):
-        set_random_seed(seed)
-        description = read_json_file(description_file)
-
-        self.synthetic_dataset = DataFrame()
-        for attr in description['attribute_description'].keys():
-            attr_info = description['attribute_description'][attr]
-            datatype = attr_info['data_type']
-            is_categorical = attr_info['is_categorical']
-            is_candidate_key = attr_info['is_candidate_key']
-            if is_candidate_key:
-                self.synthetic_dataset[attr] = parse_json(attr_info).generate_values_as_candidate_key(n)
-            elif is_categorical:
-                self.synthetic_dataset[attr] = random.choice(attr_info['distribution_bins'], n)
-            elif datatype == 'String':
-                length = random.randint(attr_info['min'], attr_info['max'] + 1)
-                self.synthetic_dataset[attr] = length
-                self.synthetic_dataset[attr] = self.synthetic_dataset[attr].map(lambda x: generate_random_string(x))
-            else:
-                if datatype == 'Integer':
-                    self.synthetic_dataset[attr] = random.randint(minimum, maximum + 1, n)
-                else:
-                    self.synthetic_dataset[attr] = random.uniform(minimum, maximum, n)
-
-    def generate_dataset_in_independent_mode(self, n, description_file, seed=0):
-        set_random_seed(seed)
-        self.description = read_json_file(description_file)
-
-        all_attributes = self.description['meta']['all_attributes']
-        candidate_keys = set(self.description['meta']['candidate_keys'])
-        self.synthetic_dataset = DataFrame(columns=all_attributes)
-        for attr in all_attributes:
-            attr_info = self.description['attribute_description'][attr]
-            column = parse_json(attr_info)
-
-            if attr in candidate_keys:
-                self.synthetic_dataset[attr] = column.generate_values_as_candidate_key(n)
-            else:
-                binning_indices = column.sample_binning_indices_in_independent_attribute_mode(n)
-                self.synthetic_dataset[attr] = column.sample_values_from_binning_indices(binning_indices)
-
-    def generate_dataset_in_correlated_attribute_mode(self, n, description_file, seed=0):
-        set_random_seed(seed)
+        self.tracer = tracer or NO_OP_TRACER
+
+    def generate_dataset_in_random_mode(self, n, description_file, seed=0, minimum=0, maximum=100, processes=1,
+                                        chunk_size=100000):
+        with self.tracer.phase('load_model', mode='random'):
+            self.description = read_json_file(description_file)
+            model = SynthesizerModel(self.description, 'random', minimum, maximum)
+        with self.tracer.phase('generate', mode='random', rows=n, processes=processes):
+            self.synthetic_dataset = model.sample(n, seed, processes, chunk_size)
+
+    def generate_dataset_in_independent_mode(self, n, description_file, seed=0, processes=1, chunk_size=100000):
+        with self.tracer.phase('load_model', mode='independent'):
+            self.description = read_json_file(description_file)
+            model = SynthesizerModel(self.description, 'independent')
+        with self.tracer.phase('generate', mode='independent', rows=n, processes=processes):
+            self.synthetic_dataset = model.sample(n, seed, processes, chunk_size)
+
+    def generate_dataset_in_correlated_attribute_mode(self, n, description_file, seed=0, processes=1,
+                                                      chunk_size=100000):
         self.n = n
-        self.description = read_json_file(description_file)
-
-        all_attributes = self.description['meta']['all_attributes']
-        candidate_keys = set(self.description['meta']['candidate_keys'])
-        self.encoded_dataset = DataGenerator.generate_encoded_dataset(self.n, self.description)
-        self.synthetic_dataset = DataFrame(columns=all_attributes)
-        for attr in all_attributes:
-            attr_info = self.description['attribute_description'][attr]
-            column = parse_json(attr_info)
-
-            if attr in self.encoded_dataset:
-                self.synthetic_dataset[attr] = column.sample_values_from_binning_indices(self.encoded_dataset[attr])
-            elif attr in candidate_keys:
-                self.synthetic_dataset[attr] = column.generate_values_as_candidate_key(n)
-            else:
-                # for attributes not in BN or candidate keys, use independent attribute mode.
-                binning_indices = column.sample_binning_indices_in_independent_attribute_mode(n)
-                self.synthetic_dataset[attr] = column.sample_values_from_binning_indices(binning_indices)
+        with self.tracer.phase('load_model', mode='correlated'):
+            self.description = read_json_file(description_file)
+            model = SynthesizerModel(self.description, 'correlated')
+        with self.tracer.phase('generate', mode='correlated', rows=n, processes=processes):
+            self.synthetic_dataset, self.encoded_dataset = model.sample(n, seed, processes, chunk_size,
+                                                                        return_encoded_dataset=True)
 
     @staticmethod
     def get_sampling_order(bn):
-        order = [bn[0][1][0]]
-        for child, _ in bn:
-            order.append(child)
-        return order
+        return SynthesizerModel.get_sampling_order(bn)
 
     @staticmethod
     def generate_encoded_dataset(n, description):
-        bn = description['bayesian_network']
-        bn_root_attr = bn[0][1][0]
-        root_attr_dist = description['conditional_probabilities'][bn_root_attr]
-        encoded_df = DataFrame(columns=DataGenerator.get_sampling_order(bn))
-        encoded_df[bn_root_attr] = random.choice(len(root_attr_dist), size=n, p=root_attr_dist)
-
-        for child, parents in bn:
-            child_conditional_distributions = description['conditional_probabilities'][child]
-            for parents_instance in child_conditional_distributions.keys():
-                dist = child_conditional_distributions[parents_instance]
-                parents_instance = list(eval(parents_instance))
-
-                filter_condition = ''
-                for parent, value in zip(parents, parents_instance):
-                    filter_condition += f"(encoded_df['{parent}']=={value})&"
-
-                filter_condition = eval(filter_condition[:-1])
-
-                size = encoded_df[filter_condition].shape[0]
-                if size:
-                    encoded_df.loc[filter_condition, child] = random.choice(len(dist), size=size, p=dist)
-
-            unconditioned_distribution = description['attribute_description'][child]['distribution_probabilities']
-            encoded_df.loc[encoded_df[child].isnull(), child] = random.choice(len(unconditioned_distribution),
-                                                                              size=encoded_df[child].isnull().sum(),
-                                                                              p=unconditioned_distribution)
-        encoded_df[encoded_df.columns] = encoded_df[encoded_df.columns].astype(int)
-        return encoded_df
+        return SynthesizerModel(description, 'correlated').generate_encoded_dataset(n)
 
     def save_synthetic_data(self, to_file):
+        """Save the synthetic dataset to a CSV, Parquet or Arrow file, see SyntheticDataWriter."""
         Path(to_file).touch()
-        self.synthetic_dataset.to_csv(to_file, index=False)
+        with self.tracer.phase('write', file=str(to_file), rows=self.synthetic_dataset.shape[0]):
+            with SyntheticDataWriter(to_file, description=self.description) as writer:
+                writer.write(self.synthetic_dataset)
+
+    @staticmethod
+    def save_synthetic_data_in_chunks(n, description_file, to_file, mode='correlated', chunk_size=100000, seed=0,
+                                      processes=1, tracer: Tracer = None):
+        """Generate a synthetic dataset of n tuples chunk by chunk and append every chunk to to_file.
+
+        Memory usage depends on chunk_size instead of n. See SynthesizerModel.sample_chunks and SyntheticDataWriter.
+
+        Parameters
+        ----------
+        n : int
+            Number of tuples.
+        description_file : str
+            Dataset description saved by DataDescriber.
+        to_file : str
+            Output file in CSV (optionally compressed by gzip or zstd), Parquet or Arrow format, whose schema is derived
+            from the description.
+        mode : str
+            One of 'random', 'independent' and 'correlated'.
+        chunk_size : int
+            Number of tuples in each chunk.
+        seed : int
+            Seed the random number generator.
+        processes : int
+            Number of processes generating chunks. If None, use `os.cpu_count()`.
+        tracer : Tracer
+            Receives the phases 'load_model' and 'generate', which covers writing and an event 'chunk_written' for
+            every chunk.
+        """
+        tracer = tracer or NO_OP_TRACER
+        with tracer.phase('load_model', mode=mode):
+            model = SynthesizerModel.from_description_file(description_file, mode)
+        with tracer.phase('generate', mode=mode, rows=n, processes=processes, file=str(to_file)):
+            with SyntheticDataWriter(to_file, description=model.description) as writer:
+                num_rows = 0
+                for chunk in model.sample_chunks(n, chunk_size, seed, processes):
+                    writer.write(chunk)
+                    num_rows += chunk.shape[0]
+                    tracer.event('chunk_written', rows=num_rows)
 
 
 if __name__ == '__main__':
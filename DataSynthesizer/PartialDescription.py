@@ -0,0 +1,198 @@
+import json
+from copy import deepcopy
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from pandas import DataFrame, Series
+
+from DataSynthesizer.datatypes.AbstractAttribute import AbstractAttribute
+from DataSynthesizer.datatypes.utils.AttributeLoader import parse_json
+from DataSynthesizer.datatypes.utils.ColumnStatistics import ColumnStatistics
+from DataSynthesizer.datatypes.utils.DataType import DataType
+from DataSynthesizer.lib.PrivBayes import attribute_sets_of_network
+
+
+class PartialDescription(object):
+    """Raw counts describing a partition of a dataset, e.g., the file of one day, before any noise is injected.
+
+    Partial descriptions of all partitions are merged into that of the whole dataset, from which
+    `DataDescriber.describe_dataset_from_partial_description` computes the dataset description, so that the Laplace
+    noises are injected once, as if the whole dataset were described at once.
+
+    Partial descriptions hold exact statistics of the sensitive dataset, so they must be kept as private as the dataset
+    itself. They include the exact counts of values and of value combinations, the values themselves of attributes
+    that may be categorical, the exact minima and maxima, and the 64-bit hashes of all values of attributes that may be
+    candidate keys, from which the values can be recovered by hashing guesses, e.g., all SocialSecurityNumbers. They are
+    saved as JSON and .npz files without pickles, so loading partial descriptions from other nodes executes no code.
+
+    A description in correlated attribute mode takes two rounds over the partitions. The description computed from the
+    first round fixes the bins of the attributes, and carries a Bayesian network, e.g., learned from one partition or a
+    previous description. The second round describes the partitions again with that description, which also counts the
+    value combinations of the attributes needed for the conditional distributions of the Bayesian network.
+
+    Attributes
+    ----------
+    attributes : list
+        Attributes in the order of the dataset.
+    attr_to_datatype : dict
+        Dictionary of {attribute: DataType}.
+    attributes_with_unknown_datatype : set
+        Attributes whose data types are inferred, so that Integer ones having non-integral values turn into Float.
+    attr_to_is_categorical : dict
+        Dictionary of {attribute: boolean} given by the user.
+    attr_to_is_candidate_key : dict
+        Dictionary of {attribute: boolean} given by the user.
+    numerical_attribute_ranges : dict
+        Dictionary of {attribute: [min, max]} over which histograms are accumulated.
+    attr_to_statistics : dict
+        Dictionary of {attribute: ColumnStatistics}.
+    bayesian_network : list
+        List of [child, [parent,]] whose conditional distributions are counted, if any.
+    attribute_description : dict
+        Dictionary of {attribute: attribute description} from the dataset description, for the attributes in the
+        Bayesian network.
+    attr_to_column : dict
+        Dictionary of {attribute: AbstractAttribute} encoding the attributes in the Bayesian network.
+    attributes_to_counts : dict
+        Dictionary of {tuple of attributes: (instances, counts)} for the sets of attributes in
+        `PrivBayes.attribute_sets_of_network`, where instances are the distinct rows of their binning indices in
+        lexicographic order.
+    """
+
+    def __init__(self, attr_to_datatype: Dict[str, DataType], attr_to_is_categorical: Dict[str, bool] = None,
+                 attr_to_is_candidate_key: Dict[str, bool] = None, numerical_attribute_ranges: Dict[str, List] = None,
+                 dataset_description: Dict = None):
+        self.attributes: List[str] = []
+        self.attr_to_datatype = attr_to_datatype
+        self.attributes_with_unknown_datatype: Set[str] = set()
+        self.attr_to_is_categorical = attr_to_is_categorical or {}
+        self.attr_to_is_candidate_key = attr_to_is_candidate_key or {}
+        self.numerical_attribute_ranges = numerical_attribute_ranges or {}
+        self.attr_to_statistics: Dict[str, ColumnStatistics] = {}
+
+        self.bayesian_network: List = None
+        self.attribute_description: Dict[str, Dict] = {}
+        self.attr_to_column: Dict[str, AbstractAttribute] = {}
+        self.attributes_to_counts: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray]] = {}
+        if dataset_description and dataset_description.get('bayesian_network'):
+            self.bayesian_network = dataset_description['bayesian_network']
+            for attributes in attribute_sets_of_network(self.bayesian_network):
+                for attr in attributes:
+                    self.attribute_description[attr] = dataset_description['attribute_description'][attr]
+            self.attr_to_column = {attr: parse_json(attr_info) for attr, attr_info in self.attribute_description.items()}
+
+    def count_value_combinations(self, chunk: DataFrame):
+        """Count the value combinations of the attributes in the Bayesian network in a chunk of the partition."""
+        encoded = {}
+        for attr, column in self.attr_to_column.items():
+            statistics = self.attr_to_statistics[attr]
+            values = statistics.convert_values(chunk[attr])
+            if column.is_categorical:
+                encoded[attr] = column.encode_categorical_values(values).to_numpy()
+            else:
+                numbers = statistics.convert_numbers(values, values.dropna())
+                encoded[attr] = column.encode_numerical_values(Series(numbers)).to_numpy()
+
+        for attributes in attribute_sets_of_network(self.bayesian_network):
+            rows = np.stack([encoded[attr] for attr in attributes], axis=1).astype(np.int64)
+            instances, counts = np.unique(rows, axis=0, return_counts=True)
+            self.add_counts(tuple(attributes), instances, counts)
+
+    def add_counts(self, attributes: Tuple[str, ...], instances: np.ndarray, counts: np.ndarray):
+        if attributes in self.attributes_to_counts:
+            previous_instances, previous_counts = self.attributes_to_counts[attributes]
+            instances, inverse = np.unique(np.concatenate([previous_instances, instances]), axis=0,
+                                           return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=np.concatenate([previous_counts, counts]),
+                                 minlength=instances.shape[0]).astype(np.int64)
+        self.attributes_to_counts[attributes] = (instances, counts)
+
+    def merge(self, other: 'PartialDescription'):
+        """Merge the partial description of another partition into this one, in place, and return it."""
+        if other.attributes != self.attributes:
+            raise ValueError(f'Partitions have different attributes {self.attributes} and {other.attributes}.')
+        if other.bayesian_network != self.bayesian_network or any(
+                other.attr_to_column[attr].distribution_bins != column.distribution_bins
+                for attr, column in self.attr_to_column.items()):
+            raise ValueError('Partitions are described with different dataset descriptions.')
+
+        for attr, statistics in self.attr_to_statistics.items():
+            statistics.merge(other.attr_to_statistics[attr])
+            self.attr_to_datatype[attr] = statistics.data_type
+        self.attributes_with_unknown_datatype |= other.attributes_with_unknown_datatype
+        for attributes, (instances, counts) in other.attributes_to_counts.items():
+            self.add_counts(attributes, instances, counts)
+        return self
+
+    @classmethod
+    def merge_all(cls, partial_descriptions: List['PartialDescription']):
+        """Merge the partial descriptions of all partitions into a new one."""
+        partial_descriptions = list(partial_descriptions)
+        if not partial_descriptions:
+            raise ValueError('There is no partial description to merge.')
+        merged = deepcopy(partial_descriptions[0])
+        for partial_description in partial_descriptions[1:]:
+            merged.merge(partial_description)
+        return merged
+
+    def save(self, file_name):
+        """Save the partial description into file_name in JSON format, and its arrays into the .npz file of the same
+        name, see arrays_file_name."""
+        arrays = {}
+        attr_to_statistics = {}
+        for i, (attr, statistics) in enumerate(self.attr_to_statistics.items()):
+            attr_to_statistics[attr], statistics_arrays = statistics.to_json()
+            arrays.update({f'statistics_{i}_{name}': array for name, array in statistics_arrays.items()})
+        for i, (instances, counts) in enumerate(self.attributes_to_counts.values()):
+            arrays[f'instances_{i}'] = instances
+            arrays[f'counts_{i}'] = counts
+
+        partial_description = {
+            'attributes': self.attributes,
+            'attr_to_datatype': {attr: data_type.value for attr, data_type in self.attr_to_datatype.items()},
+            'attributes_with_unknown_datatype': sorted(self.attributes_with_unknown_datatype),
+            'attr_to_is_categorical': self.attr_to_is_categorical,
+            'attr_to_is_candidate_key': self.attr_to_is_candidate_key,
+            'numerical_attribute_ranges': self.numerical_attribute_ranges,
+            'attr_to_statistics': attr_to_statistics,
+            'bayesian_network': self.bayesian_network,
+            'attribute_description': self.attribute_description,
+            'attribute_sets_with_counts': [list(attributes) for attributes in self.attributes_to_counts],
+        }
+        with open(file_name, 'w') as file:
+            json.dump(partial_description, file, indent=4)
+        np.savez(self.arrays_file_name(file_name), **arrays)
+
+    @classmethod
+    def load(cls, file_name):
+        """Load a partial description saved by save. Arrays are loaded without pickles."""
+        with open(file_name) as file:
+            partial_description = json.load(file)
+        with np.load(cls.arrays_file_name(file_name), allow_pickle=False) as npz:
+            arrays = dict(npz)
+
+        loaded = cls({attr: DataType(data_type) for attr, data_type in partial_description['attr_to_datatype'].items()},
+                     partial_description['attr_to_is_categorical'], partial_description['attr_to_is_candidate_key'],
+                     partial_description['numerical_attribute_ranges'])
+        loaded.attributes = partial_description['attributes']
+        loaded.attributes_with_unknown_datatype = set(partial_description['attributes_with_unknown_datatype'])
+        for i, (attr, info) in enumerate(partial_description['attr_to_statistics'].items()):
+            prefix = f'statistics_{i}_'
+            statistics_arrays = {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)}
+            loaded.attr_to_statistics[attr] = ColumnStatistics.from_json(info, statistics_arrays)
+        loaded.bayesian_network = partial_description['bayesian_network']
+        loaded.attribute_description = partial_description['attribute_description']
+        loaded.attr_to_column = {attr: parse_json(attr_info) for attr, attr_info in loaded.attribute_description.items()}
+        for i, attributes in enumerate(partial_description['attribute_sets_with_counts']):
+            loaded.attributes_to_counts[tuple(attributes)] = (arrays[f'instances_{i}'], arrays[f'counts_{i}'])
+        return loaded
+
+    @staticmethod
+    def arrays_file_name(file_name):
+        """The .npz file of the arrays of a partial description saved into file_name, e.g., 'partition.npz' for
+        'partition.json'."""
+        file_name = Path(file_name)
+        if file_name.suffix == '.npz':
+            raise ValueError(f'The partial description cannot be saved into {file_name}, which is its file of arrays.')
+        return file_name.with_suffix('.npz')
@@ -0,0 +1,251 @@
+from collections import deque
+from math import ceil
+from multiprocessing import cpu_count
+from multiprocessing.pool import Pool
+
+import numpy as np
+from pandas import DataFrame, Series, concat
+
+from DataSynthesizer.datatypes.utils.AttributeLoader import parse_json
+from DataSynthesizer.datatypes.utils.DataType import DataType
+from DataSynthesizer.lib.utils import (read_json_file, generate_random_strings, cumulative_distributions,
+                                       lookup_parents_instances, parse_conditional_distributions, random_generator,
+                                       sample_from_cumulative_distributions)
+
+
+# Model shared by the processes generating chunks, see SynthesizerModel.iterate_chunks.
+_shared_model = None
+
+
+def _attach_model(model):
+    global _shared_model
+    _shared_model = model
+
+
+def _generate_chunk(paras):
+    return _shared_model.generate_chunk(*paras)
+
+
+class SynthesizerModel(object):
+    """Dataset description compiled once for repeated generation.
+
+    The attributes are parsed, the distributions are turned into cumulative distributions, and the conditional
+    distributions of the Bayesian network into sorted tables of parents instances, when the model is created. Sampling
+    never modifies the model and draws from its own random number generator, so a model can be shared across threads.
+
+    Attributes
+    ----------
+    description : dict
+        Dataset description saved by DataDescriber.
+    mode : str
+        One of 'random', 'independent' and 'correlated', i.e., the mode of the DataGenerator.
+    minimum : int or float
+        Lower bound of non-categorical numerical attributes in random mode.
+    maximum : int or float
+        Upper bound of non-categorical numerical attributes in random mode.
+    all_attributes : list
+        Attributes in the order of the input dataset.
+    attr_to_column : dict
+        Dictionary of {attribute: AbstractAttribute}.
+    attr_to_cdf : dict
+        Dictionary of {attribute: cumulative distribution of its binning indices}.
+    sampling_order : list
+        Attributes in the Bayesian network, in the order they are sampled.
+    conditional_tables : dict
+        Dictionary of {child: (parents, parents instances, cumulative conditional distributions)}.
+    """
+
+    modes = ('random', 'independent', 'correlated')
+
+    def __init__(self, description: dict, mode='correlated', minimum=0, maximum=100):
+        if mode not in self.modes:
+            raise ValueError(f'Unknown mode {mode}. It should be one of {self.modes}.')
+
+        self.description = description
+        self.mode = mode
+        self.minimum = minimum
+        self.maximum = maximum
+        self.all_attributes = list(description['attribute_description'])
+        self.candidate_keys = set(description['meta']['candidate_keys'])
+        self.attr_to_column = {attr: parse_json(attr_info)
+                               for attr, attr_info in description['attribute_description'].items()}
+        self.attr_to_cdf = {attr: cumulative_distributions(column.distribution_probabilities)
+                            for attr, column in self.attr_to_column.items()}
+
+        if mode != 'random':
+            self.all_attributes = description['meta']['all_attributes']
+
+        self.sampling_order = []
+        self.root_cdf = None
+        self.conditional_tables = {}
+        if mode == 'correlated':
+            bn = description['bayesian_network']
+            self.sampling_order = SynthesizerModel.get_sampling_order(bn)
+            self.root_cdf = cumulative_distributions(description['conditional_probabilities'][bn[0][1][0]])
+            for child, parents in bn:
+                parents_instances, dists = parse_conditional_distributions(
+                    description['conditional_probabilities'][child], len(parents),
+                    len(self.attr_to_column[child].distribution_probabilities))
+                self.conditional_tables[child] = (parents, parents_instances, cumulative_distributions(dists))
+
+    @classmethod
+    def from_description_file(cls, description_file, mode='correlated', minimum=0, maximum=100):
+        return cls(read_json_file(description_file), mode, minimum, maximum)
+
+    @staticmethod
+    def get_sampling_order(bn):
+        order = [bn[0][1][0]]
+        for child, _ in bn:
+            order.append(child)
+        return order
+
+    def sample(self, n, seed=0, processes=1, chunk_size=100000, return_encoded_dataset=False):
+        """Generate a synthetic dataset of n tuples.
+
+        The dataset is generated in chunks of chunk_size tuples as in sample_chunks, which are spread over a pool of
+        processes if processes > 1. For the same seed and chunk_size, the dataset is identical for any processes.
+
+        Parameters
+        ----------
+        n : int
+            Number of tuples.
+        seed : int
+            Seed the random number generator.
+        processes : int
+            Number of processes. If None, use `os.cpu_count()`.
+        chunk_size : int
+            Number of tuples in each chunk.
+        return_encoded_dataset : bool
+            Also return the binning indices of the attributes in the Bayesian network in correlated mode.
+        """
+        chunks = list(self.iterate_chunks(n, chunk_size, seed, processes, return_encoded_dataset))
+        if return_encoded_dataset:
+            synthetic_chunks, encoded_chunks = zip(*chunks) if chunks else ((), ())
+            encoded_dataset = concat(encoded_chunks) if self.mode == 'correlated' and chunks else None
+            return self.concat_chunks(synthetic_chunks), encoded_dataset
+        return self.concat_chunks(chunks)
+
+    def sample_chunks(self, n, chunk_size=100000, seed=0, processes=1):
+        """Generate a synthetic dataset of n tuples as an iterator of DataFrames of chunk_size tuples.
+
+        Memory depends on chunk_size instead of n. The i-th chunk is drawn from the i-th child of the seed sequence of
+        seed, and candidate keys are unique across chunks. With processes > 1, chunks are generated by a pool of
+        processes, at most two chunks per process ahead of the consumer, and yielded in order.
+        """
+        return self.iterate_chunks(n, chunk_size, seed, processes)
+
+    def iterate_chunks(self, n, chunk_size=100000, seed=0, processes=1, return_encoded_dataset=False):
+        tasks = [(i, n, chunk_size, seed, return_encoded_dataset) for i in range(ceil(n / chunk_size))]
+        processes = processes or cpu_count() or 1
+        if processes == 1 or len(tasks) == 1:
+            for task in tasks:
+                yield self.generate_chunk(*task)
+            return
+
+        with Pool(processes, initializer=_attach_model, initargs=(self,)) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.apply_async(_generate_chunk, (task,)))
+                if len(pending) >= 2 * processes:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    def generate_chunk(self, i, n, chunk_size, seed=0, return_encoded_dataset=False):
+        """Generate the i-th chunk of a synthetic dataset of n tuples, split into chunks of chunk_size tuples.
+
+        A chunk only depends on the i-th child of the seed sequence of seed, not on other chunks or on the process.
+        """
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+        offset = i * chunk_size
+        size = min(chunk_size, n - offset)
+        encoded_dataset = self.generate_encoded_dataset(size, rng) if self.mode == 'correlated' else None
+        chunk = self.generate_dataset(size, rng, encoded_dataset, offset, n)
+        chunk.index = range(offset, offset + size)
+        if not return_encoded_dataset:
+            return chunk
+        if encoded_dataset is not None:
+            encoded_dataset.index = chunk.index
+        return chunk, encoded_dataset
+
+    def concat_chunks(self, chunks):
+        if chunks:
+            return concat(chunks)
+        return DataFrame(columns=self.all_attributes)
+
+    def generate_dataset(self, n, rng=None, encoded_dataset: DataFrame = None, offset=0, total=None):
+        """Generate a synthetic dataset of n tuples.
+
+        Parameters
+        ----------
+        n : int
+            Number of tuples.
+        rng : numpy.random.Generator
+            Random number generator. If None, use the global random state seeded by `utils.set_random_seed`.
+        encoded_dataset : DataFrame
+            Binning indices of the attributes in the Bayesian network, from generate_encoded_dataset. If None, they are
+            generated in correlated mode.
+        offset : int
+            Position of the first tuple, when this is a chunk of a dataset of total tuples. See
+            `AbstractAttribute.generate_values_as_candidate_key`.
+        total : int
+            Number of tuples in the whole dataset. If None, it is n.
+        """
+        if self.mode == 'random':
+            return self.generate_dataset_in_random_mode(n, rng, offset, total)
+
+        if self.mode == 'correlated' and encoded_dataset is None:
+            encoded_dataset = self.generate_encoded_dataset(n, rng)
+
+        synthetic_dataset = {}
+        for attr in self.all_attributes:
+            column = self.attr_to_column[attr]
+            if encoded_dataset is not None and attr in encoded_dataset:
+                synthetic_dataset[attr] = column.sample_values_from_binning_indices(encoded_dataset[attr], rng)
+            elif attr in self.candidate_keys:
+                synthetic_dataset[attr] = column.generate_values_as_candidate_key(n, rng, offset, total)
+            else:
+                # for attributes not in BN or candidate keys, use independent attribute mode.
+                binning_indices = Series(self.sample_binning_indices(attr, n, rng))
+                synthetic_dataset[attr] = column.sample_values_from_binning_indices(binning_indices, rng)
+        return DataFrame(synthetic_dataset, columns=self.all_attributes)
+
+    def generate_dataset_in_random_mode(self, n, rng=None, offset=0, total=None):
+        rng = random_generator(rng)
+        synthetic_dataset = {}
+        for attr, column in self.attr_to_column.items():
+            if column.is_candidate_key:
+                synthetic_dataset[attr] = column.generate_values_as_candidate_key(n, rng, offset, total)
+            elif column.is_categorical:
+                synthetic_dataset[attr] = rng.choice(column.distribution_bins, n)
+            elif column.data_type is DataType.STRING:
+                lengths = column.min + rng.choice(column.max - column.min + 1, n)
+                synthetic_dataset[attr] = generate_random_strings(lengths, rng)
+            elif column.data_type is DataType.INTEGER:
+                synthetic_dataset[attr] = self.minimum + rng.choice(self.maximum - self.minimum + 1, n)
+            else:
+                synthetic_dataset[attr] = rng.uniform(self.minimum, self.maximum, n)
+        return DataFrame(synthetic_dataset, columns=self.all_attributes)
+
+    def sample_binning_indices(self, attr, n, rng=None):
+        """Sample binning indices of an attribute from its distribution, as in independent attribute mode."""
+        return np.searchsorted(self.attr_to_cdf[attr], random_generator(rng).random(n), side='right')
+
+    def generate_encoded_dataset(self, n, rng=None):
+        """Sample binning indices of the attributes in the Bayesian network, following the sampling order."""
+        rng = random_generator(rng)
+        root = self.sampling_order[0]
+        encoded_dataset = {root: np.searchsorted(self.root_cdf, rng.random(n), side='right')}
+
+        for child in self.sampling_order[1:]:
+            parents, parents_instances, cdfs = self.conditional_tables[child]
+            parents_values = np.stack([encoded_dataset[parent] for parent in parents], axis=1)
+            rows = lookup_parents_instances(parents_instances, parents_values)
+            found = rows >= 0
+            values = np.empty(n, dtype=int)
+            values[found] = sample_from_cumulative_distributions(cdfs, rows[found], rng.random(found.sum()))
+
+            # parents instances missing from the conditional distributions use the unconditioned distribution.
+            values[~found] = self.sample_binning_indices(child, n - found.sum(), rng)
+            encoded_dataset[child] = values
+        return DataFrame(encoded_dataset, columns=self.sampling_order)
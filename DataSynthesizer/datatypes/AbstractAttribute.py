@@ -1,11 +1,9 @@
 from abc import ABCMeta, abstractmethod
-from bisect import bisect_right
 from random import uniform
 from typing import List, Union
 
 import numpy as np
-from numpy.random import choice
-from pandas import Series
+from pandas import Categorical, Series
 
 from DataSynthesizer.datatypes.utils import DataType
 from DataSynthesizer.lib import utils
@@ -66,9 +64,9 @@ class AbstractAttribute(object):
             self.distribution_bins = distribution[1][:-1]  # Remove the last bin edge
             self.distribution_probabilities = utils.normalize_given_distribution(distribution[0])
 
-    def inject_laplace_noise(self, epsilon, num_valid_attributes):
+    def inject_laplace_noise(self, epsilon, num_valid_attributes, num_tuples=None):
         if epsilon > 0:
-            sensitivity = 2 / self.data.size
+            sensitivity = 2 / (num_tuples or self.data.size)
             privacy_budget = epsilon / num_valid_attributes
             noise_scale = sensitivity / privacy_budget
             laplace_noises = np.random.laplace(0, scale=noise_scale, size=len(self.distribution_probabilities))
@@ -78,15 +76,26 @@ class AbstractAttribute(object):
     def encode_values_into_bin_idx(self):
         """Encode values into bin indices for Bayesian Network construction.
 
+        Missing values are encoded as len(distribution_bins). The indices are of the narrowest unsigned integer dtype.
         """
         if self.is_categorical:
-            value_to_bin_idx = {value: idx for idx, value in enumerate(self.distribution_bins)}
-            encoded = self.data.map(lambda x: value_to_bin_idx[x], na_action='ignore')
-        else:
-            encoded = self.data.map(lambda x: bisect_right(self.distribution_bins, x) - 1, na_action='ignore')
+            return self.encode_categorical_values(self.data)
+        return self.encode_numerical_values(self.data)
+
+    def encode_categorical_values(self, values: Series):
+        """Encode values into the positions of their categories in distribution_bins, by pandas Categorical codes."""
+        codes = Categorical(values, categories=self.distribution_bins).codes
+        return self.bin_indices_to_series(codes, codes < 0, values.index)
 
-        encoded.fillna(len(self.distribution_bins), inplace=True)
-        return encoded.astype(int, copy=False)
+    def encode_numerical_values(self, values: Series):
+        """Encode values into the indices of their bins, by binary search over the left bin edges."""
+        indices = np.searchsorted(self.distribution_bins, values.to_numpy(dtype=float), side='right') - 1
+        return self.bin_indices_to_series(indices.clip(min=0), values.isnull().to_numpy(), values.index)
+
+    def bin_indices_to_series(self, indices: np.ndarray, missing: np.ndarray, index):
+        num_bins = len(self.distribution_bins)
+        indices = np.where(missing, num_bins, indices).astype(np.min_scalar_type(num_bins))
+        return Series(indices, index=index, name=self.name)
 
     def to_json(self):
         """Encode attribution information in JSON format / Python dictionary.
@@ -103,24 +112,48 @@ class AbstractAttribute(object):
                 "distribution_probabilities": self.distribution_probabilities.tolist()}
 
     @abstractmethod
-    def generate_values_as_candidate_key(self, n):
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
         """When attribute should be a candidate key in output dataset.
 
+        The random number generator rng is either a `numpy.random.Generator` or None for the global random state seeded
+        by `utils.set_random_seed`. It is the same for the sampling methods below.
+
+        When a dataset of total tuples is generated in chunks, the n values of a chunk are those at positions [offset,
+        offset + n), so that values are unique across chunks. By default, total is n.
         """
-        return np.arange(n)
+        return np.arange(offset, offset + n)
 
-    def sample_binning_indices_in_independent_attribute_mode(self, n):
+    def sample_binning_indices_in_independent_attribute_mode(self, n, rng=None):
         """Sample an array of binning indices.
 
         """
-        return Series(choice(len(self.distribution_probabilities), size=n, p=self.distribution_probabilities))
+        rng = utils.random_generator(rng)
+        return Series(rng.choice(len(self.distribution_probabilities), size=n, p=self.distribution_probabilities))
 
     @abstractmethod
-    def sample_values_from_binning_indices(self, binning_indices):
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
         """Convert binning indices into values in domain. Used by both independent and correlated attribute mode.
 
+        All values are sampled at once. The bin index len(distribution_bins) stands for missing values. Non-categorical
+        values are drawn uniformly between the lower and upper edges of their bins, where the upper edge of the last bin
+        is self.max.
         """
-        return binning_indices.apply(lambda x: self.uniform_sampling_within_a_bin(x))
+        binning_indices = Series(binning_indices)
+        indices = binning_indices.to_numpy(dtype=int)
+        num_bins = len(self.distribution_bins)
+        missing = indices >= num_bins
+        indices = np.where(missing, 0, indices)
+
+        if self.is_categorical:
+            bins = np.asarray(self.distribution_bins)
+            if bins.dtype.kind in 'US':
+                bins = bins.astype(object)
+            values = bins[indices]
+        else:
+            edges = np.append(np.asarray(self.distribution_bins, dtype=float), self.max)
+            values = utils.random_generator(rng).uniform(edges[indices], edges[indices + 1])
+
+        return Series(values, index=binning_indices.index).where(~missing)
 
     def uniform_sampling_within_a_bin(self, bin_idx: int):
         num_bins = len(self.distribution_bins)
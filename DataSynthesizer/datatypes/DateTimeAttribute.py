@@ -1,25 +1,31 @@
-from bisect import bisect_right
 from typing import Union
 
 import numpy as np
 from dateutil.parser import parse
-from pandas import Series, concat
+from pandas import Series, Timestamp, to_datetime
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
 
 from DataSynthesizer.datatypes.AbstractAttribute import AbstractAttribute
 from DataSynthesizer.datatypes.utils.DataType import DataType
 from DataSynthesizer.lib.utils import normalize_given_distribution
 
 
+WEEKDAYS = {'mon', 'monday', 'tue', 'tuesday', 'wed', 'wednesday', 'thu', 'thursday', 'fri', 'friday',
+            'sat', 'saturday', 'sun', 'sunday'}
+MONTHS = {'jan', 'january', 'feb', 'february', 'mar', 'march', 'apr', 'april', 'may', 'may', 'jun', 'june',
+          'jul', 'july', 'aug', 'august', 'sep', 'sept', 'september', 'oct', 'october', 'nov', 'november',
+          'dec', 'december'}
+WEEKDAYS_AND_MONTHS = list(WEEKDAYS | MONTHS)
+
+
 def is_datetime(value: str):
     """Find whether a value is a datetime. Here weekdays and months are categorical values instead of datetime."""
-    weekdays = {'mon', 'monday', 'tue', 'tuesday', 'wed', 'wednesday', 'thu', 'thursday', 'fri', 'friday',
-                'sat', 'saturday', 'sun', 'sunday'}
-    months = {'jan', 'january', 'feb', 'february', 'mar', 'march', 'apr', 'april', 'may', 'may', 'jun', 'june',
-              'jul', 'july', 'aug', 'august', 'sep', 'sept', 'september', 'oct', 'october', 'nov', 'november',
-              'dec', 'december'}
-
     value_lower = value.lower()
-    if (value_lower in weekdays) or (value_lower in months):
+    if (value_lower in WEEKDAYS) or (value_lower in MONTHS):
         return False
     try:
         parse(value)
@@ -28,14 +34,89 @@ def is_datetime(value: str):
         return False
 
 
-# TODO detect datetime formats
+def are_datetimes(values: Series, strict=False):
+    """Find whether all values are datetimes, as is_datetime does for each of them.
+
+    Values matching the format guessed from the first value are parsed at once by `pandas.to_datetime`. Only the others
+    are parsed one by one, stopping at the first one which is not a datetime. If strict, all values must match the
+    format.
+    """
+    strings = np.asarray(values, dtype=str)
+    if np.isin(np.char.lower(strings), WEEKDAYS_AND_MONTHS).any():
+        return False
+    matched = match_datetime_format(strings)
+    if strict:
+        return bool(matched.all())
+    return all(is_datetime(value) for value in strings[~matched])
+
+
+def match_datetime_format(values, datetime_format: str = None):
+    """Whether each value matches datetime_format, or the format guessed from the first value if None."""
+    strings = np.asarray(values, dtype=str)
+    if datetime_format is None and strings.size:
+        datetime_format = guess_datetime_format(str(strings[0]))
+    if datetime_format is None:
+        return np.zeros(strings.size, dtype=bool)
+    parsed = to_datetime(strings, format=datetime_format, errors='coerce', utc='%z' in datetime_format)
+    return np.asarray(parsed.notna())
+
+
+def infer_datetime_format(values: Series, sample_size=100):
+    """Infer the format shared by datetime strings, from a sample of them.
+
+    Return the most common format guessed for the sampled values, or None if no format can be guessed.
+    """
+    samples = values.dropna().drop_duplicates().head(sample_size).astype(str)
+    formats = samples.map(guess_datetime_format).dropna()
+    if formats.empty:
+        return None
+    return formats.value_counts().index[0]
+
+
+def seconds_since_epoch(value: str):
+    datetime = parse(value)
+    if datetime.tzinfo is not None:
+        datetime = Timestamp(datetime).tz_convert(None)
+    return int((datetime - parse('1970-01-01')).total_seconds())
+
+
+def parse_datetimes_into_timestamps(values: Series, datetime_format: str = None):
+    """Convert datetime strings into integer seconds since 1970-01-01.
+
+    The whole column is converted by `pandas.to_datetime` with datetime_format, which is inferred from the values if
+    None. Only the values failing to match the format are parsed one by one by `dateutil`. Datetimes with time zones
+    are converted into UTC.
+
+    Parameters
+    ----------
+    values : Series
+        Datetime strings without missing values.
+    datetime_format : str
+        Format in the syntax of `datetime.strptime`.
+    """
+    values = values.astype(str)
+    datetime_format = datetime_format or infer_datetime_format(values)
+    timestamps = Series(0, index=values.index, dtype=np.int64)
+    failed = np.ones(values.size, dtype=bool)
+    if datetime_format:
+        datetimes = to_datetime(values, format=datetime_format, errors='coerce', utc='%z' in datetime_format)
+        if datetimes.dt.tz is not None:
+            datetimes = datetimes.dt.tz_convert(None)
+        failed = datetimes.isnull().to_numpy()
+        seconds = (datetimes[~failed] - Timestamp('1970-01-01')).dt.total_seconds()
+        timestamps[~failed] = seconds.astype(np.int64)
+    if failed.any():
+        timestamps[failed] = values[failed].map(seconds_since_epoch).astype(np.int64)
+    return timestamps
+
+
 class DateTimeAttribute(AbstractAttribute):
     def __init__(self, name: str, is_candidate_key, is_categorical, histogram_size: Union[int, str], data: Series):
         super().__init__(name, is_candidate_key, is_categorical, histogram_size, data)
         self.is_numerical = True
         self.data_type = DataType.DATETIME
-        epoch_datetime = parse('1970-01-01')
-        self.timestamps = self.data_dropna.map(lambda x: int((parse(x) - epoch_datetime).total_seconds()))
+        self.datetime_format = infer_datetime_format(self.data_dropna)
+        self.timestamps = parse_datetimes_into_timestamps(self.data_dropna, self.datetime_format)
 
     def infer_domain(self, categorical_domain=None, numerical_range=None):
         if numerical_range:
@@ -61,6 +142,7 @@ class DateTimeAttribute(AbstractAttribute):
             self.distribution_bins = np.array(distribution.index)
         else:
             distribution = np.histogram(self.timestamps, bins=self.histogram_size, range=(self.min, self.max))
+            self.distribution_bins = distribution[1][:-1]  # Remove the last bin edge
             self.distribution_probabilities = normalize_given_distribution(distribution[0])
 
     def encode_values_into_bin_idx(self):
@@ -68,20 +150,68 @@ class DateTimeAttribute(AbstractAttribute):
 
         """
         if self.is_categorical:
-            value_to_bin_idx = {value: idx for idx, value in enumerate(self.distribution_bins)}
-            encoded = self.data.map(lambda x: value_to_bin_idx[x], na_action='ignore')
-        else:
-            encoded = self.timestamps.map(lambda x: bisect_right(self.distribution_bins, x) - 1, na_action='ignore')
-            encoded = concat([encoded, self.data], axis=1).iloc[:, 0]
+            return self.encode_categorical_values(self.data)
+        return self.encode_numerical_values(self.timestamps.reindex(self.data.index))
+
+    def to_json(self):
+        """Encode attribution information in JSON format / Python dictionary, including the datetime format.
 
-        encoded.fillna(len(self.distribution_bins), inplace=True)
-        return encoded.astype(int, copy=False)
+        """
+        return {**super().to_json(), "datetime_format": self.datetime_format}
 
-    def generate_values_as_candidate_key(self, n):
-        return np.arange(self.min, self.max, (self.min - self.max) / n)
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
+        """Datetimes spread evenly over [min, max], rendered in datetime_format.
 
-    def sample_values_from_binning_indices(self, binning_indices):
-        column = super().sample_values_from_binning_indices(binning_indices)
+        Keys are whole units of the resolution of datetime_format, e.g., days for '%Y-%m-%d', so that they stay
+        distinct when rendered. If the range has fewer such units than total, keys are distinct seconds since
+        1970-01-01 instead, which go beyond max if the range has fewer seconds than total.
+        """
+        total = total or n
+        positions = np.arange(offset, offset + n)
+        resolution = self.format_resolution()
+        if resolution is not None:
+            first_unit, last_unit = np.ceil(self.min / resolution), np.floor(self.max / resolution)
+            num_units = last_unit - first_unit + 1
+            if num_units >= total:
+                units = first_unit + np.floor(positions * (num_units / total))
+                return np.asarray(self.format_timestamps(units * resolution))
+
+        step = max((np.floor(self.max) - np.ceil(self.min) + 1) / total, 1)
+        return (np.ceil(self.min) + np.floor(positions * step)).astype(np.int64)
+
+    def format_resolution(self):
+        """The resolution in seconds of datetime_format, i.e., the finest of a second, a minute, an hour and a day at
+        which datetimes rendered in datetime_format parse back into themselves, or None if there is none."""
+        if self.datetime_format is None:
+            return 1
+        for resolution in (1, 60, 3600, 86400):
+            probes = np.floor(np.array([self.min, (self.min + self.max) / 2, self.max]) / resolution) * resolution
+            probes = np.concatenate([probes, probes + resolution])
+            rendered = self.format_timestamps(probes)
+            parsed = parse_datetimes_into_timestamps(rendered, self.datetime_format)
+            if np.array_equal(parsed.to_numpy(), probes):
+                return resolution
+        return None
+
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
+        column = super().sample_values_from_binning_indices(binning_indices, rng)
         if not self.is_categorical:
-            column[~column.isnull()] = column[~column.isnull()].astype(int)
+            column = self.format_timestamps(np.trunc(column))
         return column
+
+    def format_timestamps(self, timestamps):
+        """Render seconds since 1970-01-01 as strings in datetime_format, in one pass over the column.
+
+        Timestamps are returned as they are if datetime_format is unknown, e.g., in descriptions without it. Missing
+        values stay missing.
+        """
+        if self.datetime_format is None:
+            return timestamps
+
+        timestamps = Series(timestamps)
+        missing = timestamps.isnull().to_numpy()
+        seconds = timestamps.fillna(0).to_numpy(dtype=np.int64).astype('datetime64[s]')
+        datetimes = Series(seconds, index=timestamps.index)
+        if '%z' in self.datetime_format:
+            datetimes = datetimes.dt.tz_localize('UTC')
+        return datetimes.dt.strftime(self.datetime_format).where(~missing)
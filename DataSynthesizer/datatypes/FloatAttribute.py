@@ -19,8 +19,8 @@ class FloatAttribute(AbstractAttribute):
     def infer_distribution(self):
         super().infer_distribution()
 
-    def generate_values_as_candidate_key(self, n):
-        return arange(self.min, self.max, (self.max - self.min) / n)
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
+        return self.min + arange(offset, offset + n) * (self.max - self.min) / (total or n)
 
-    def sample_values_from_binning_indices(self, binning_indices):
-        return super().sample_values_from_binning_indices(binning_indices)
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
+        return super().sample_values_from_binning_indices(binning_indices, rng)
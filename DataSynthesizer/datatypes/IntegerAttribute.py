@@ -20,11 +20,9 @@ class IntegerAttribute(AbstractAttribute):
     def infer_distribution(self):
         super().infer_distribution()
 
-    def generate_values_as_candidate_key(self, n):
-        return super().generate_values_as_candidate_key(n)
-
-    def sample_values_from_binning_indices(self, binning_indices):
-        column = super().sample_values_from_binning_indices(binning_indices)
-        column = column.round()
-        column[~column.isnull()] = column[~column.isnull()].astype(int)
-        return column
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
+        return super().generate_values_as_candidate_key(n, rng, offset, total)
+
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
+        column = super().sample_values_from_binning_indices(binning_indices, rng)
+        return column.round()
@@ -5,6 +5,7 @@ from pandas import Series
 
 from DataSynthesizer.datatypes.AbstractAttribute import AbstractAttribute
 from DataSynthesizer.datatypes.utils.DataType import DataType
+from DataSynthesizer.lib import utils
 
 
 def pre_process(column: Series):
@@ -34,6 +35,24 @@ def is_ssn(value):
     return False
 
 
+def are_ssns(values: Series):
+    """Find whether all values are SocialSecurityNumbers, as is_ssn does for each of them, by vectorized string
+    operations."""
+    values = np.asarray(values, dtype=object)
+    types = np.frompyfunc(type, 1, 1)(values)
+    if not np.all((types == int) | (types == str)):
+        return False
+    strings = values.astype(str)
+    digits = np.where(types == str, np.char.replace(strings, '-', ''), strings)
+    if not np.char.isdigit(digits).all():
+        return False
+    try:
+        numbers = digits.astype(float)
+    except ValueError:  # digits other than 0-9
+        return False
+    return bool(((numbers > 0) & (numbers < 1e9)).all())
+
+
 class SocialSecurityNumberAttribute(AbstractAttribute):
     """SocialSecurityNumber of format AAA-GG-SSSS."""
 
@@ -50,14 +69,21 @@ class SocialSecurityNumberAttribute(AbstractAttribute):
     def infer_distribution(self):
         super().infer_distribution()
 
-    def generate_values_as_candidate_key(self, n):
-        if n < 1e9:
-            values = np.linspace(0, 1e9 - 1, num=n, dtype=int)
-            values = np.random.permutation(values)
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
+        total = total or n
+        if total < 1e9:
+            # evenly spaced in [0, 1e9 - 1] over all total values, and shuffled within the chunk.
+            values = np.arange(offset, offset + n) * int(1e9 - 1) // max(total - 1, 1)
+            values = utils.random_generator(rng).permutation(values)
             values = [str(i).zfill(9) for i in values]
             return ['{}-{}-{}'.format(i[:3], i[3:5], i[5:]) for i in values]
         else:
             raise Exception('The candidate key "{}" cannot generate more than 1e9 distinct values.', self.name)
 
-    def sample_values_from_binning_indices(self, binning_indices):
-        return super().sample_binning_indices_in_independent_attribute_mode(binning_indices)
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
+        column = super().sample_values_from_binning_indices(binning_indices, rng)
+        not_null = column.notnull()
+        digits = column[not_null].astype(int).astype(str).str.zfill(9)
+        column = column.astype(object)
+        column[not_null] = digits.str[:3] + '-' + digits.str[3:5] + '-' + digits.str[5:]
+        return column
@@ -49,14 +49,17 @@ class StringAttribute(AbstractAttribute):
             self.distribution_bins = distribution[1][:-1]
             self.distribution_probabilities = utils.normalize_given_distribution(distribution[0])
 
-    def generate_values_as_candidate_key(self, n):
-        length = np.random.randint(self.min, self.max + 1)
-        vectorized = np.vectorize(lambda x: '{}{}'.format(utils.generate_random_string(length), x))
-        return vectorized(np.arange(n))
+    def generate_values_as_candidate_key(self, n, rng=None, offset=0, total=None):
+        rng = utils.random_generator(rng)
+        length = self.min + rng.choice(self.max - self.min + 1)
+        prefixes = utils.generate_random_strings(np.full(n, length), rng)
+        return (prefixes + Series(np.arange(offset, offset + n)).astype(str)).to_numpy(dtype=object)
 
-    def sample_values_from_binning_indices(self, binning_indices):
-        column = super().sample_values_from_binning_indices(binning_indices)
+    def sample_values_from_binning_indices(self, binning_indices, rng=None):
+        column = super().sample_values_from_binning_indices(binning_indices, rng)
         if not self.is_categorical:
-            column[~column.isnull()] = column[~column.isnull()].apply(lambda x: utils.generate_random_string(int(x)))
+            not_null = column.notnull()
+            strings = utils.generate_random_strings(column.where(not_null, 0).astype(int), rng)
+            column = strings.set_axis(column.index).where(not_null)
 
         return column
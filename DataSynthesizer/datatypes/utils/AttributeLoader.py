@@ -32,5 +32,7 @@ def parse_json(attribute_in_json):
     attribute.max = attribute_in_json['max']
     attribute.distribution_bins = attribute_in_json['distribution_bins']
     attribute.distribution_probabilities = attribute_in_json['distribution_probabilities']
+    if data_type is DataType.DATETIME:
+        attribute.datetime_format = attribute_in_json.get('datetime_format')
 
     return attribute
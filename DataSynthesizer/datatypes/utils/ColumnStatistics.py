@@ -0,0 +1,429 @@
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+from pandas import Categorical, Index, Series
+from pandas.api.types import is_numeric_dtype
+from pandas.util import hash_array
+
+from DataSynthesizer.datatypes.AbstractAttribute import AbstractAttribute
+from DataSynthesizer.datatypes.DateTimeAttribute import parse_datetimes_into_timestamps
+from DataSynthesizer.datatypes.utils.DataType import DataType
+from DataSynthesizer.lib import utils
+from DataSynthesizer.lib.HyperLogLog import HyperLogLog
+
+
+class ColumnStatistics(object):
+    """Statistics of a column, accumulated over chunks of a dataset in one pass.
+
+    They are what DataDescriber needs to describe the attribute without holding the column in memory, i.e., the number
+    of missing values, the range, the value counts while the attribute may be categorical, whether all values are unique,
+    and the histogram of string lengths. If directory is given, the numerical values (timestamps for DateTime) are also
+    appended to a file in it, from which the histogram over the final range is computed after the pass, unless it is
+    accumulated over numerical_range. If keep_codes, the numerical values of all numerical attributes and the codes of
+    values in order of first appearance are kept as well, from which the binning indices are computed after the pass.
+
+    Statistics without such files can be merged with those of other parts of the dataset, see merge. Then the histogram
+    of a numerical attribute is either accumulated over numerical_range, or computed from its value counts, which are
+    kept up to max_distinct_values distinct values.
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute.
+    data_type : DataType
+        Data type of the attribute.
+    is_categorical : bool
+        Whether the attribute is categorical. If None, it is decided by category_threshold after the pass.
+    category_threshold : int
+        Categorical attributes have no more than this number of distinct values.
+    is_candidate_key : bool
+        Whether the attribute is a candidate key. If None, it is decided by whether all values are unique.
+    datetime_format : str
+        Format of DateTime values, see `DateTimeAttribute.parse_datetimes_into_timestamps`.
+    directory : str
+        Directory of the files of values and codes. If None, they are not kept.
+    numerical_range : list
+        Range [min, max] over which the histogram of histogram_size bins of a numerical attribute is accumulated.
+    histogram_size : int
+        Number of bins of the histogram over numerical_range.
+    max_distinct_values : int
+        Value counts of a numerical attribute are kept up to this number of distinct values, even if it is not
+        categorical.
+    sketch_precision : int
+        Precision of the HyperLogLog sketch of the values, by which the hashes are dropped as soon as the values are
+        unlikely to be unique. If None, they are only dropped once a chunk has duplicates.
+    keep_codes : bool
+        Whether the files in directory also keep what encode_values_into_bin_idx needs.
+    """
+
+    def __init__(self, name: str, data_type: DataType, is_categorical: bool = None, category_threshold=20,
+                 is_candidate_key: bool = None, datetime_format: str = None, directory: str = None,
+                 numerical_range: List = None, histogram_size: Union[int, str] = 20, max_distinct_values: int = None,
+                 sketch_precision: int = 14, keep_codes=True):
+        self.name = name
+        self.data_type = data_type
+        self.is_categorical = is_categorical
+        self.category_threshold = category_threshold
+        self.datetime_format = datetime_format
+        self.is_numerical = data_type is not DataType.STRING
+
+        self.num_tuples = 0
+        self.num_missing = 0
+        self.dtype = None
+        self.min = np.inf
+        self.max = -np.inf
+        self.is_integer = True
+        self.length_counts = np.zeros(0, dtype=np.int64)
+
+        # value counts in order of first appearance, dropped once there are more than max_value_counts.
+        if is_categorical:
+            self.max_value_counts = np.inf
+        else:
+            self.max_value_counts = category_threshold if is_categorical is None else 0
+        if self.is_numerical and max_distinct_values:
+            self.max_value_counts = max(self.max_value_counts, max_distinct_values)
+        self.value_counts = {} if self.max_value_counts else None
+
+        self.histogram = None
+        self.histogram_range = None
+        if self.is_numerical and numerical_range and not isinstance(histogram_size, str):
+            self.histogram = np.zeros(histogram_size, dtype=np.int64)
+            # the range of Integer attributes is cast into integers by infer_domain.
+            if data_type in {DataType.INTEGER, DataType.SOCIAL_SECURITY_NUMBER}:
+                numerical_range = [int(bound) for bound in numerical_range]
+            self.histogram_range = tuple(numerical_range)
+
+        # hashes of the values of each chunk, dropped once a duplicate is found or the sketch finds them unlikely to be
+        # unique, otherwise checked exactly after the pass.
+        track_uniqueness = is_candidate_key is None and data_type not in {DataType.FLOAT, DataType.DATETIME}
+        self.hashes = [] if track_uniqueness else None
+        self.sketch = HyperLogLog(sketch_precision) if track_uniqueness and sketch_precision is not None else None
+        self.is_unique = bool(is_candidate_key)
+
+        self.values_file = None
+        self.codes_file = None
+        if directory is not None:
+            if self.is_numerical and (keep_codes or (self.histogram is None and not is_categorical)):
+                self.values_file = Path(directory) / f'{id(self)}.values'
+                self.values_file.touch()
+            if keep_codes and self.value_counts is not None:
+                self.codes_file = Path(directory) / f'{id(self)}.codes'
+                self.codes_file.touch()
+
+    def to_json(self):
+        """Encode the statistics into a JSON dictionary and a dictionary of {name: np.ndarray}, see from_json.
+
+        Statistics with files of values cannot be encoded, as the files are removed with the working directory.
+        """
+        if self.values_file or self.codes_file:
+            raise ValueError(f'Statistics of attribute {self.name} with files of values cannot be saved.')
+        info = {'name': self.name,
+                'data_type': self.data_type.value,
+                'is_categorical': self.is_categorical,
+                'category_threshold': self.category_threshold,
+                'datetime_format': self.datetime_format,
+                'num_tuples': self.num_tuples,
+                'num_missing': self.num_missing,
+                'dtype': None if self.dtype is None else np.dtype(self.dtype).str,
+                'min': float(self.min),
+                'max': float(self.max),
+                'is_integer': bool(self.is_integer),
+                'max_value_counts': float(self.max_value_counts),
+                'value_counts': None,
+                'histogram_range': None if self.histogram_range is None else [float(x) for x in self.histogram_range],
+                'has_hashes': self.hashes is not None,
+                'sketch_precision': None if self.sketch is None else self.sketch.precision,
+                'is_unique': bool(self.is_unique)}
+        arrays = {'length_counts': self.length_counts}
+        if self.value_counts is not None:
+            info['value_counts'] = [[value.item() if isinstance(value, np.generic) else value, int(count)]
+                                    for value, count in self.value_counts.items()]
+        if self.histogram is not None:
+            arrays['histogram'] = self.histogram
+        if self.hashes is not None:
+            arrays['hashes'] = np.concatenate(self.hashes) if self.hashes else np.zeros(0, dtype=np.uint64)
+        if self.sketch is not None:
+            arrays['sketch_registers'] = self.sketch.registers
+        return info, arrays
+
+    @classmethod
+    def from_json(cls, info: dict, arrays: dict):
+        """Decode the statistics encoded by to_json."""
+        statistics = cls(info['name'], DataType(info['data_type']), info['is_categorical'], info['category_threshold'],
+                         datetime_format=info['datetime_format'])
+        statistics.num_tuples = info['num_tuples']
+        statistics.num_missing = info['num_missing']
+        statistics.dtype = None if info['dtype'] is None else np.dtype(info['dtype'])
+        statistics.min = info['min']
+        statistics.max = info['max']
+        statistics.is_integer = info['is_integer']
+        statistics.length_counts = arrays['length_counts']
+        statistics.max_value_counts = info['max_value_counts']
+        statistics.value_counts = None if info['value_counts'] is None else dict(info['value_counts'])
+        statistics.histogram = arrays.get('histogram')
+        statistics.histogram_range = None if info['histogram_range'] is None else tuple(info['histogram_range'])
+        statistics.hashes = [arrays['hashes']] if info['has_hashes'] else None
+        statistics.sketch = None
+        if info['sketch_precision'] is not None:
+            statistics.sketch = HyperLogLog(info['sketch_precision'])
+            statistics.sketch.registers = arrays['sketch_registers']
+        statistics.is_unique = info['is_unique']
+        return statistics
+
+    @property
+    def num_distinct_values(self):
+        return len(self.value_counts) if self.value_counts is not None else np.inf
+
+    def update(self, column: Series):
+        """Accumulate the statistics of a chunk of the column."""
+        values = self.convert_values(column)
+        values_dropna = values.dropna()
+        self.num_tuples += values.size
+        self.num_missing += values.size - values_dropna.size
+
+        if self.data_type is DataType.STRING:
+            lengths = values_dropna.str.len().to_numpy(dtype=np.int64)
+            counts = np.bincount(lengths)
+            if counts.size > self.length_counts.size:
+                self.length_counts = np.pad(self.length_counts, (0, counts.size - self.length_counts.size))
+            self.length_counts[:counts.size] += counts
+        else:
+            numbers = self.convert_numbers(values, values_dropna)
+            numbers_dropna = numbers[~np.isnan(numbers)]
+            if numbers_dropna.size:
+                self.min = min(self.min, numbers_dropna.min())
+                self.max = max(self.max, numbers_dropna.max())
+                self.is_integer = self.is_integer and np.array_equal(numbers_dropna, numbers_dropna.astype(int))
+            if self.histogram is not None:
+                self.histogram += np.histogram(numbers_dropna, bins=self.histogram.size, range=self.histogram_range)[0]
+            if self.values_file is not None:
+                with open(self.values_file, 'ab') as file:
+                    numbers.tofile(file)
+
+        if self.hashes is not None:
+            self.update_hashes(column, values)
+        if self.value_counts is not None:
+            self.update_value_counts(values, values_dropna)
+
+    def convert_values(self, column: Series):
+        """Convert a chunk of raw values into those of the attribute, e.g., integers for SocialSecurityNumber."""
+        if self.data_type is DataType.SOCIAL_SECURITY_NUMBER:
+            return column.map(lambda x: int(x.replace('-', '')) if isinstance(x, str) else x, na_action='ignore')
+        if self.data_type in {DataType.INTEGER, DataType.FLOAT} and not is_numeric_dtype(column.dtype):
+            raise ValueError(f'Attribute {self.name} is inferred as {self.data_type.value} from the first chunk, but '
+                             f'has non-numerical values in later chunks. Specify its data type in attribute_to_datatype.')
+        if self.data_type in {DataType.STRING, DataType.DATETIME}:
+            return column.astype(object).where(column.notnull())
+        self.dtype = np.result_type(self.dtype or column.dtype, column.dtype)
+        return column
+
+    def convert_numbers(self, values: Series, values_dropna: Series):
+        if self.data_type is DataType.DATETIME:
+            timestamps = parse_datetimes_into_timestamps(values_dropna, self.datetime_format)
+            return timestamps.reindex(values.index).to_numpy(dtype=float)
+        return values.to_numpy(dtype=float)
+
+    def update_hashes(self, column: Series, values: Series):
+        if self.is_numerical:
+            hashes = hash_array(values.to_numpy(dtype=float))
+        else:
+            hashes = hash_array(column.astype(object).to_numpy())
+        if self.sketch is not None:
+            self.sketch.update_hashes(hashes)
+        if np.unique(hashes).size < hashes.size or (self.sketch and not self.sketch.is_likely_unique(self.num_tuples)):
+            self.drop_hashes()
+        else:
+            self.hashes.append(hashes)
+
+    def drop_hashes(self):
+        self.hashes = None
+        self.sketch = None
+
+    def update_value_counts(self, values: Series, values_dropna: Series):
+        counts = values_dropna.value_counts()
+        for value in values_dropna.unique():
+            self.value_counts[value] = self.value_counts.get(value, 0) + int(counts[value])
+
+        if len(self.value_counts) > self.max_value_counts:
+            self.value_counts = None
+            if self.codes_file is not None:
+                self.codes_file.unlink()
+                self.codes_file = None
+        elif self.codes_file is not None:
+            codes = Categorical(values, categories=self.value_index()).codes.astype(np.int32)
+            with open(self.codes_file, 'ab') as file:
+                codes.tofile(file)
+
+    def merge(self, other: 'ColumnStatistics'):
+        """Merge the statistics of another part of the dataset into these, as if both parts were accumulated in one
+        pass. Integer and Float statistics merge into Float ones."""
+        if self.values_file or self.codes_file or other.values_file or other.codes_file:
+            raise ValueError(f'Statistics of attribute {self.name} with files of values cannot be merged.')
+        if self.data_type is not other.data_type:
+            if {self.data_type, other.data_type} != {DataType.INTEGER, DataType.FLOAT}:
+                raise ValueError(f'Attribute {self.name} is {self.data_type.value} in one part of the dataset, but '
+                                 f'{other.data_type.value} in another. Specify its data type in attribute_to_datatype.')
+            self.data_type = DataType.FLOAT
+
+        self.num_tuples += other.num_tuples
+        self.num_missing += other.num_missing
+        if self.dtype is None or other.dtype is None:
+            self.dtype = self.dtype or other.dtype
+        else:
+            self.dtype = np.result_type(self.dtype, other.dtype)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.is_integer = self.is_integer and other.is_integer
+        if other.length_counts.size > self.length_counts.size:
+            self.length_counts = np.pad(self.length_counts, (0, other.length_counts.size - self.length_counts.size))
+        self.length_counts[:other.length_counts.size] += other.length_counts
+
+        if self.value_counts is None or other.value_counts is None:
+            self.value_counts = None
+        else:
+            for value, count in other.value_counts.items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > self.max_value_counts:
+                self.value_counts = None
+
+        if self.hashes is None or other.hashes is None:
+            self.drop_hashes()
+        else:
+            self.hashes.extend(other.hashes)
+            if self.sketch is None or other.sketch is None:
+                self.sketch = None
+            else:
+                self.sketch.merge(other.sketch)
+                if not self.sketch.is_likely_unique(self.num_tuples):
+                    self.drop_hashes()
+        self.is_unique = self.is_unique and other.is_unique
+
+        if self.histogram is not None and other.histogram_range == self.histogram_range:
+            self.histogram = self.histogram + other.histogram
+        else:
+            self.histogram = None
+
+    def finalize(self):
+        """Decide whether the attribute is unique, after all chunks are accumulated."""
+        if self.hashes is not None:
+            hashes = np.concatenate(self.hashes) if self.hashes else np.zeros(0, dtype=np.uint64)
+            self.is_unique = np.unique(hashes).size == self.num_tuples
+            self.drop_hashes()
+
+    def value_index(self):
+        """Index of the values in order of first appearance."""
+        dtype = self.dtype if self.data_type in {DataType.INTEGER, DataType.FLOAT} else None
+        return Index(list(self.value_counts), dtype=dtype)
+
+    def value_numbers(self):
+        """Numerical values of value_index, e.g., timestamps for DateTime."""
+        values = Series(self.value_index())
+        return self.convert_numbers(values, values.dropna())
+
+    def infer_domain(self, column: AbstractAttribute, categorical_domain=None, numerical_range=None):
+        """Infer the domain of the attribute as `column.infer_domain` does from the whole column."""
+        if self.data_type is DataType.STRING:
+            numerical_range = None
+            lengths = np.flatnonzero(self.length_counts)
+            if categorical_domain:
+                column.min = min(len(i) for i in categorical_domain)
+                column.max = max(len(i) for i in categorical_domain)
+            else:
+                column.min = int(lengths.min())
+                column.max = int(lengths.max())
+        elif categorical_domain and self.data_type is not DataType.DATETIME:
+            column.min = min(categorical_domain)
+            column.max = max(categorical_domain)
+        elif numerical_range:
+            column.min, column.max = numerical_range
+        else:
+            column.min = float(self.min)
+            column.max = float(self.max)
+
+        if categorical_domain and self.data_type is not DataType.DATETIME:
+            column.distribution_bins = np.array(categorical_domain)
+        elif column.is_categorical and not numerical_range:
+            column.distribution_bins = np.asarray(self.value_index())
+        else:
+            column.distribution_bins = np.array([column.min, column.max])
+
+        if self.data_type in {DataType.INTEGER, DataType.SOCIAL_SECURITY_NUMBER}:
+            column.min = int(column.min)
+            column.max = int(column.max)
+        column.missing_rate = self.num_missing / (self.num_tuples or 1)
+        column.distribution_probabilities = np.full_like(column.distribution_bins, 1 / column.distribution_bins.size)
+
+    def infer_distribution(self, column: AbstractAttribute, block_size=1000000):
+        """Infer the distribution of the attribute as `column.infer_distribution` does from the whole column."""
+        if column.is_categorical:
+            distribution = Series(list(self.value_counts.values()), index=self.value_index())
+            for value in set(column.distribution_bins) - set(distribution.index):
+                distribution[value] = 0
+            distribution.sort_index(inplace=True)
+            column.distribution_probabilities = utils.normalize_given_distribution(distribution)
+            column.distribution_bins = np.array(distribution.index)
+            return
+
+        if self.data_type is DataType.STRING:
+            lengths = np.flatnonzero(self.length_counts)
+            if isinstance(column.histogram_size, str):
+                frequencies, edges = np.histogram(np.repeat(lengths, self.length_counts[lengths]), column.histogram_size)
+            else:
+                frequencies, edges = np.histogram(lengths, bins=column.histogram_size, range=(lengths.min(), lengths.max()),
+                                                  weights=self.length_counts[lengths])
+        elif self.values_file is None:
+            frequencies, edges = self.histogram_from_counts(column)
+        elif isinstance(column.histogram_size, str):
+            values = np.fromfile(self.values_file, dtype=float)
+            frequencies, edges = np.histogram(values[~np.isnan(values)], bins=column.histogram_size,
+                                              range=(column.min, column.max))
+        else:
+            frequencies = np.zeros(column.histogram_size, dtype=np.int64)
+            edges = None
+            for values in self.iterate_blocks(self.values_file, float, block_size):
+                counts, edges = np.histogram(values[~np.isnan(values)], bins=column.histogram_size,
+                                             range=(column.min, column.max))
+                frequencies += counts
+            if edges is None:
+                edges = np.histogram_bin_edges([], bins=column.histogram_size, range=(column.min, column.max))
+        column.distribution_bins = edges[:-1]  # Remove the last bin edge
+        column.distribution_probabilities = utils.normalize_given_distribution(frequencies)
+
+    def histogram_from_counts(self, column: AbstractAttribute):
+        """Histogram over the range of the attribute, from the histogram accumulated over the same range or from the
+        value counts."""
+        bins_range = (column.min, column.max)
+        if self.histogram is not None and bins_range == self.histogram_range:
+            return self.histogram, np.histogram_bin_edges([], bins=self.histogram.size, range=bins_range)
+        if self.value_counts is None:
+            raise ValueError(f'Attribute {self.name} has too many distinct values to compute its histogram. Specify its '
+                             f'range in numerical_attribute_ranges.')
+
+        numbers = self.value_numbers()
+        counts = np.fromiter(self.value_counts.values(), dtype=np.int64, count=len(self.value_counts))
+        valid = ~np.isnan(numbers)
+        if isinstance(column.histogram_size, str):
+            return np.histogram(np.repeat(numbers[valid], counts[valid]), bins=column.histogram_size, range=bins_range)
+        return np.histogram(numbers[valid], bins=column.histogram_size, range=bins_range, weights=counts[valid])
+
+    def encode_values_into_bin_idx(self, column: AbstractAttribute, out: np.ndarray, block_size=1000000):
+        """Write the bin indices of all values into out, as `column.encode_values_into_bin_idx` does."""
+        start = 0
+        if column.is_categorical:
+            # codes are positions in the order of first appearance, and -1 for missing values.
+            bins = Index(column.distribution_bins)
+            lookup = np.append(bins.get_indexer(self.value_index()), len(bins))
+            for codes in self.iterate_blocks(self.codes_file, np.int32, block_size):
+                out[start:start + codes.size] = lookup[codes]
+                start += codes.size
+        else:
+            for values in self.iterate_blocks(self.values_file, float, block_size):
+                out[start:start + values.size] = column.encode_numerical_values(Series(values))
+                start += values.size
+
+    @staticmethod
+    def iterate_blocks(file_name: Union[str, Path], dtype, block_size):
+        values = np.memmap(file_name, dtype=dtype, mode='r') if Path(file_name).stat().st_size else np.zeros(0, dtype)
+        for start in range(0, values.size, block_size):
+            yield np.asarray(values[start:start + block_size])
@@ -0,0 +1,72 @@
+from typing import Dict, Iterable
+
+import numpy as np
+from pandas import DataFrame, Series
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+
+from DataSynthesizer.datatypes.DateTimeAttribute import are_datetimes
+from DataSynthesizer.datatypes.SocialSecurityNumberAttribute import are_ssns
+from DataSynthesizer.datatypes.utils.DataType import DataType
+
+
+class DataTypeInferrer(object):
+    """Infer the data types of attributes from bounded samples of their values.
+
+    Numerical attributes are found by their dtypes. Those of integer dtypes are Integer, and those of float dtypes are
+    Float once a sampled value is non-integral, otherwise all their values are checked. Other attributes are DateTime if
+    all sampled values are datetimes, SocialSecurityNumber if all of them are SocialSecurityNumbers, and String
+    otherwise, by the vectorized checks `are_datetimes` and `are_ssns`. Sampled datetimes not sharing a format are
+    confirmed by checking all values.
+
+    Parameters
+    ----------
+    sample_size : int
+        Number of non-missing values sampled from each attribute, one from each of sample_size strata of consecutive
+        values, so that the sample spans the whole column. Columns with fewer values are not sampled.
+    seed : int
+        Seed of the random number generator drawing the sample, independent of the global random state.
+    """
+
+    def __init__(self, sample_size=20, seed=0):
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def infer_data_types(self, dataset: DataFrame, attributes: Iterable[str] = None) -> Dict[str, DataType]:
+        """Dictionary of {attribute: DataType} for the attributes of dataset, all of them by default."""
+        attributes = dataset.columns if attributes is None else attributes
+        return {attr: self.infer_data_type(dataset[attr]) for attr in attributes}
+
+    def infer_data_type(self, column: Series) -> DataType:
+        if is_numeric_dtype(column.dtype) and not is_bool_dtype(column.dtype):
+            if is_integer_dtype(column.dtype) or self.is_integral(column.to_numpy(dtype=float)):
+                return DataType.INTEGER
+            return DataType.FLOAT
+
+        positions = np.flatnonzero(column.notna().to_numpy())
+        samples = column.iloc[positions[self.sample_positions(positions.size)]]
+        if samples.empty:
+            return DataType.STRING
+        if are_datetimes(samples, strict=True):
+            return DataType.DATETIME
+        if are_datetimes(samples):
+            # datetimes not sharing a format, e.g., bare numbers, are ambiguous and confirmed by all values.
+            return DataType.DATETIME if are_datetimes(column.iloc[positions]) else DataType.STRING
+        if are_ssns(samples):
+            return DataType.SOCIAL_SECURITY_NUMBER
+        return DataType.STRING
+
+    def sample_positions(self, size) -> np.ndarray:
+        """Positions of the values sampled from size values."""
+        if size <= self.sample_size:
+            return np.arange(size)
+        rng = np.random.default_rng(self.seed)
+        strata = np.linspace(0, size, self.sample_size + 1).astype(np.int64)
+        return rng.integers(strata[:-1], strata[1:])
+
+    def is_integral(self, values: np.ndarray) -> bool:
+        """Whether all non-missing values are finite integers, checking all of them only if the sampled ones are."""
+        for checked in (values[self.sample_positions(values.size)], values):
+            checked = checked[~np.isnan(checked)]
+            if not (np.array_equal(np.floor(checked), checked) and np.isfinite(checked).all()):
+                return False
+        return True
@@ -0,0 +1,70 @@
+from math import log, sqrt
+
+import numpy as np
+from pandas import Series
+from pandas.util import hash_array
+
+
+class HyperLogLog(object):
+    """HyperLogLog sketch estimating the number of distinct values in constant memory.
+
+    The sketch has 2**precision registers of one byte, and its relative standard error is about
+    1.04 / sqrt(2**precision), e.g., 0.8% for the default precision 14. Sketches of parts of a dataset merge into the
+    sketch of the whole dataset.
+
+    Parameters
+    ----------
+    precision : int
+        Number of bits of a hash indexing the registers, between 4 and 18.
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f'The precision of HyperLogLog should be between 4 and 18, not {precision}.')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def standard_error(self):
+        return 1.04 / sqrt(self.registers.size)
+
+    def update(self, values: Series):
+        """Add values, hashed by `pandas.util.hash_array`."""
+        self.update_hashes(hash_array(np.asarray(values, dtype=object if values.dtype == object else None)))
+
+    def update_hashes(self, hashes: np.ndarray):
+        """Add 64-bit hashes of values. The first precision bits index a register, which keeps the maximum position
+        of the first set bit in the remaining bits."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        indices = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        remaining = hashes << np.uint64(self.precision)
+
+        # the bit length of nonzero remaining bits is that of their float value, or one less when rounded up.
+        nonzero = remaining > 0
+        exponents = np.zeros(hashes.size, dtype=np.uint64)
+        exponents[nonzero] = np.floor(np.log2(remaining[nonzero].astype(float))).astype(np.uint64)
+        rounded_up = nonzero & ((remaining >> exponents) == 0)
+        exponents[rounded_up] -= np.uint64(1)
+        ranks = np.where(nonzero, 64 - exponents.astype(np.int64), 65 - self.precision).astype(np.uint8)
+        np.maximum.at(self.registers, indices, ranks)
+
+    def merge(self, other: 'HyperLogLog'):
+        """Merge the sketch of other values into this one."""
+        if other.precision != self.precision:
+            raise ValueError('Sketches of different precisions cannot be merged.')
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """Estimated number of distinct values, by linear counting while many registers are empty."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw_estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        num_empty_registers = int(np.count_nonzero(self.registers == 0))
+        if raw_estimate <= 2.5 * m and num_empty_registers:
+            return m * log(m / num_empty_registers)
+        return float(raw_estimate)
+
+    def is_likely_unique(self, num_values, num_standard_errors=5):
+        """Whether num_values added to the sketch are likely all distinct, i.e., the estimated number of distinct
+        values is within num_standard_errors standard errors of num_values."""
+        return self.estimate() >= num_values * (1 - num_standard_errors * self.standard_error) - 1
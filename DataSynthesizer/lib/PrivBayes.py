@@ -1,15 +1,21 @@
+import heapq
 import random
 import warnings
-from itertools import combinations, product, islice, chain
-from math import log, ceil
+from collections import OrderedDict
+from itertools import combinations, chain, islice
+from math import log, ceil, prod
+from multiprocessing import cpu_count
 from multiprocessing.pool import Pool
+from multiprocessing.shared_memory import SharedMemory
 
 import numpy as np
-import pandas as pd
-from pandas import DataFrame, merge
+from pandas import DataFrame
 from scipy.optimize import fsolve
 
-from DataSynthesizer.lib.utils import mutual_information, normalize_given_distribution, set_random_seed
+from DataSynthesizer.lib.tracing import NO_OP_TRACER, Tracer
+from DataSynthesizer.lib.utils import (combine_integer_codes, encode_columns_into_integer_codes, memory_mapped_file,
+                                       entropy_of_integer_codes, normalize_given_distribution,
+                                       normalize_given_distributions, set_random_seed)
 
 """
 This module is based on PrivBayes in the following paper:
@@ -32,7 +38,16 @@ def calculate_sensitivity(num_tuples, child, parents, attr_to_is_binary):
     int
         Sensitivity value.
     """
-    if attr_to_is_binary[child] or (len(parents) == 1 and attr_to_is_binary[parents[0]]):
+    return sensitivity_of_mutual_information(num_tuples, is_binary_candidate(child, parents, attr_to_is_binary))
+
+
+def is_binary_candidate(child, parents, attr_to_is_binary):
+    """Whether the child or its only parent is binary, which lowers the sensitivity of their mutual information."""
+    return attr_to_is_binary[child] or (len(parents) == 1 and attr_to_is_binary[parents[0]])
+
+
+def sensitivity_of_mutual_information(num_tuples, is_binary):
+    if is_binary:
         a = log(num_tuples) / num_tuples
         b = (num_tuples - 1) / num_tuples
         b_inv = num_tuples / (num_tuples - 1)
@@ -43,6 +58,16 @@ def calculate_sensitivity(num_tuples, child, parents, attr_to_is_binary):
         return a + b
 
 
+def calculate_deltas(parents_pair_list, attr_to_is_binary, num_tuples, num_attributes, epsilon):
+    """calculate_delta of every (child, parents) candidate, as an array. The sensitivity only takes two values, so it is
+    computed once for each of them."""
+    is_binary = np.fromiter((is_binary_candidate(child, parents, attr_to_is_binary)
+                             for child, parents in parents_pair_list), dtype=bool, count=len(parents_pair_list))
+    deltas = [calculate_delta(num_attributes, sensitivity_of_mutual_information(num_tuples, binary), epsilon)
+              for binary in (False, True)]
+    return np.where(is_binary, deltas[1], deltas[0])
+
+
 def calculate_delta(num_attributes, sensitivity, epsilon):
     """Computing delta, which is a factor when applying differential privacy.
 
@@ -103,24 +128,172 @@ def calculate_k(num_attributes, num_tuples, target_usefulness=4, epsilon=0.1):
         return ans
 
 
-def worker(paras):
-    child, V, num_parents, split, dataset = paras
-    parents_pair_list = []
-    mutual_info_list = []
+class MutualInformationScorer(object):
+    """Score candidates by MI(child; parents) = H(child) + H(parents) - H(child, parents).
 
-    if split + num_parents - 1 < len(V):
-        for other_parents in combinations(V[split + 1:], num_parents - 1):
-            parents = list(other_parents)
-            parents.append(V[split])
-            parents_pair_list.append((child, parents))
-            # TODO consider to change the computation of MI by combined integers instead of strings.
-            mi = mutual_information(dataset[child], dataset[parents])
-            mutual_info_list.append(mi)
+    A parent set is paired with every remaining child in a round of greedy_bayes, so H(parents) is memoized in a cache
+    evicting the least recently used parent sets, and H(child) is memoized per attribute. Only the joint entropy is
+    counted for each candidate.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded dataset of shape (num_attributes, num_tuples), see `utils.encode_columns_into_integer_codes`.
+    cardinalities : list
+        Cardinality of each attribute.
+    cache_size : int
+        Maximum number of parent sets whose entropies are memoized.
+    """
+
+    def __init__(self, codes: np.ndarray, cardinalities, cache_size=65536):
+        self.codes = codes
+        self.cardinalities = cardinalities
+        self.cache_size = cache_size
+        self.attribute_entropies = {}
+        self.parents_entropies = OrderedDict()
+
+    def attribute_entropy(self, attr):
+        if attr not in self.attribute_entropies:
+            self.attribute_entropies[attr] = entropy_of_integer_codes(self.codes[attr], self.cardinalities[attr])
+        return self.attribute_entropies[attr]
+
+    def parents_entropy(self, parents, parents_codes=None, parents_cardinality=None):
+        """Joint entropy of a parent set, memoized. The combined codes of the parents are only computed on a miss, unless
+        given."""
+        key = tuple(parents)
+        if key in self.parents_entropies:
+            self.parents_entropies.move_to_end(key)
+        else:
+            if parents_codes is None:
+                parents_codes, parents_cardinality = combine_integer_codes(self.codes[parents],
+                                                                           [self.cardinalities[p] for p in parents])
+            self.parents_entropies[key] = entropy_of_integer_codes(parents_codes, parents_cardinality)
+            if len(self.parents_entropies) > self.cache_size:
+                self.parents_entropies.popitem(last=False)
+        return self.parents_entropies[key]
+
+    def score(self, child, parents):
+        """Mutual information between a child and its parents, where attributes are row indices of codes."""
+        parents_codes, parents_cardinality = combine_integer_codes(self.codes[parents],
+                                                                   [self.cardinalities[p] for p in parents])
+        child_cardinality = self.cardinalities[child]
+        joint_codes = parents_codes * child_cardinality + self.codes[child]
+        joint_entropy = entropy_of_integer_codes(joint_codes, parents_cardinality * child_cardinality)
+        mi = self.attribute_entropy(child) + self.parents_entropy(parents, parents_codes, parents_cardinality)
+        return max(mi - joint_entropy, 0.0)
+
+
+# Scorer over the encoded dataset attached by each process of a MutualInformationPool, see _attach_shared_codes.
+_shared_scorer = None
 
-    return parents_pair_list, mutual_info_list
+
+def _attach_shared_codes(shared_memory_name, shape, dtype, cardinalities, cache_size):
+    global _shared_scorer
+    shared_memory = SharedMemory(name=shared_memory_name)
+    codes = np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf)
+    _shared_scorer = MutualInformationScorer(codes, cardinalities, cache_size)
+    # keep the mapping alive as long as the worker process
+    _attach_shared_codes.shared_memory = shared_memory
+
+
+def _attach_mapped_codes(file_name, offset, shape, dtype, cardinalities, cache_size):
+    global _shared_scorer
+    codes = np.memmap(file_name, dtype=dtype, mode='r', offset=offset, shape=shape)
+    _shared_scorer = MutualInformationScorer(codes, cardinalities, cache_size)
+
+
+def worker(candidates):
+    """Score a batch of (child, parents) candidates on the encoded dataset attached to this process."""
+    return [_shared_scorer.score(child, parents) for child, parents in candidates]
+
+
+class MutualInformationPool(object):
+    """A pool of processes that scores (child, parents) candidates throughout a run of greedy_bayes.
+
+    The encoded dataset is copied into shared memory once, unless it is mapped from a file, e.g., the one written by
+    `DataDescriber.encode_dataset_into_binning_indices`, which worker processes map themselves. Worker processes attach
+    to it when they start, so tasks only carry attribute indices. With a single process, candidates are scored in the
+    current process without a pool.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded dataset of shape (num_attributes, num_tuples), see `utils.encode_columns_into_integer_codes`.
+    cardinalities : list
+        Cardinality of each attribute.
+    processes : int
+        Number of worker processes. If None, use `os.cpu_count()`.
+    cache_size : int
+        Maximum number of parent set entropies memoized by each process, see MutualInformationScorer.
+    """
+
+    def __init__(self, codes: np.ndarray, cardinalities, processes=None, cache_size=65536):
+        self.processes = processes or cpu_count() or 1
+        self.scorer = None
+        self.shared_memory = None
+        self.pool = None
+        if self.processes > 1:
+            mapped_file = memory_mapped_file(codes) if codes.flags.c_contiguous and codes.size else None
+            if mapped_file:
+                initializer = _attach_mapped_codes
+                initargs = (*mapped_file, codes.shape, codes.dtype, cardinalities, cache_size)
+            else:
+                self.shared_memory = SharedMemory(create=True, size=max(codes.nbytes, 1))
+                shared_codes = np.ndarray(codes.shape, dtype=codes.dtype, buffer=self.shared_memory.buf)
+                shared_codes[:] = codes
+                initializer = _attach_shared_codes
+                initargs = (self.shared_memory.name, codes.shape, codes.dtype, cardinalities, cache_size)
+            self.pool = Pool(self.processes, initializer=initializer, initargs=initargs)
+        else:
+            self.scorer = MutualInformationScorer(codes, cardinalities, cache_size)
+
+    def score(self, candidates):
+        """Compute mutual information of each (child, parents) candidate, where attributes are row indices of codes.
+
+        Candidates are grouped by parent set, so that the parent set entropies memoized by a scorer are reused, and split
+        into batches of even sizes, a few batches per process to balance the load.
+        """
+        order = sorted(range(len(candidates)), key=lambda i: candidates[i][1])
+        candidates = [candidates[i] for i in order]
+        if self.pool is None:
+            scores = [self.scorer.score(child, parents) for child, parents in candidates]
+        else:
+            num_batches = min(len(candidates), 4 * self.processes)
+            bounds = np.linspace(0, len(candidates), num_batches + 1).astype(int)
+            batches = [candidates[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+            scores = list(chain.from_iterable(self.pool.map(worker, batches)))
+
+        ordered_scores = [0.0] * len(scores)
+        for i, mi in zip(order, scores):
+            ordered_scores[i] = mi
+        return ordered_scores
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def parent_set_candidates(V, num_parents):
+    """Enumerate the parent sets of size num_parents drawn from V."""
+    for split in range(len(V) - num_parents + 1):
+        for other_parents in combinations(V[split + 1:], num_parents - 1):
+            yield list(other_parents) + [V[split]]
 
 
-def greedy_bayes(dataset: DataFrame, k: int, epsilon: float, seed=0):
+def greedy_bayes(dataset: DataFrame, k: int, epsilon: float, seed=0, processes=None, tracer: Tracer = None,
+                 streaming=False, block_size=65536, cache_scores=None, best_first=True):
     """Construct a Bayesian Network (BN) using greedy algorithm.
 
     Parameters
@@ -133,68 +306,239 @@ def greedy_bayes(dataset: DataFrame, k: int, epsilon: float, seed=0):
         Parameter of differential privacy.
     seed : int or float
         Seed for the randomness in BN generation.
+    processes : int
+        Number of processes scoring candidate parent sets. If None, use `os.cpu_count()`.
+    tracer : Tracer
+        Receives a phase 'greedy_bayes', with a phase 'greedy_bayes_round' for every attribute added to the BN, which
+        records the number of candidates and that of candidates scored in the round, i.e., not scored in earlier rounds.
+    streaming : bool
+        Whether to choose every (child, parents) by gumbel_max_mechanism over blocks of block_size candidates, instead of
+        the exponential_mechanism over lists of all candidates of a round. Both follow the same distribution, but draw
+        different random numbers.
+    block_size : int
+        Number of candidates scored at a time when streaming.
+    cache_scores : bool
+        Whether to keep the mutual information of all candidates across rounds, so that a round only scores the parent
+        sets including the attribute added in the previous round. Without the cache, all candidates are scored in every
+        round, and memory stays bounded by block_size when streaming. If None, scores are cached unless streaming.
+    best_first : bool
+        With epsilon=0 and without streaming, find the candidate of the highest mutual information by best_first_argmax,
+        which only scores the candidates whose upper bounds may beat the best one, instead of scoring all of them. The
+        constructed BN is the same.
     """
     set_random_seed(seed)
-    dataset: DataFrame = dataset.astype(str, copy=False)
+    tracer = tracer or NO_OP_TRACER
+    if cache_scores is None:
+        cache_scores = not streaming
     num_tuples, num_attributes = dataset.shape
     if not k:
         k = calculate_k(num_attributes, num_tuples)
 
-    attr_to_is_binary = {attr: dataset[attr].unique().size <= 2 for attr in dataset}
-
-    print('================ Constructing Bayesian Network (BN) ================')
-    root_attribute = random.choice(dataset.columns)
-    V = [root_attribute]
-    rest_attributes = list(dataset.columns)
-    rest_attributes.remove(root_attribute)
-    print(f'Adding ROOT {root_attribute}')
-    N = []
-    while rest_attributes:
-        parents_pair_list = []
-        mutual_info_list = []
-
-        num_parents = min(len(V), k)
-        tasks = [(child, V, num_parents, split, dataset) for child, split in
-                 product(rest_attributes, range(len(V) - num_parents + 1))]
-        with Pool() as pool:
-            res_list = pool.map(worker, tasks)
-
-        for res in res_list:
-            parents_pair_list += res[0]
-            mutual_info_list += res[1]
+    with tracer.phase('greedy_bayes', rows=num_tuples, attributes=num_attributes, k=k) as greedy_bayes_phase:
+        codes, cardinalities = encode_columns_into_integer_codes(dataset)
+        attributes = list(dataset.columns)
+        attr_to_idx = {attr: idx for idx, attr in enumerate(attributes)}
+        attr_to_is_binary = {attr: np.count_nonzero(np.bincount(codes[idx], minlength=cardinalities[idx])) <= 2
+                             for attr, idx in attr_to_idx.items()}
+
+        print('================ Constructing Bayesian Network (BN) ================')
+        root_attribute = random.choice(dataset.columns)
+        V = [root_attribute]
+        rest_attributes = list(dataset.columns)
+        rest_attributes.remove(root_attribute)
+        print(f'Adding ROOT {root_attribute}')
+        N = []
+        # Scores are kept across rounds as {child: {parents: mutual information}}, if cache_scores. Once V is larger than
+        # k, a round only has to score the parent sets including the attribute added in the previous round.
+        mi_cache = {}
+        cached_num_parents = 0
+        num_scored = 0
+
+        def score(pairs):
+            nonlocal num_scored
+            mutual_info_list, num_new_pairs = score_candidates(pool, pairs, attr_to_idx, mi_cache)
+            num_scored += num_new_pairs
+            return mutual_info_list
+
+        with MutualInformationPool(codes, cardinalities, processes) as pool:
+            # entropies bounding mutual information in best_first_argmax, shared with the pool of a single process.
+            bound_scorer = pool.scorer or MutualInformationScorer(codes, cardinalities)
+            while rest_attributes:
+                with tracer.phase('greedy_bayes_round', round=len(N) + 1) as round_phase:
+                    num_parents = min(len(V), k)
+                    if num_parents != cached_num_parents:
+                        mi_cache = {child: {} for child in rest_attributes} if cache_scores else None
+                        cached_num_parents = num_parents
+
+                    candidates = ((child, parents) for child in rest_attributes
+                                  for parents in parent_set_candidates(V, num_parents))
+                    num_scored_before = num_scored
+                    if streaming:
+                        chosen, num_candidates = gumbel_max_mechanism(epsilon, candidates, score, attr_to_is_binary,
+                                                                      num_tuples, num_attributes, block_size)
+                    elif not epsilon and best_first:
+                        parents_pair_list = list(candidates)
+                        num_candidates = len(parents_pair_list)
+                        chosen = parents_pair_list[best_first_argmax(parents_pair_list, score, bound_scorer, attr_to_idx,
+                                                                     mi_cache)]
+                    else:
+                        parents_pair_list = list(candidates)
+                        num_candidates = len(parents_pair_list)
+                        mutual_info_list = score(parents_pair_list)
+                        if epsilon:
+                            sampling_distribution = exponential_mechanism(epsilon, mutual_info_list, parents_pair_list,
+                                                                          attr_to_is_binary, num_tuples, num_attributes)
+                            idx = np.random.choice(num_candidates, p=sampling_distribution)
+                        else:
+                            idx = mutual_info_list.index(max(mutual_info_list))
+                        chosen = parents_pair_list[idx]
+
+                    N.append(chosen)
+                    adding_attribute = chosen[0]
+                    V.append(adding_attribute)
+                    rest_attributes.remove(adding_attribute)
+                    if mi_cache is not None:
+                        del mi_cache[adding_attribute]
+                    print(f'Adding attribute {adding_attribute}')
+                    round_phase.update(attribute=adding_attribute, candidates=num_candidates,
+                                       scored=num_scored - num_scored_before)
+
+        greedy_bayes_phase.update(scored=num_scored)
+        print('========================== BN constructed ==========================')
 
-        if epsilon:
-            sampling_distribution = exponential_mechanism(epsilon, mutual_info_list, parents_pair_list, attr_to_is_binary,
-                                                          num_tuples, num_attributes)
-            idx = np.random.choice(list(range(len(mutual_info_list))), p=sampling_distribution)
-        else:
-            idx = mutual_info_list.index(max(mutual_info_list))
+    return N
 
-        N.append(parents_pair_list[idx])
-        adding_attribute = parents_pair_list[idx][0]
-        V.append(adding_attribute)
-        rest_attributes.remove(adding_attribute)
-        print(f'Adding attribute {adding_attribute}')
 
-    print('========================== BN constructed ==========================')
+def score_candidates(pool: MutualInformationPool, candidates, attr_to_idx, mi_cache=None):
+    """Mutual information of (child, parents) candidates, scored by pool unless kept in mi_cache as
+    {child: {parents: mutual information}}, if given.
 
-    return N
+    Return
+    --------
+    (list, int)
+        The mutual information of the candidates, and the number of candidates scored by pool.
+    """
+    new_pairs = candidates if mi_cache is None else [(child, parents) for child, parents in candidates
+                                                     if tuple(parents) not in mi_cache[child]]
+    scores = pool.score([(attr_to_idx[child], [attr_to_idx[p] for p in parents]) for child, parents in new_pairs])
+    if mi_cache is None:
+        return scores, len(new_pairs)
+    for (child, parents), mi in zip(new_pairs, scores):
+        mi_cache[child][tuple(parents)] = mi
+    return [mi_cache[child][tuple(parents)] for child, parents in candidates], len(new_pairs)
+
+
+def best_first_argmax(candidates, score, bound_scorer: MutualInformationScorer, attr_to_idx, mi_cache=None,
+                      batch_size=64, tolerance=1e-9):
+    """Index of the (child, parents) candidate of the highest mutual information, the first one among ties, as found by
+    scoring all candidates, but only scoring those whose upper bounds may beat the best one so far.
+
+    Candidates are visited in the order of their bounds, and then of their indices, from a heap. Every candidate starts
+    with the bound min(H(child), sum of H(parent)), which is refined into min(H(child), H(parents)) once visited, while
+    candidates in mi_cache start with their mutual information. Refined candidates are scored in batches of batch_size.
+    The search stops once no bound is within tolerance of the best mutual information, which absorbs rounding errors
+    between entropies and scores, so the result is that of the exhaustive search.
+
+    Parameters
+    ----------
+    candidates : list
+        (child, parents) candidates.
+    score : callable
+        Function of a list of candidates returning their mutual information, see score_candidates.
+    bound_scorer : MutualInformationScorer
+        Scorer memoizing the entropies of attributes and parent sets.
+    attr_to_idx : dict
+        Dictionary of {attribute: row index in the codes of bound_scorer}.
+    mi_cache : dict
+        Mutual information of candidates known from earlier rounds, as {child: {parents: mutual information}}.
+    """
+    cheap, refined, exact = 0, 1, 2
+    heap = []
+    for i, (child, parents) in enumerate(candidates):
+        if mi_cache is not None and tuple(parents) in mi_cache[child]:
+            heap.append((-mi_cache[child][tuple(parents)], i, exact))
+        else:
+            child_entropy = bound_scorer.attribute_entropy(attr_to_idx[child])
+            parents_entropy = sum(bound_scorer.attribute_entropy(attr_to_idx[p]) for p in parents)
+            heap.append((-min(child_entropy, parents_entropy), i, cheap))
+    heapq.heapify(heap)
+
+    best_mi, best_idx = -np.inf, None
+    while heap:
+        batch = []
+        while heap and len(batch) < batch_size and -heap[0][0] + tolerance >= best_mi:
+            negative_bound, i, state = heapq.heappop(heap)
+            if state == exact:
+                if -negative_bound > best_mi or (-negative_bound == best_mi and i < best_idx):
+                    best_mi, best_idx = -negative_bound, i
+            elif state == cheap:
+                child, parents = candidates[i]
+                child_entropy = bound_scorer.attribute_entropy(attr_to_idx[child])
+                parents_entropy = bound_scorer.parents_entropy([attr_to_idx[p] for p in parents])
+                heapq.heappush(heap, (-min(child_entropy, parents_entropy), i, refined))
+            else:
+                batch.append(i)
+        if not batch:
+            break
+        for i, mi in zip(batch, score([candidates[i] for i in batch])):
+            if mi > best_mi or (mi == best_mi and i < best_idx):
+                best_mi, best_idx = mi, i
+    return best_idx
 
 
 def exponential_mechanism(epsilon, mutual_info_list, parents_pair_list, attr_to_is_binary, num_tuples, num_attributes):
     """Applied in Exponential Mechanism to sample outcomes."""
-    delta_array = []
-    for (child, parents) in parents_pair_list:
-        sensitivity = calculate_sensitivity(num_tuples, child, parents, attr_to_is_binary)
-        delta = calculate_delta(num_attributes, sensitivity, epsilon)
-        delta_array.append(delta)
-
-    mi_array = np.array(mutual_info_list) / (2 * np.array(delta_array))
-    mi_array = np.exp(mi_array)
+    deltas = calculate_deltas(parents_pair_list, attr_to_is_binary, num_tuples, num_attributes, epsilon)
+    mi_array = np.asarray(mutual_info_list, dtype=float) / (2 * deltas)
+    # subtracting the maximum leaves the distribution unchanged, and keeps np.exp from overflowing.
+    mi_array = np.exp(mi_array - mi_array.max())
     mi_array = normalize_given_distribution(mi_array)
     return mi_array
 
 
+def gumbel_max_mechanism(epsilon, candidates, score, attr_to_is_binary, num_tuples, num_attributes, block_size=65536):
+    """Exponential mechanism over a stream of (child, parents) candidates, in memory bounded by block_size.
+
+    Choosing the candidate maximizing MI / (2 * delta) plus an independent Gumbel noise is the same as sampling it from
+    the distribution of exponential_mechanism, but the candidates are consumed in blocks keeping only the best one so
+    far. With epsilon=0, the candidate of the highest MI is chosen as by greedy_bayes.
+
+    Parameters
+    ----------
+    candidates : iterable
+        (child, parents) candidates.
+    score : callable
+        Function of a list of candidates returning their mutual information, see score_candidates.
+
+    Return
+    --------
+    (tuple, int)
+        The chosen candidate, and the number of candidates.
+    """
+    best_candidate = None
+    best_value = -np.inf
+    num_candidates = 0
+    for block in batches(candidates, block_size):
+        values = np.asarray(score(block), dtype=float)
+        if epsilon:
+            values /= 2 * calculate_deltas(block, attr_to_is_binary, num_tuples, num_attributes, epsilon)
+            values += np.random.gumbel(size=len(block))
+        idx = int(np.argmax(values))
+        if best_candidate is None or values[idx] > best_value:
+            best_candidate, best_value = block[idx], values[idx]
+        num_candidates += len(block)
+    return best_candidate, num_candidates
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
 def laplace_noise_parameter(k, num_attributes, num_tuples, epsilon):
     """The noises injected into conditional distributions.
 
@@ -204,81 +548,271 @@ def laplace_noise_parameter(k, num_attributes, num_tuples, epsilon):
 
 
 def get_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon=0.1):
-    data = encoded_dataset.copy().loc[:, attributes]
-    data['count'] = 1
-    stats = data.groupby(attributes).sum()
-
-    iterables = [range(int(encoded_dataset[attr].max()) + 1) for attr in attributes]
-    products = product(*iterables)
-
-    def grouper_it(iterable, n):
-        while True:
-            chunk_it = islice(iterable, n)
-            try:
-                first_el = next(chunk_it)
-            except StopIteration:
-                return
-            yield chain((first_el,), chunk_it)
-
-    full_space = None
-    for item in grouper_it(products, 1000000):
-        if full_space is None:
-            full_space = DataFrame(columns=attributes, data=list(item))
-        else:
-            data_frame_append = DataFrame(columns=attributes, data=list(item))
-            full_space = pd.concat([full_space, data_frame_append], ignore_index=True)
+    """Noisy counts of all value combinations of attributes.
 
-    stats.reset_index(inplace=True)
-    stats = merge(full_space, stats, how='left')
-    stats.fillna(0, inplace=True)
+    Return
+    --------
+    np.ndarray
+        Dense array with one axis per attribute, in the order of attributes, whose length is the largest binning index of
+        the attribute plus one.
+    """
+    shape = tuple(int(encoded_dataset[attr].max()) + 1 for attr in attributes)
+    cells = np.ravel_multi_index([encoded_dataset[attr].to_numpy() for attr in attributes], shape)
+    stats = np.bincount(cells, minlength=int(np.prod(shape))).astype(float)
 
     if epsilon:
-        k = len(attributes) - 1
         num_tuples, num_attributes = encoded_dataset.shape
+        inject_laplace_noise_into_counts(stats, len(attributes) - 1, num_attributes, num_tuples, epsilon)
+
+    return stats.reshape(shape)
+
+
+def inject_laplace_noise_into_counts(stats, k, num_attributes, num_tuples, epsilon=0.1):
+    """Add Laplace noises to the dense counts of the value combinations of k+1 attributes in place, see
+    get_noisy_distribution_of_attributes."""
+    noise_para = laplace_noise_parameter(k, num_attributes, num_tuples, epsilon)
+    stats += np.random.laplace(0, scale=noise_para, size=stats.size)
+    stats.clip(0, out=stats)
+
+
+def marginalize_distribution_of_attributes(stats, attributes, kept_attributes):
+    """Sum the counts from get_noisy_distribution_of_attributes over the axes of attributes not in kept_attributes.
+
+    The axes of the result are in the order of kept_attributes.
+    """
+    dropped_axes = tuple(i for i, attr in enumerate(attributes) if attr not in kept_attributes)
+    stats = stats.sum(axis=dropped_axes)
+    remaining_attributes = [attr for attr in attributes if attr in kept_attributes]
+    return stats.transpose([remaining_attributes.index(attr) for attr in kept_attributes])
+
+
+def get_sparse_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon=0.1):
+    """Noisy counts of the value combinations of attributes, keeping only the cells above a threshold.
+
+    It is equivalent to adding Laplace noise to every cell of get_noisy_distribution_of_attributes and then dropping the
+    cells whose noisy counts are not above a threshold, which is post-processing and keeps the same privacy guarantee.
+    The cells never occurring in encoded_dataset are not enumerated. The number of them crossing the threshold is drawn
+    from a binomial distribution, these cells are drawn uniformly from the empty cells, and their noisy counts are the
+    threshold plus exponential noises, i.e., Laplace noises conditioned on exceeding the threshold. The threshold is
+    chosen such that about num_tuples empty cells are expected to be kept.
+
+    Return
+    --------
+    (np.ndarray, np.ndarray, tuple)
+        Sorted flat indices of the kept cells in the domain, their noisy counts, and the shape of the domain, as in
+        get_noisy_distribution_of_attributes.
+    """
+    shape = tuple(int(encoded_dataset[attr].max()) + 1 for attr in attributes)
+    domain_size = prod(shape)
+    if domain_size >= 2 ** 63:
+        raise ValueError(f'The domain of {attributes} is too large to be indexed.')
+
+    cells = np.ravel_multi_index([encoded_dataset[attr].to_numpy() for attr in attributes], shape)
+    cells, counts = np.unique(cells, return_counts=True)
+    num_tuples, num_attributes = encoded_dataset.shape
+    return inject_laplace_noise_into_sparse_counts(cells, counts, shape, len(attributes) - 1, num_attributes, num_tuples,
+                                                   epsilon)
+
+
+def inject_laplace_noise_into_sparse_counts(cells, counts, shape, k, num_attributes, num_tuples, epsilon=0.1):
+    """Noisy counts above the threshold of get_sparse_noisy_distribution_of_attributes, from the sorted flat indices
+    of the occurring value combinations of k+1 attributes and their counts."""
+    domain_size = prod(shape)
+    counts = counts.astype(float)
+    if epsilon:
         noise_para = laplace_noise_parameter(k, num_attributes, num_tuples, epsilon)
-        laplace_noises = np.random.laplace(0, scale=noise_para, size=stats.index.size)
-        stats['count'] += laplace_noises
-        stats.loc[stats['count'] < 0, 'count'] = 0
+        threshold = noise_para * max(log(domain_size / (2 * num_tuples)), 0)
+
+        occupied_cells = cells
+        counts += np.random.laplace(0, scale=noise_para, size=counts.size)
+        kept = counts > threshold
+        cells, counts = cells[kept], counts[kept]
+
+        num_empty_cells = domain_size - occupied_cells.size
+        num_noisy_cells = np.random.binomial(num_empty_cells, 0.5 * np.exp(-threshold / noise_para))
+        noisy_cells = np.array([], dtype=np.int64)
+        while noisy_cells.size < num_noisy_cells:
+            candidates = np.random.randint(0, domain_size, size=num_noisy_cells - noisy_cells.size, dtype=np.int64)
+            candidates = candidates[~np.isin(candidates, occupied_cells)]
+            noisy_cells = np.union1d(noisy_cells, candidates)
+        noisy_counts = threshold + np.random.exponential(noise_para, size=noisy_cells.size)
+
+        cells = np.concatenate([cells, noisy_cells])
+        counts = np.concatenate([counts, noisy_counts])
+        order = np.argsort(cells)
+        cells, counts = cells[order], counts[order]
+
+    return cells, counts, shape
+
+
+def marginalize_sparse_distribution_of_attributes(sparse_stats, attributes, kept_attributes):
+    """Same as marginalize_distribution_of_attributes for the output of get_sparse_noisy_distribution_of_attributes."""
+    cells, counts, shape = sparse_stats
+    index = np.unravel_index(cells, shape)
+    kept_shape = tuple(shape[attributes.index(attr)] for attr in kept_attributes)
+    kept_cells = np.ravel_multi_index([index[attributes.index(attr)] for attr in kept_attributes], kept_shape)
+    kept_cells, inverse = np.unique(kept_cells, return_inverse=True)
+    return kept_cells, np.bincount(inverse, weights=counts, minlength=kept_cells.size), kept_shape
+
+
+def conditional_distributions_of_child(stats):
+    """Conditional distributions of the attribute on the last axis of stats, keyed by instances of the other attributes.
+
+    Parameters
+    ----------
+    stats : np.ndarray or tuple
+        Output of get_noisy_distribution_of_attributes or get_sparse_noisy_distribution_of_attributes. In the sparse
+        case, the parents instances without any kept cell are left out.
+    """
+    if isinstance(stats, np.ndarray):
+        parents_shape, child_size = stats.shape[:-1], stats.shape[-1]
+        parents_cells = np.arange(prod(parents_shape))
+        stats = stats.reshape(-1, child_size)
+    else:
+        cells, counts, shape = stats
+        parents_shape, child_size = shape[:-1], shape[-1]
+        parents_cells, child_values = np.divmod(cells, child_size)
+        parents_cells, rows = np.unique(parents_cells, return_inverse=True)
+        stats = np.zeros((parents_cells.size, child_size))
+        stats[rows, child_values] = counts
+
+    # one row of conditional distribution per parents instance, in lexicographic order of parents instances.
+    parents_instances = np.stack(np.unravel_index(parents_cells, parents_shape), axis=1)
+    dists = normalize_given_distributions(stats)
+    return {str(parents_instance): dist for parents_instance, dist in zip(parents_instances.tolist(), dists.tolist())}
+
+
+def attribute_sets_of_network(bayesian_network):
+    """The sets of attributes whose joint distributions are needed for the conditional distributions of the Bayesian
+    network, i.e., the first k+1 attributes, and every later child with its parents, in this order."""
+    k = len(bayesian_network[-1][1])
+    root = bayesian_network[0][1][0]
+    kplus1_attributes = [root] + [child for child, _ in bayesian_network[:k]]
+    return [kplus1_attributes] + [parents + [child] for child, parents in bayesian_network[k:]]
+
+
+def construct_noisy_conditional_distributions(bayesian_network, encoded_dataset, epsilon=0.1,
+                                              max_dense_domain_size=None, tracer: Tracer = None):
+    """See more in Algorithm 1 in PrivBayes.
+
+    Parameters
+    ----------
+    bayesian_network : list
+        List of [child, [parent,]] to represent a Bayesian Network.
+    encoded_dataset : DataFrame
+        Input dataset encoded into binning indices.
+    epsilon : float
+        Parameter of differential privacy.
+    max_dense_domain_size : int
+        Distributions over domains larger than this number of value combinations are computed sparsely by
+        get_sparse_noisy_distribution_of_attributes, so that only the parents instances with kept cells are stored. If
+        None, all distributions are dense.
+    tracer : Tracer
+        Receives the phase of every noisy distribution, see construct_conditional_distributions_from_noisy_distributions.
+    """
+
+    def get_noisy_distribution(attributes):
+        domain_size = prod(int(encoded_dataset[attr].max()) + 1 for attr in attributes)
+        if max_dense_domain_size is not None and domain_size > max_dense_domain_size:
+            return get_sparse_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon)
+        else:
+            return get_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon)
+
+    return construct_conditional_distributions_from_noisy_distributions(bayesian_network, get_noisy_distribution,
+                                                                        tracer, rows=encoded_dataset.shape[0])
+
+
+def construct_noisy_conditional_distributions_from_counts(bayesian_network, attributes_to_counts, num_tuples,
+                                                          num_attributes, epsilon=0.1, max_dense_domain_size=None,
+                                                          tracer: Tracer = None):
+    """Same as construct_noisy_conditional_distributions, from the counts of the value combinations of the attributes
+    instead of the encoded dataset, e.g., counts summed over partitions of the dataset.
+
+    Parameters
+    ----------
+    bayesian_network : list
+        List of [child, [parent,]] to represent a Bayesian Network.
+    attributes_to_counts : dict
+        Dictionary of {tuple of attributes: (instances, counts)} for every set in attribute_sets_of_network, where
+        instances is a 2-D array of the distinct rows of binning indices of the attributes in lexicographic order, and
+        counts the number of their occurrences.
+    num_tuples : int
+        Number of tuples in the dataset.
+    num_attributes : int
+        Number of attributes in the Bayesian network.
+    epsilon : float
+        Parameter of differential privacy.
+    max_dense_domain_size : int
+        See construct_noisy_conditional_distributions.
+    tracer : Tracer
+        See construct_noisy_conditional_distributions.
+    """
+
+    def get_noisy_distribution(attributes):
+        instances, counts = attributes_to_counts[tuple(attributes)]
+        shape = tuple(int(size) for size in instances.max(axis=0) + 1)
+        cells = np.ravel_multi_index(instances.T, shape)
+        k = len(attributes) - 1
+        if max_dense_domain_size is not None and prod(shape) > max_dense_domain_size:
+            return inject_laplace_noise_into_sparse_counts(cells, counts, shape, k, num_attributes, num_tuples, epsilon)
+
+        stats = np.zeros(prod(shape))
+        stats[cells] = counts
+        if epsilon:
+            inject_laplace_noise_into_counts(stats, k, num_attributes, num_tuples, epsilon)
+        return stats.reshape(shape)
+
+    return construct_conditional_distributions_from_noisy_distributions(bayesian_network, get_noisy_distribution,
+                                                                        tracer, rows=num_tuples)
+
+
+def construct_conditional_distributions_from_noisy_distributions(bayesian_network, get_noisy_distribution,
+                                                                 tracer: Tracer = None, rows=None):
+    """Conditional distributions of the Bayesian network, where get_noisy_distribution(attributes) returns the noisy
+    distribution of a set of attributes in attribute_sets_of_network, dense or sparse.
+
+    The tracer receives a phase 'conditional_distributions' over rows tuples, with a phase 'noisy_distribution' for
+    every set of attributes.
+    """
+    tracer = tracer or NO_OP_TRACER
+    with tracer.phase('conditional_distributions', rows=rows, distributions=len(bayesian_network) + 1):
+        return conditional_distributions_of_network(bayesian_network, get_noisy_distribution, tracer)
 
-    return stats
 
+def conditional_distributions_of_network(bayesian_network, get_noisy_distribution, tracer: Tracer):
+    def traced_noisy_distribution(attributes):
+        with tracer.phase('noisy_distribution', attributes=list(attributes)) as phase:
+            stats = get_noisy_distribution(attributes)
+            phase.update(sparse=not isinstance(stats, np.ndarray))
+        return stats
 
-def construct_noisy_conditional_distributions(bayesian_network, encoded_dataset, epsilon=0.1):
-    """See more in Algorithm 1 in PrivBayes."""
+    def marginalize(stats, attributes, kept_attributes):
+        if isinstance(stats, np.ndarray):
+            return marginalize_distribution_of_attributes(stats, attributes, kept_attributes)
+        else:
+            return marginalize_sparse_distribution_of_attributes(stats, attributes, kept_attributes)
 
     k = len(bayesian_network[-1][1])
     conditional_distributions = {}
 
     # first k+1 attributes
-    root = bayesian_network[0][1][0]
-    kplus1_attributes = [root]
-    for child, _ in bayesian_network[:k]:
-        kplus1_attributes.append(child)
-
-    noisy_dist_of_kplus1_attributes = get_noisy_distribution_of_attributes(kplus1_attributes, encoded_dataset, epsilon)
+    kplus1_attributes = attribute_sets_of_network(bayesian_network)[0]
+    root = kplus1_attributes[0]
+    noisy_dist_of_kplus1_attributes = traced_noisy_distribution(kplus1_attributes)
 
     # generate noisy distribution of root attribute.
-    root_stats = noisy_dist_of_kplus1_attributes.loc[:, [root, 'count']].groupby(root).sum()['count']
+    root_stats = marginalize(noisy_dist_of_kplus1_attributes, kplus1_attributes, [root])
+    if not isinstance(root_stats, np.ndarray):
+        cells, counts, shape = root_stats
+        root_stats = np.zeros(shape)
+        root_stats[cells] = counts
     conditional_distributions[root] = normalize_given_distribution(root_stats).tolist()
 
     for idx, (child, parents) in enumerate(bayesian_network):
-        conditional_distributions[child] = {}
-
-        if idx <= k - 2:
-            stats = noisy_dist_of_kplus1_attributes.copy().loc[:, parents + [child, 'count']]
-            stats = stats.groupby(parents + [child], as_index=False).sum()
-        elif idx == k - 1:
-            stats = noisy_dist_of_kplus1_attributes.loc[:, parents + [child, 'count']]
+        if idx <= k - 1:
+            stats = marginalize(noisy_dist_of_kplus1_attributes, kplus1_attributes, parents + [child])
         else:
-            stats = get_noisy_distribution_of_attributes(parents + [child], encoded_dataset, epsilon)
-            stats = stats.loc[:, parents + [child, 'count']]
-
-        parents_grouper = parents[0] if len(parents) == 1 else parents
-        for parents_instance, stats_sub in stats.groupby(parents_grouper):
-            stats_sub = stats_sub.sort_values(by=child)
-            dist = normalize_given_distribution(stats_sub['count']).tolist()
-
-            parents_key = str([parents_instance]) if len(parents) == 1 else str(list(parents_instance))
-            conditional_distributions[child][parents_key] = dist
+            stats = traced_noisy_distribution(parents + [child])
+        conditional_distributions[child] = conditional_distributions_of_child(stats)
 
     return conditional_distributions
@@ -0,0 +1,247 @@
+from importlib import import_module
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from pandas import DataFrame, to_datetime
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype, is_string_dtype
+
+from DataSynthesizer.datatypes.utils.DataType import DataType
+
+# suffixes of files in Parquet and Arrow IPC (Feather V2) formats, other files are in CSV format.
+FILE_FORMAT_SUFFIXES = {'.parquet': 'parquet', '.pq': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+
+
+# optional dependencies, and the extras of DataSynthesizer installing them.
+OPTIONAL_DEPENDENCY_EXTRAS = {'pyarrow': 'arrow', 'zstandard': 'zstd'}
+
+
+def import_optional_dependency(name):
+    """Import a module of an optional dependency, e.g., 'pyarrow.parquet', or raise an ImportError naming its extra."""
+    try:
+        return import_module(name)
+    except ImportError as e:
+        package = name.split('.')[0]
+        extra = OPTIONAL_DEPENDENCY_EXTRAS[package]
+        raise ImportError(f'{package} is required for this file format. Install it by '
+                          f'`pip install DataSynthesizer[{extra}]`.') from e
+
+
+def infer_file_format(file_name):
+    return FILE_FORMAT_SUFFIXES.get(Path(file_name).suffix.lower(), 'csv')
+
+
+def read_arrow_dataset(file_name, file_format: str = None, columns: List[str] = None, null_values=None) -> DataFrame:
+    """Read a Parquet or Arrow file, only the given columns if any, keeping the dtypes of its schema.
+
+    See arrow_table_to_dataframe for the conversion of its columns.
+    """
+    ds = import_optional_dependency('pyarrow.dataset')
+
+    dataset = ds.dataset(file_name, format=arrow_dataset_format(file_name, file_format))
+    return arrow_table_to_dataframe(dataset.to_table(columns=columns), null_values=null_values)
+
+
+def read_arrow_dataset_in_chunks(file_name, chunk_size, file_format: str = None, columns: List[str] = None,
+                                 null_values=None) -> Iterator[DataFrame]:
+    """Read a Parquet or Arrow file as DataFrames of chunk_size rows, only the given columns if any.
+
+    Only the record batches of one chunk are held in memory at a time. The index continues across chunks as that of
+    `pandas.read_csv` with chunksize.
+    """
+    pa = import_optional_dependency('pyarrow')
+    ds = import_optional_dependency('pyarrow.dataset')
+
+    dataset = ds.dataset(file_name, format=arrow_dataset_format(file_name, file_format))
+    schema = dataset.schema if columns is None else pa.schema([dataset.schema.field(attr) for attr in columns])
+    pending = pa.Table.from_batches([], schema)
+    start = 0
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_size):
+        pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+        while pending.num_rows >= chunk_size:
+            yield arrow_table_to_dataframe(pending.slice(0, chunk_size), start, null_values)
+            pending = pending.slice(chunk_size)
+            start += chunk_size
+    if pending.num_rows or start == 0:
+        yield arrow_table_to_dataframe(pending, start, null_values)
+
+
+def arrow_dataset_format(file_name, file_format: str = None):
+    file_format = file_format or infer_file_format(file_name)
+    if file_format not in ('parquet', 'arrow'):
+        raise ValueError(f'{file_name} is not in Parquet or Arrow format.')
+    return 'ipc' if file_format == 'arrow' else file_format
+
+
+def arrow_table_to_dataframe(table, start=0, null_values=None) -> DataFrame:
+    """Convert an Arrow table into a DataFrame indexed from start.
+
+    Numerical and string columns keep their types, while dates and timestamps are rendered as strings as in CSV files,
+    since DateTime attributes are described by their strings. Dictionary-encoded columns are decoded, and strings in
+    null_values are missing values.
+    """
+    pa = import_optional_dependency('pyarrow')
+    pc = import_optional_dependency('pyarrow.compute')
+
+    null_values = [null_values] if isinstance(null_values, str) else null_values
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), field.type.value_type))
+            field = table.schema.field(i)
+        if null_values and (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            column = table.column(i)
+            is_null_value = pc.is_in(column, value_set=pa.array(null_values, field.type))
+            table = table.set_column(i, field.name, pc.if_else(is_null_value, pa.scalar(None, field.type), column))
+        elif pa.types.is_date(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), pa.string()))
+        elif pa.types.is_timestamp(field.type):
+            column = table.column(i)
+            try:
+                # %S renders the fractions of seconds of finer units, even if they are all zero.
+                column = pc.cast(column, pa.timestamp('s', field.type.tz))
+            except pa.ArrowInvalid:
+                pass
+            datetime_format = '%Y-%m-%d %H:%M:%S%z' if field.type.tz else '%Y-%m-%d %H:%M:%S'
+            table = table.set_column(i, field.name, pc.strftime(column, format=datetime_format))
+    dataframe = table.to_pandas()
+    dataframe.index += start
+    return dataframe
+
+
+def read_data_types_from_arrow_schema(file_name, file_format: str = None) -> Dict[str, DataType]:
+    """Data types of the integer and temporal columns of a Parquet or Arrow file, given by its schema.
+
+    Data types of other columns are left to be inferred from their values, e.g., float columns may hold integers with
+    missing values, as written by pandas.
+    """
+    pa = import_optional_dependency('pyarrow')
+    ds = import_optional_dependency('pyarrow.dataset')
+
+    attr_to_datatype = {}
+    for field in ds.dataset(file_name, format=arrow_dataset_format(file_name, file_format)).schema:
+        if pa.types.is_integer(field.type):
+            attr_to_datatype[field.name] = DataType.INTEGER
+        elif pa.types.is_date(field.type) or pa.types.is_timestamp(field.type):
+            attr_to_datatype[field.name] = DataType.DATETIME
+    return attr_to_datatype
+
+
+def arrow_schema_from_description(description: dict):
+    """Arrow schema of synthetic datasets generated from a dataset description, i.e., nullable int64 for Integer,
+    float64 for Float, timestamps in seconds (in UTC if their format has a time zone) for DateTime, and strings for
+    String and SocialSecurityNumber."""
+    pa = import_optional_dependency('pyarrow')
+
+    fields = []
+    for attr in description['meta']['all_attributes']:
+        attr_info = description['attribute_description'][attr]
+        data_type = DataType(attr_info['data_type'])
+        if data_type is DataType.INTEGER:
+            fields.append(pa.field(attr, pa.int64()))
+        elif data_type is DataType.FLOAT:
+            fields.append(pa.field(attr, pa.float64()))
+        elif data_type is DataType.DATETIME and attr_info.get('datetime_format'):
+            time_zone = 'UTC' if '%z' in attr_info['datetime_format'] else None
+            fields.append(pa.field(attr, pa.timestamp('s', tz=time_zone)))
+        else:
+            fields.append(pa.field(attr, pa.string()))
+    return pa.schema(fields)
+
+
+class SyntheticDataWriter(object):
+    """Append chunks of a synthetic dataset to a file as they are generated.
+
+    Parameters
+    ----------
+    file_name : str
+        Output file. The format is Parquet if the file name ends with '.parquet' or '.pq', Arrow IPC if it ends with
+        '.arrow', '.feather' or '.ipc', and CSV otherwise. CSV files ending with '.gz' are compressed by gzip, and those
+        ending with '.zst' by zstd, which requires the `zstandard` package (the 'zstd' extra).
+    file_format : str
+        One of 'csv', 'parquet' and 'arrow', overriding the format inferred from file_name. Parquet and Arrow require
+        the `pyarrow` package (the 'arrow' extra).
+    description : dict
+        Dataset description the synthetic dataset is generated from. Parquet and Arrow files take their schema from it,
+        see arrow_schema_from_description, otherwise from the first chunk.
+    """
+
+    def __init__(self, file_name, file_format: str = None, description: dict = None):
+        self.file_name = Path(file_name)
+        self.file_format = file_format or infer_file_format(self.file_name)
+        if self.file_format not in ('csv', 'parquet', 'arrow'):
+            raise ValueError(f'Unknown file format {self.file_format}.')
+
+        self.file = None
+        self.arrow_writer = None
+        self.schema = None
+        self.attr_to_datetime_format = {}
+        if description is not None and self.file_format != 'csv':
+            self.schema = arrow_schema_from_description(description)
+            self.attr_to_datetime_format = {attr: attr_info.get('datetime_format')
+                                            for attr, attr_info in description['attribute_description'].items()}
+        self.num_chunks = 0
+
+    def write(self, chunk: DataFrame):
+        if self.file_format == 'csv':
+            if self.file is None:
+                self.file = self.open_csv_file()
+            chunk.to_csv(self.file, header=self.num_chunks == 0, index=False)
+        else:
+            pa = import_optional_dependency('pyarrow')
+
+            if self.schema is None:
+                self.schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            if self.arrow_writer is None:
+                self.arrow_writer = self.open_arrow_writer()
+            table = pa.Table.from_pandas(self.convert_to_schema(chunk), schema=self.schema, preserve_index=False)
+            self.arrow_writer.write_table(table)
+        self.num_chunks += 1
+
+    def convert_to_schema(self, chunk: DataFrame) -> DataFrame:
+        """Convert the columns of a chunk that Arrow does not convert into the types of the schema by itself, i.e.,
+        datetimes rendered as strings or generated as timestamps, and non-string values of string attributes."""
+        pa = import_optional_dependency('pyarrow')
+
+        converted = {}
+        for field in self.schema:
+            column = chunk[field.name]
+            if pa.types.is_timestamp(field.type) and not is_datetime64_any_dtype(column.dtype):
+                if is_numeric_dtype(column.dtype):
+                    converted[field.name] = to_datetime(column, unit='s', utc=field.type.tz is not None)
+                else:
+                    converted[field.name] = to_datetime(column, format=self.attr_to_datetime_format.get(field.name),
+                                                        utc=field.type.tz is not None)
+            elif pa.types.is_string(field.type) and not is_string_dtype(column.dtype):
+                converted[field.name] = column.astype('string')
+        return chunk.assign(**converted) if converted else chunk
+
+    def open_arrow_writer(self):
+        if self.file_format == 'parquet':
+            pq = import_optional_dependency('pyarrow.parquet')
+            return pq.ParquetWriter(self.file_name, self.schema)
+        else:
+            pa = import_optional_dependency('pyarrow')
+            return pa.ipc.new_file(self.file_name, self.schema)
+
+    def open_csv_file(self):
+        if self.file_name.suffix == '.gz':
+            import gzip
+            return gzip.open(self.file_name, 'wt', newline='')
+        elif self.file_name.suffix == '.zst':
+            zstandard = import_optional_dependency('zstandard')
+            return zstandard.open(self.file_name, 'wt', newline='')
+        else:
+            return open(self.file_name, 'w', newline='')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.arrow_writer is not None:
+            self.arrow_writer.close()
+            self.arrow_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,125 @@
+import json
+import logging
+import sys
+import time
+from typing import Dict
+
+
+def peak_rss():
+    """Peak resident set size of the current process in bytes, or None where the resource module is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class Tracer(object):
+    """Callbacks at the boundaries of the phases of describing and generating datasets, e.g., reading the dataset,
+    learning the Bayesian network and sampling.
+
+    This base class is the default tracer, which ignores all phases: phase() returns a shared context doing nothing, so
+    untraced runs only pay for a method call. Subclasses set enabled to receive measured phases by overriding
+    phase_started, phase_ended and event.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether phases are measured and passed to the callbacks.
+    """
+    enabled = False
+
+    def phase(self, name, **fields):
+        """Context manager measuring a phase, e.g., `with tracer.phase('read_dataset') as phase: ...`. Fields such as
+        the number of rows processed are given here or added by `phase.update(rows=...)` once known."""
+        return Phase(self, name, fields) if self.enabled else NO_OP_PHASE
+
+    def phase_started(self, name, fields: Dict):
+        pass
+
+    def phase_ended(self, record: Dict):
+        """Receive the record of a phase, i.e., its fields along with 'phase', 'wall_time' and 'cpu_time' in seconds,
+        'peak_rss' in bytes so far (see peak_rss), and 'error' if the phase raised an exception."""
+        pass
+
+    def event(self, name, **fields):
+        """Receive a point in a phase, e.g., a chunk of the dataset being read."""
+        pass
+
+
+class Phase(object):
+    """A phase measured for a tracer, see `Tracer.phase`."""
+
+    def __init__(self, tracer: Tracer, name, fields: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+        self.wall_start = None
+        self.cpu_start = None
+
+    def update(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.tracer.phase_started(self.name, dict(self.fields))
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record = {'phase': self.name,
+                  'wall_time': time.perf_counter() - self.wall_start,
+                  'cpu_time': time.process_time() - self.cpu_start,
+                  'peak_rss': peak_rss(),
+                  **self.fields}
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.tracer.phase_ended(record)
+
+
+class NoOpPhase(object):
+    def update(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NO_OP_PHASE = NoOpPhase()
+NO_OP_TRACER = Tracer()
+
+
+class LoggingTracer(Tracer):
+    """Tracer logging every phase and event as one JSON object per message, e.g.,
+    {"event": "phase_ended", "phase": "greedy_bayes", "wall_time": 3.2, "cpu_time": 3.1, "peak_rss": 104857600, ...}.
+
+    Parameters
+    ----------
+    logger : logging.Logger
+        Logger of the messages, the 'DataSynthesizer' logger by default.
+    level : int
+        Level of the messages.
+    """
+    enabled = True
+
+    def __init__(self, logger: logging.Logger = None, level=logging.INFO):
+        self.logger = logger or logging.getLogger('DataSynthesizer')
+        self.level = level
+
+    def phase_started(self, name, fields: Dict):
+        self.log({'event': 'phase_started', 'phase': name, **fields})
+
+    def phase_ended(self, record: Dict):
+        self.log({'event': 'phase_ended', **record})
+
+    def event(self, name, **fields):
+        self.log({'event': name, **fields})
+
+    def log(self, entry: Dict):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps(entry, default=str))
@@ -1,17 +1,30 @@
 import json
 import random
+from math import log
 from string import ascii_lowercase
 
 import numpy as np
-from pandas import Series, DataFrame
+from pandas import Series, DataFrame, StringDtype, factorize
+from pandas.api.types import is_integer_dtype, is_unsigned_integer_dtype
 from sklearn.metrics import mutual_info_score, normalized_mutual_info_score
 
+from DataSynthesizer.lib.HyperLogLog import HyperLogLog
+
 
 def set_random_seed(seed=0):
     random.seed(seed)
     np.random.seed(seed)
 
 
+def random_generator(rng=None):
+    """Return rng, or the global random state of numpy (seeded by set_random_seed) if rng is None.
+
+    Callers only use the methods shared by `numpy.random.Generator` and the `numpy.random` module, e.g., random(),
+    choice(), uniform() and permutation().
+    """
+    return np.random if rng is None else rng
+
+
 def mutual_information(labels_x: Series, labels_y: DataFrame):
     """Mutual information of distributions in format of Series or DataFrame.
 
@@ -28,6 +41,115 @@ def mutual_information(labels_x: Series, labels_y: DataFrame):
     return mutual_info_score(labels_x, labels_y)
 
 
+def encode_columns_into_integer_codes(dataset: DataFrame):
+    """Encode every column of a DataFrame into non-negative integer codes.
+
+    Columns of binning indices, e.g., the output of `DataDescriber.encode_dataset_into_binning_indices`, are kept as they
+    are. Other columns are factorized by their string representations. A dataset whose columns are all unsigned integers
+    stored as rows of one array, e.g., mapped from the file written by `DataDescriber.encode_dataset_into_binning_indices`,
+    is returned as that array without a copy.
+
+    Parameters
+    ----------
+    dataset : DataFrame
+
+    Return
+    --------
+    (np.ndarray, list)
+        A 2-D array of shape (num_attributes, num_tuples), in which row i holds the codes of the i-th column, and the list
+        of cardinalities of the columns.
+    """
+    block = column_major_block(dataset)
+    if block is not None:
+        cardinalities = [int(row.max()) + 1 if row.size else 0 for row in block]
+        return block, cardinalities
+
+    columns = []
+    cardinalities = []
+    for attr in dataset:
+        column = dataset[attr]
+        if is_integer_dtype(column.dtype) and (column.size == 0 or column.min() >= 0):
+            codes = column.to_numpy()
+        else:
+            codes = factorize(column.astype(str))[0]
+        columns.append(codes)
+        cardinalities.append(int(codes.max()) + 1 if codes.size else 0)
+
+    dtype = np.min_scalar_type(max(cardinalities, default=0))
+    encoded = np.empty((len(columns), dataset.shape[0]), dtype=dtype)
+    for i, codes in enumerate(columns):
+        encoded[i] = codes
+    return encoded, cardinalities
+
+
+def column_major_block(dataset: DataFrame):
+    """The array of shape (num_attributes, num_tuples) holding the columns of dataset as its rows, if dataset is a view
+    of such an array of unsigned integers of up to 32 bits, otherwise None."""
+    if dataset.shape[1] == 0 or dataset.dtypes.nunique() != 1:
+        return None
+    dtype = dataset.dtypes.iloc[0]
+    if not isinstance(dtype, np.dtype) or not is_unsigned_integer_dtype(dtype) or dtype.itemsize > 4:
+        return None
+    block = dataset.to_numpy().T
+    return block if block.flags.c_contiguous else None
+
+
+def memory_mapped_file(array: np.ndarray):
+    """(file name, offset) of the part of a memory-mapped file an array is a view of, or None if it is not mapped."""
+    base = array
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    if base is None or getattr(base, 'filename', None) is None:
+        return None
+    offset = base.offset + array.__array_interface__['data'][0] - base.__array_interface__['data'][0]
+    return base.filename, offset
+
+
+def combine_integer_codes(codes: np.ndarray, cardinalities):
+    """Combine several columns of integer codes into one column by mixed-radix encoding.
+
+    Once the radix grows beyond the number of tuples, the partial result is re-labeled by its distinct values, so that the
+    combined codes never overflow and always fit into a `numpy.bincount` table of at most num_tuples entries.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        2-D array of shape (num_columns, num_tuples).
+    cardinalities : list
+        Cardinality of each column.
+
+    Return
+    --------
+    (np.ndarray, int)
+        Combined codes and their cardinality.
+    """
+    num_tuples = codes.shape[1]
+    combined = codes[0].astype(np.int64)
+    cardinality = cardinalities[0]
+    for column, column_cardinality in zip(codes[1:], cardinalities[1:]):
+        if cardinality * column_cardinality > max(num_tuples, 1):
+            uniques, combined = np.unique(combined, return_inverse=True)
+            cardinality = uniques.size
+        combined = combined * column_cardinality + column
+        cardinality *= column_cardinality
+    return combined, cardinality
+
+
+def entropy_of_integer_codes(labels: np.ndarray, cardinality):
+    """Entropy (in nats) of a column of non-negative integer codes smaller than cardinality."""
+    num_tuples = labels.size
+    if num_tuples == 0:
+        return 0.0
+
+    if cardinality <= 2 * num_tuples:
+        counts = np.bincount(labels, minlength=cardinality)
+        counts = counts[counts > 0]
+    else:
+        counts = np.unique(labels, return_counts=True)[1]
+    counts = counts.astype(float)
+    return max(log(num_tuples) - float((counts * np.log(counts)).sum()) / num_tuples, 0.0)
+
+
 def pairwise_attributes_mutual_information(dataset):
     """Compute normalized mutual information for all pairwise attributes. Return a DataFrame."""
     sorted_columns = sorted(dataset.columns)
@@ -53,6 +175,82 @@ def normalize_given_distribution(frequencies):
         return np.full_like(distribution, 1 / distribution.size)
 
 
+def normalize_given_distributions(frequencies):
+    """Normalize every distribution along the last axis in the same way as normalize_given_distribution."""
+    distributions = np.array(frequencies, dtype=float)
+    distributions = distributions.clip(0)  # replace negative values with 0
+    summations = distributions.sum(axis=-1)
+    infinite = np.isinf(summations)
+    if infinite.any():
+        distributions[infinite] = np.isinf(distributions[infinite])
+        summations[infinite] = distributions[infinite].sum(axis=-1)
+
+    positive = summations > 0
+    distributions[positive] /= summations[positive, np.newaxis]
+    distributions[~positive] = 1 / distributions.shape[-1]
+    return distributions
+
+
+def cumulative_distributions(distributions):
+    """Cumulative distributions along the last axis, whose last values are exactly 1."""
+    cdfs = np.cumsum(normalize_given_distributions(distributions), axis=-1)
+    cdfs[..., -1] = 1
+    return cdfs
+
+
+def sample_from_cumulative_distributions(cdfs: np.ndarray, rows: np.ndarray, uniforms: np.ndarray):
+    """Draw a value from the distribution cdfs[rows[i]] for every i, using uniforms[i] drawn from [0, 1).
+
+    The rows of cdfs are shifted apart and flattened into one increasing array, so that all values are drawn by a
+    single `numpy.searchsorted`.
+    """
+    num_rows, size = cdfs.shape
+    offsets = 2 * np.arange(num_rows, dtype=float)
+    shifted_cdfs = (cdfs + offsets[:, np.newaxis]).ravel()
+    positions = np.searchsorted(shifted_cdfs, uniforms + offsets[rows], side='right')
+    return np.minimum(positions - rows * size, size - 1)
+
+
+def parse_conditional_distributions(conditional_distributions: dict, num_parents=0, child_size=0):
+    """Parse the conditional distributions of a child in the dataset description.
+
+    Sparse conditional distributions may have no parents instance left, in which case the arrays are empty, with
+    num_parents columns and child_size columns respectively.
+
+    Return
+    --------
+    (np.ndarray, np.ndarray)
+        Parents instances of shape (num_instances, num_parents), sorted lexicographically, and the conditional
+        distributions of shape (num_instances, size of child domain) in the same order.
+    """
+    if not conditional_distributions:
+        return np.empty((0, num_parents), dtype=np.int64), np.empty((0, child_size), dtype=float)
+    parents_instances = np.array([json.loads(key) for key in conditional_distributions], dtype=np.int64)
+    distributions = np.array(list(conditional_distributions.values()), dtype=float)
+    order = np.lexsort(parents_instances.T[::-1])
+    return parents_instances[order], distributions[order]
+
+
+def lookup_parents_instances(parents_instances: np.ndarray, parents_values: np.ndarray):
+    """Find the row of parents_instances matching each row of parents_values, or -1 if there is none.
+
+    Parameters
+    ----------
+    parents_instances : np.ndarray
+        Sorted parents instances from parse_conditional_distributions.
+    parents_values : np.ndarray
+        Array of shape (num_tuples, num_parents).
+    """
+    if parents_instances.shape[0] == 0:
+        return np.full(parents_values.shape[0], -1)
+    dims = parents_instances.max(axis=0) + 1
+    known = (parents_values < dims).all(axis=1)
+    keys = np.ravel_multi_index(parents_instances.T, dims)
+    codes = np.ravel_multi_index(np.where(known[:, np.newaxis], parents_values, 0).T, dims)
+    rows = np.searchsorted(keys, codes).clip(max=keys.size - 1)
+    return np.where(known & (keys[rows] == codes), rows, -1)
+
+
 def read_json_file(json_file):
     with open(json_file, 'r') as file:
         return json.load(file)
@@ -68,6 +266,36 @@ def infer_numerical_attributes_in_dataframe(dataframe):
         return set()
 
 
+def count_distinct_values(values: Series, limit=None, block_size=65536):
+    """Number of distinct non-missing values, counted over blocks of block_size values.
+
+    Once there are more than limit distinct values, the counting stops early and returns limit + 1, so that only a
+    small set of distinct values is held in memory.
+    """
+    distinct_values = set()
+    for start in range(0, values.size, block_size):
+        distinct_values.update(values.iloc[start:start + block_size].dropna().unique())
+        if limit is not None and len(distinct_values) > limit:
+            return limit + 1
+    return len(distinct_values)
+
+
+def is_unique(values: Series, sketch_precision=14, block_size=65536):
+    """Whether all values are unique, as `Series.is_unique`.
+
+    The values are first added to a HyperLogLog sketch over blocks of block_size values, which stops as soon as the
+    values seen so far are unlikely to be unique. The exact check runs only for values that the sketch finds likely
+    unique. If sketch_precision is None, only the exact check runs.
+    """
+    if sketch_precision is not None:
+        sketch = HyperLogLog(sketch_precision)
+        for start in range(0, values.size, block_size):
+            sketch.update(values.iloc[start:start + block_size])
+            if not sketch.is_likely_unique(min(start + block_size, values.size)):
+                return False
+    return values.is_unique
+
+
 def display_bayesian_network(bn):
     length = 0
     for child, _ in bn:
@@ -81,3 +309,25 @@ def display_bayesian_network(bn):
 
 def generate_random_string(length):
     return ''.join(np.random.choice(list(ascii_lowercase), size=length))
+
+
+def generate_random_strings(lengths, rng=None):
+    """Generate a random string of lowercase letters for each length in lengths.
+
+    The letters of all strings are drawn at once into a single byte buffer, which is sliced by the cumulative lengths.
+    The strings are returned as a Series of the `pandas.StringDtype`, whose missing values are `pandas.NA`, either way.
+    It is backed by Arrow if `pyarrow` is installed (the 'arrow' extra), and by Python objects otherwise.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = np.zeros(lengths.size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    letters = np.frombuffer(ascii_lowercase.encode(), dtype=np.uint8)
+    buffer = letters[random_generator(rng).choice(letters.size, size=offsets[-1])]
+    try:
+        import pyarrow as pa
+    except ImportError:
+        text = buffer.tobytes().decode()
+        return Series([text[start:end] for start, end in zip(offsets[:-1], offsets[1:])], dtype=StringDtype('python'))
+
+    strings = pa.LargeStringArray.from_buffers(lengths.size, pa.py_buffer(offsets), pa.py_buffer(buffer))
+    return Series(strings, dtype=StringDtype('pyarrow'))
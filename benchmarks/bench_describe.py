@@ -0,0 +1,52 @@
+from tempfile import TemporaryDirectory
+
+from DataSynthesizer.DataDescriber import DataDescriber
+
+from .fixtures import describe_dataset, make_dataset, write_dataset
+
+
+class DescribeDataset:
+    """DataDescriber in each mode over datasets of growing numbers of rows and categorical attributes."""
+    params = (['random', 'independent', 'correlated'], [1000, 10000, 100000], [6, 24])
+    param_names = ['mode', 'num_rows', 'num_categorical']
+    timeout = 600
+
+    def setup(self, mode, num_rows, num_categorical):
+        self.directory = TemporaryDirectory()
+        self.dataset_file = write_dataset(make_dataset(num_rows, num_categorical), self.directory.name)
+
+    def teardown(self, mode, num_rows, num_categorical):
+        self.directory.cleanup()
+
+    def time_describe(self, mode, num_rows, num_categorical):
+        describe_dataset(self.dataset_file, mode, self.directory.name)
+
+    def peakmem_describe(self, mode, num_rows, num_categorical):
+        describe_dataset(self.dataset_file, mode, self.directory.name)
+
+
+class DescribeDatasetInChunks:
+    """DataDescriber in correlated attribute mode reading the dataset in chunks, with the encoded dataset in memory or
+    mapped from a file."""
+    params = ([100000, 1000000], [False, True])
+    param_names = ['num_rows', 'memory_mapped']
+    timeout = 600
+
+    def setup(self, num_rows, memory_mapped):
+        self.directory = TemporaryDirectory()
+        self.dataset_file = write_dataset(make_dataset(num_rows), self.directory.name)
+        self.encoded_dataset_file = f'{self.directory.name}/encoded.npy' if memory_mapped else None
+
+    def teardown(self, num_rows, memory_mapped):
+        self.directory.cleanup()
+
+    def describe(self):
+        describer = DataDescriber(category_threshold=20)
+        describer.describe_dataset_in_correlated_attribute_mode(self.dataset_file, k=2, epsilon=1, chunk_size=100000,
+                                                                encoded_dataset_file=self.encoded_dataset_file)
+
+    def time_describe_in_chunks(self, num_rows, memory_mapped):
+        self.describe()
+
+    def peakmem_describe_in_chunks(self, num_rows, memory_mapped):
+        self.describe()
@@ -0,0 +1,35 @@
+from tempfile import TemporaryDirectory
+
+from DataSynthesizer.DataGenerator import DataGenerator
+
+from .fixtures import describe_dataset, make_dataset, write_dataset
+
+
+class GenerateDataset:
+    """DataGenerator in each mode, generating datasets of growing sizes from the description of 10000 rows."""
+    params = (['random', 'independent', 'correlated'], [10000, 100000, 1000000])
+    param_names = ['mode', 'n']
+    timeout = 600
+
+    def setup(self, mode, n):
+        self.directory = TemporaryDirectory()
+        dataset_file = write_dataset(make_dataset(10000), self.directory.name)
+        self.description_file = describe_dataset(dataset_file, mode, self.directory.name)
+
+    def teardown(self, mode, n):
+        self.directory.cleanup()
+
+    def generate(self, mode, n):
+        generator = DataGenerator()
+        if mode == 'random':
+            generator.generate_dataset_in_random_mode(n, self.description_file, seed=0)
+        elif mode == 'independent':
+            generator.generate_dataset_in_independent_mode(n, self.description_file, seed=0)
+        else:
+            generator.generate_dataset_in_correlated_attribute_mode(n, self.description_file, seed=0)
+
+    def time_generate(self, mode, n):
+        self.generate(mode, n)
+
+    def peakmem_generate(self, mode, n):
+        self.generate(mode, n)
@@ -0,0 +1,19 @@
+from DataSynthesizer.lib.utils import pairwise_attributes_mutual_information
+
+from .fixtures import make_dataset
+
+
+class PairwiseAttributesMutualInformation:
+    """Normalized mutual information of all pairs of attributes, as in ModelInspector.mutual_information_heatmap."""
+    params = ([1000, 10000, 100000], [4, 8, 16])
+    param_names = ['num_rows', 'num_columns']
+    timeout = 600
+
+    def setup(self, num_rows, num_columns):
+        self.dataset = make_dataset(num_rows, num_columns, num_numerical=0, num_datetime=0, num_string=0)
+
+    def time_pairwise_attributes_mutual_information(self, num_rows, num_columns):
+        pairwise_attributes_mutual_information(self.dataset)
+
+    def peakmem_pairwise_attributes_mutual_information(self, num_rows, num_columns):
+        pairwise_attributes_mutual_information(self.dataset)
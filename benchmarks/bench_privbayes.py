@@ -0,0 +1,36 @@
+from DataSynthesizer.lib.PrivBayes import construct_noisy_conditional_distributions, greedy_bayes
+
+from .fixtures import make_encoded_dataset
+
+
+class GreedyBayes:
+    """Structure learning per degree k, in a single process so that timings do not depend on the machine's cores."""
+    params = ([1, 2, 3], [10000, 100000], [8, 16])
+    param_names = ['k', 'num_rows', 'num_columns']
+    timeout = 600
+
+    def setup(self, k, num_rows, num_columns):
+        self.dataset = make_encoded_dataset(num_rows, num_columns)
+
+    def time_greedy_bayes(self, k, num_rows, num_columns):
+        greedy_bayes(self.dataset, k, epsilon=1, seed=0, processes=1)
+
+    def peakmem_greedy_bayes(self, k, num_rows, num_columns):
+        greedy_bayes(self.dataset, k, epsilon=1, seed=0, processes=1)
+
+
+class ConstructConditionalDistributions:
+    """Noisy conditional distributions of a network of degree k, stored densely or sparsely."""
+    params = ([1, 2, 3], [10000, 100000], [None, 1000])
+    param_names = ['k', 'num_rows', 'max_dense_domain_size']
+    timeout = 600
+
+    def setup(self, k, num_rows, max_dense_domain_size):
+        self.dataset = make_encoded_dataset(num_rows, 8, cardinality=20)
+        self.network = greedy_bayes(self.dataset, k, epsilon=0, seed=0, processes=1)
+
+    def time_construct_noisy_conditional_distributions(self, k, num_rows, max_dense_domain_size):
+        construct_noisy_conditional_distributions(self.network, self.dataset, 1, max_dense_domain_size)
+
+    def peakmem_construct_noisy_conditional_distributions(self, k, num_rows, max_dense_domain_size):
+        construct_noisy_conditional_distributions(self.network, self.dataset, 1, max_dense_domain_size)
@@ -0,0 +1,86 @@
+"""Seeded input datasets of configurable shape for the benchmarks."""
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame, Timestamp, to_timedelta
+
+from DataSynthesizer.DataDescriber import DataDescriber
+
+
+def make_dataset(num_rows=10000, num_categorical=6, num_numerical=2, num_datetime=1, num_string=1, cardinality=10,
+                 string_cardinality=None, seed=0) -> DataFrame:
+    """Generate a dataset of num_rows rows with a mix of attributes, deterministically given seed.
+
+    Parameters
+    ----------
+    num_rows : int
+        Number of rows.
+    num_categorical : int
+        Number of integer columns of cardinality distinct values. Every column copies the previous one for half of the
+        rows, so that their pairs are correlated as in real datasets.
+    num_numerical : int
+        Number of numerical columns, alternately Integer ages and Float incomes.
+    num_datetime : int
+        Number of datetime columns, as strings spanning three years in the format '%Y-%m-%d %H:%M:%S'.
+    num_string : int
+        Number of string columns of string_cardinality distinct words, num_rows // 10 by default.
+    cardinality : int
+        Number of distinct values of the categorical columns.
+    string_cardinality : int
+        Number of distinct values of the string columns.
+    seed : int
+        Seed of the random number generator.
+    """
+    rng = np.random.default_rng(seed)
+    string_cardinality = string_cardinality or max(num_rows // 10, 1)
+    columns = {}
+
+    previous = rng.integers(0, cardinality, num_rows)
+    for i in range(num_categorical):
+        copied = rng.random(num_rows) < 0.5
+        column = np.where(copied, previous, rng.integers(0, cardinality, num_rows))
+        columns[f'category_{i}'] = column
+        previous = column
+
+    for i in range(num_numerical):
+        if i % 2 == 0:
+            columns[f'integer_{i}'] = rng.integers(18, 90, num_rows)
+        else:
+            columns[f'float_{i}'] = np.round(rng.lognormal(10, 1, num_rows), 2)
+
+    start = Timestamp('2020-01-01')
+    for i in range(num_datetime):
+        seconds = rng.integers(0, 3 * 365 * 86400, num_rows)
+        columns[f'datetime_{i}'] = (start + to_timedelta(seconds, unit='s')).strftime('%Y-%m-%d %H:%M:%S')
+
+    for i in range(num_string):
+        words = np.array([f'word{j:x}' for j in range(string_cardinality)])
+        columns[f'string_{i}'] = words[rng.integers(0, string_cardinality, num_rows)]
+
+    return DataFrame(columns)
+
+
+def make_encoded_dataset(num_rows=10000, num_columns=8, cardinality=10, seed=0) -> DataFrame:
+    """Generate a dataset of binning indices as taken by `PrivBayes.greedy_bayes`."""
+    dataset = make_dataset(num_rows, num_columns, 0, 0, 0, cardinality, seed=seed)
+    return dataset.astype(np.min_scalar_type(cardinality))
+
+
+def write_dataset(dataset: DataFrame, directory, name='input.csv') -> Path:
+    file_name = Path(directory) / name
+    dataset.to_csv(file_name, index=False)
+    return file_name
+
+
+def describe_dataset(dataset_file, mode, directory, k=2, epsilon=1, category_threshold=20, seed=0) -> Path:
+    """Describe a dataset in one of the modes 'random', 'independent' and 'correlated', and save its description."""
+    describer = DataDescriber(category_threshold=category_threshold)
+    if mode == 'random':
+        describer.describe_dataset_in_random_mode(dataset_file, seed=seed)
+    elif mode == 'independent':
+        describer.describe_dataset_in_independent_attribute_mode(dataset_file, epsilon=epsilon, seed=seed)
+    else:
+        describer.describe_dataset_in_correlated_attribute_mode(dataset_file, k=k, epsilon=epsilon, seed=seed)
+    description_file = Path(directory) / f'description_{mode}.json'
+    describer.save_dataset_description_to_file(description_file)
+    return description_file
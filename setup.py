@@ -17,13 +17,19 @@ with open(HERE / 'HISTORY.md') as history_file:
 
 requirements = [
     "numpy>=1.18.5",
-    "pandas>=1.0.5",
+    "pandas>=1.3.0",
     "scikit-learn>=0.23.1",
     "matplotlib>=3.2.2",
     "seaborn>=0.10.1",
     "python-dateutil>=2.8.1"
 ]
 
+# optional dependencies, for datasets in Parquet and Arrow formats and CSV files compressed by zstd.
+extra_requirements = {
+    'arrow': ['pyarrow>=7.0.0'],
+    'zstd': ['zstandard>=0.15.0'],
+}
+
 setup_requirements = ['pytest-runner', ]
 
 test_requirements = ['pytest>=5', ]
@@ -31,17 +37,18 @@ test_requirements = ['pytest>=5', ]
 setup(
     author="Data, Responsibly",
     author_email='dataresponsibly@gmail.com',
-    python_requires='>=3.7',
+    python_requires='>=3.8',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.7'
+        'Programming Language :: Python :: 3.8'
     ],
     description="Generate synthetic data that simulate a given dataset.",
     install_requires=requirements,
+    extras_require=extra_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     long_description_content_type='text/markdown',
@@ -0,0 +1,59 @@
+import numpy as np
+from pandas import Series
+
+from DataSynthesizer.datatypes.FloatAttribute import FloatAttribute
+from DataSynthesizer.datatypes.IntegerAttribute import IntegerAttribute
+from DataSynthesizer.datatypes.SocialSecurityNumberAttribute import SocialSecurityNumberAttribute
+from DataSynthesizer.datatypes.StringAttribute import StringAttribute
+
+
+def numerical_attribute(attribute_class, data):
+    attribute = attribute_class('x', False, False, 4, Series(data))
+    attribute.infer_domain()
+    attribute.infer_distribution()
+    return attribute
+
+
+def test_sample_values_within_bins():
+    rng = np.random.default_rng(0)
+    for attribute_class in (IntegerAttribute, FloatAttribute):
+        attribute = numerical_attribute(attribute_class, [0, 10, 20, 30, 40, 100])
+        assert attribute.distribution_bins.tolist() == [0, 25, 50, 75]
+
+        # the bin index 4 stands for missing values, and the last bin is open up to max.
+        indices = np.repeat([0, 1, 2, 3, 4], 2000)
+        values = attribute.sample_values_from_binning_indices(Series(indices, index=indices[::-1]), rng)
+        assert values.index.tolist() == indices[::-1].tolist()
+        values = values.to_numpy(dtype=float)
+        assert np.isnan(values[indices == 4]).all()
+        edges = [0, 25, 50, 75, 100]
+        for i in range(4):
+            assert (edges[i] <= values[indices == i]).all() and (values[indices == i] <= edges[i + 1]).all()
+        assert values[indices == 3].max() > 95
+
+        integral = np.array_equal(values[indices < 4], np.round(values[indices < 4]))
+        assert integral == (attribute_class is IntegerAttribute)
+
+
+def test_sample_categorical_values():
+    attribute = StringAttribute('x', False, True, 20, Series(['b', 'a', None, 'c', 'a']))
+    attribute.infer_domain()
+    attribute.infer_distribution()
+    values = attribute.sample_values_from_binning_indices(Series([2, 0, 3, 1]), np.random.default_rng(0))
+    assert values[[0, 1, 3]].tolist() == ['c', 'a', 'b'] and values.isnull()[2]
+
+
+def test_sample_social_security_numbers():
+    data = ['123-45-6789', '001-00-0001', '999-99-9999', '500-00-0000']
+    attribute = numerical_attribute(SocialSecurityNumberAttribute, data)
+    indices = np.repeat([0, 3, 4], 100)
+    values = attribute.sample_values_from_binning_indices(Series(indices), np.random.default_rng(0))
+
+    # SocialSecurityNumbers are drawn within the bins, and rendered as AAA-GG-SSSS.
+    assert values[indices == 4].isnull().all()
+    ssns = values[indices < 4]
+    assert ssns.str.fullmatch(r'\d{3}-\d{2}-\d{4}').all()
+    numbers = ssns.str.replace('-', '').astype(int).to_numpy()
+    edges = attribute.distribution_bins
+    assert ((edges[0] <= numbers[:100]) & (numbers[:100] <= edges[1])).all()
+    assert ((edges[3] <= numbers[100:]) & (numbers[100:] <= attribute.max)).all()
@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from DataSynthesizer.DataDescriber import DataDescriber
+from DataSynthesizer.DataGenerator import DataGenerator
+from DataSynthesizer.PartialDescription import PartialDescription
+from DataSynthesizer.datatypes.utils.DataType import DataType
+
+
+def test_describe_dataset_in_chunks(tmp_path):
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    parameters = {'k': 2, 'epsilon': 1, 'attribute_to_is_categorical': {'education': True}, 'seed': 1}
+
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(input_data, **parameters)
+
+    chunked_describer = DataDescriber(category_threshold=20)
+    encoded_dataset_file = tmp_path / 'encoded.npy'
+    chunked_describer.describe_dataset_in_correlated_attribute_mode(input_data, chunk_size=97,
+                                                                    encoded_dataset_file=encoded_dataset_file,
+                                                                    **parameters)
+
+    assert chunked_describer.data_description == describer.data_description
+    assert np.array_equal(np.load(encoded_dataset_file), describer.df_encoded.to_numpy().T)
+
+
+def test_describe_dataset_in_chunks_in_independent_attribute_mode():
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    parameters = {'epsilon': 1, 'numerical_attribute_ranges': {'age': [10, 100]}, 'seed': 1}
+
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_independent_attribute_mode(input_data, **parameters)
+    chunked_describer = DataDescriber(category_threshold=20)
+    chunked_describer.describe_dataset_in_independent_attribute_mode(input_data, chunk_size=97, **parameters)
+    assert chunked_describer.data_description == describer.data_description
+
+    # the histogram of age is accumulated over its range, and no codes are kept for binning indices.
+    assert chunked_describer.attr_to_statistics['age'].histogram is not None
+    assert chunked_describer.attr_to_statistics['age'].values_file is None
+    assert all(statistics.codes_file is None for statistics in chunked_describer.attr_to_statistics.values())
+
+
+def test_describe_dataset_with_streaming_parent_selection():
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    parameters = {'k': 2, 'epsilon': 0, 'seed': 1}
+
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(input_data, **parameters)
+    streaming_describer = DataDescriber(category_threshold=20)
+    streaming_describer.describe_dataset_in_correlated_attribute_mode(input_data, streaming=True, block_size=4,
+                                                                      **parameters)
+    assert streaming_describer.data_description == describer.data_description
+
+
+def test_describe_dataset_from_partial_descriptions(tmp_path):
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    df = pd.read_csv(input_data)
+    partitions = []
+    for i, rows in enumerate(np.array_split(np.arange(df.shape[0]), 3)):
+        partitions.append(tmp_path / f'partition_{i}.csv')
+        df.iloc[rows].to_csv(partitions[-1], index=False)
+
+    describer = DataDescriber()
+    describer.describe_dataset_in_correlated_attribute_mode(input_data, k=2, epsilon=0, seed=1)
+
+    partial_descriptions = []
+    for i, partition in enumerate(partitions):
+        partial_descriptions.append(tmp_path / f'partition_{i}.json')
+        DataDescriber().describe_partition(partition, dataset_description=describer.data_description,
+                                           chunk_size=50).save(partial_descriptions[-1])
+    partial_description = PartialDescription.merge_all(PartialDescription.load(f) for f in partial_descriptions)
+
+    merged_describer = DataDescriber()
+    merged_describer.describe_dataset_from_partial_description(partial_description, epsilon=0, seed=1)
+
+    # the Bayesian network is loaded from JSON, with lists in place of tuples.
+    describer.data_description['bayesian_network'] = [list(node) for node in describer.bayesian_network]
+    assert merged_describer.data_description == describer.data_description
+
+
+def test_infer_attribute_data_types():
+    rng = np.random.default_rng(0)
+    size = 1000
+    dataset = pd.DataFrame({'integer': rng.integers(0, 100, size).astype(float),
+                            'float': np.append(rng.integers(0, 100, size - 1), 0.5),
+                            'datetime': pd.date_range('2020-01-01', periods=size).strftime('%d/%m/%Y'),
+                            'ssn': [f'{i:03}-45-6789' for i in range(1, size + 1)],
+                            'string': rng.choice(['a', 'b'], size),
+                            'numbers': np.append(rng.integers(1, 28, size - 1).astype(str), '<NULL>')})
+    dataset.loc[::7, 'integer'] = np.nan
+
+    describer = DataDescriber()
+    describer.df_input = dataset
+    describer.attr_to_datatype = {'string': DataType.STRING}
+    describer.infer_attribute_data_types()
+    assert describer.attr_to_datatype == {'integer': DataType.INTEGER,
+                                          'float': DataType.FLOAT,
+                                          'datetime': DataType.DATETIME,
+                                          'ssn': DataType.SOCIAL_SECURITY_NUMBER,
+                                          'string': DataType.STRING,
+                                          'numbers': DataType.STRING}
+
+
+def test_describe_dataset_in_parquet_format(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = pd.read_csv(Path(__file__).parent / 'data' / 'adult_tiny.csv', skipinitialspace=True)
+    df['hired'] = pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(df.shape[0]) * 25200, unit='s')
+    df.to_parquet(tmp_path / 'adult.parquet', index=False)
+    df.assign(hired=df['hired'].dt.strftime('%Y-%m-%d %H:%M:%S')).to_csv(tmp_path / 'adult.csv', index=False)
+    parameters = {'k': 2, 'epsilon': 0, 'attribute_to_is_categorical': {'education': True}}
+
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(tmp_path / 'adult.csv', **parameters)
+    for chunk_size in (None, 97):
+        parquet_describer = DataDescriber(category_threshold=20)
+        parquet_describer.describe_dataset_in_correlated_attribute_mode(tmp_path / 'adult.parquet',
+                                                                        chunk_size=chunk_size, **parameters)
+        assert parquet_describer.data_description == describer.data_description
+
+    columns = ['sex', 'age', 'hired']
+    pruned_describer = DataDescriber(category_threshold=20, columns=columns)
+    pruned_describer.describe_dataset_in_independent_attribute_mode(tmp_path / 'adult.parquet')
+    assert pruned_describer.data_description['meta']['all_attributes'] == columns
+    pruned_describer.save_dataset_description_to_file(tmp_path / 'description.json')
+
+    generator = DataGenerator()
+    generator.generate_dataset_in_independent_mode(100, tmp_path / 'description.json')
+    generator.save_synthetic_data(tmp_path / 'synthetic.parquet')
+    synthetic = pd.read_parquet(tmp_path / 'synthetic.parquet')
+    assert synthetic['age'].dtype == np.int64
+    assert pd.api.types.is_datetime64_dtype(synthetic['hired'])
@@ -8,12 +8,11 @@ from DataSynthesizer.ModelInspector import ks_test, kl_test
 from DataSynthesizer.lib.utils import pairwise_attributes_mutual_information
 
 
-def test_datasynthesizer():
-    data_dir = Path(__file__).parent / 'data'
-    input_data = data_dir / 'adult_tiny.csv'
-    description_file = data_dir / 'description.json'
-    output_data = data_dir / 'output.csv'
-    uniform_data = data_dir / 'output_uniform.csv'
+def test_datasynthesizer(tmp_path):
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    description_file = tmp_path / 'description.json'
+    output_data = tmp_path / 'output.csv'
+    uniform_data = tmp_path / 'output_uniform.csv'
 
     threshold_value = 20
     categorical_attributes = {'education': True}
@@ -0,0 +1,53 @@
+import numpy as np
+from dateutil.parser import parse
+from pandas import Series, date_range
+
+from DataSynthesizer.datatypes.DateTimeAttribute import (DateTimeAttribute, infer_datetime_format,
+                                                         parse_datetimes_into_timestamps)
+from DataSynthesizer.datatypes.utils.AttributeLoader import parse_json
+
+
+def test_parse_datetimes_into_timestamps():
+    values = Series(['2020-01-05 10:11:12', '1969-12-31 23:59:59', 'March 3, 2001', '2001-02-03 00:00:00'],
+                    index=[4, 2, 7, 1])
+    assert infer_datetime_format(values) == '%Y-%m-%d %H:%M:%S'
+
+    timestamps = parse_datetimes_into_timestamps(values)
+    epoch = parse('1970-01-01')
+    assert timestamps.index.tolist() == [4, 2, 7, 1]
+    assert timestamps.tolist() == [int((parse(value) - epoch).total_seconds()) for value in values]
+
+
+def test_format_timestamps_in_source_format():
+    data = Series(['05/01/2020', None, '12/31/1969', '02/03/2001'])
+    attribute = DateTimeAttribute('date', False, False, 20, data)
+    attribute.infer_domain()
+    attribute.infer_distribution()
+
+    loaded = parse_json(attribute.to_json())
+    assert loaded.datetime_format == '%m/%d/%Y'
+    rendered = loaded.format_timestamps(Series([attribute.timestamps[0], None, attribute.timestamps[2]]))
+    assert rendered[0] == '05/01/2020' and rendered.isnull()[1] and rendered[2] == '12/31/1969'
+
+
+def test_candidate_keys_unique_across_chunks():
+    data = Series(date_range('2020-01-01', periods=30, freq='D').strftime('%Y-%m-%d'))
+    attribute = DateTimeAttribute('date', True, False, 20, data)
+    attribute.infer_domain()
+    assert attribute.format_resolution() == 86400
+
+    # 30 days hold 20 keys in the format of the dataset, but 300 keys fall back to seconds since 1970-01-01.
+    keys = np.concatenate([attribute.generate_values_as_candidate_key(10, offset=offset, total=20) for offset in (0, 10)])
+    assert len(set(keys)) == 20
+    assert all(attribute.min <= timestamp <= attribute.max for timestamp in parse_datetimes_into_timestamps(Series(keys)))
+    keys = np.concatenate([attribute.generate_values_as_candidate_key(100, offset=offset, total=300)
+                           for offset in (0, 100, 200)])
+    assert len(set(keys)) == 300
+
+    data = Series(date_range('2020-01-01', periods=100, freq='s').strftime('%Y-%m-%d %H:%M:%S'))
+    attribute = DateTimeAttribute('time', True, False, 20, data)
+    attribute.infer_domain()
+    assert attribute.format_resolution() == 1
+    keys = np.concatenate([attribute.generate_values_as_candidate_key(100, offset=offset, total=300)
+                           for offset in (0, 100, 200)])
+    assert len(set(keys)) == 300
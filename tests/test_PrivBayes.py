@@ -0,0 +1,214 @@
+import numpy as np
+from pandas import DataFrame
+from sklearn.metrics import mutual_info_score
+
+from DataSynthesizer.lib.PrivBayes import (MutualInformationScorer, best_first_argmax,
+                                           construct_noisy_conditional_distributions, exponential_mechanism,
+                                           get_noisy_distribution_of_attributes,
+                                           get_sparse_noisy_distribution_of_attributes, greedy_bayes,
+                                           gumbel_max_mechanism, laplace_noise_parameter,
+                                           marginalize_distribution_of_attributes)
+from DataSynthesizer.lib.tracing import Tracer
+from DataSynthesizer.lib.utils import encode_columns_into_integer_codes, mutual_information
+
+
+class RoundRecorder(Tracer):
+    enabled = True
+
+    def __init__(self):
+        self.rounds = []
+
+    def phase_ended(self, record):
+        if record['phase'] == 'greedy_bayes_round':
+            self.rounds.append(record)
+
+
+def test_mutual_information_scorer():
+    rng = np.random.default_rng(0)
+    dataset = DataFrame({'x': rng.integers(0, 5, 1000),
+                         'y1': rng.integers(0, 300, 1000),
+                         'y2': rng.choice(['a', 'b', 'c'], 1000)})
+    dataset['x'] = (dataset['x'] + dataset['y1'] % 3) % 5
+
+    codes, cardinalities = encode_columns_into_integer_codes(dataset)
+    scorer = MutualInformationScorer(codes, cardinalities, cache_size=2)
+    for parents in ([1], [2], [1, 2]):
+        expected = mutual_information(dataset['x'].astype(str), dataset.iloc[:, parents].astype(str))
+        assert np.isclose(scorer.score(0, parents), expected)
+        # the entropy of the parents is now memoized.
+        assert np.isclose(scorer.score(0, parents), expected)
+    assert list(scorer.parents_entropies) == [(2,), (1, 2)]
+
+    assert np.isclose(scorer.score(0, [0]), mutual_info_score(dataset['x'], dataset['x']))
+
+
+def test_distribution_of_attributes():
+    rng = np.random.default_rng(0)
+    encoded_dataset = DataFrame({'a': rng.integers(0, 3, 500), 'b': rng.integers(0, 4, 500), 'c': rng.integers(0, 2, 500)})
+    # the combination a=2, b=3 never occurs.
+    encoded_dataset.loc[(encoded_dataset['a'] == 2) & (encoded_dataset['b'] == 3), 'b'] = 0
+    attributes = ['b', 'a', 'c']
+
+    stats = get_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon=0)
+    assert stats.shape == (4, 3, 2)
+    expected = encoded_dataset.groupby(attributes).size()
+    assert stats.sum() == 500
+    for (b, a, c), count in expected.items():
+        assert stats[b, a, c] == count
+    assert np.all(stats[3, 2] == 0)
+
+    marginal = marginalize_distribution_of_attributes(stats, attributes, ['a', 'b'])
+    expected = encoded_dataset.groupby(['a', 'b']).size().unstack(fill_value=0)
+    assert np.array_equal(marginal, expected.to_numpy())
+    assert marginal[2, 3] == 0
+
+
+def test_sparse_conditional_distributions():
+    rng = np.random.default_rng(0)
+    encoded_dataset = DataFrame({'a': rng.integers(0, 50, 2000),
+                                 'b': rng.integers(0, 40, 2000),
+                                 'c': rng.integers(0, 3, 2000)})
+    bayesian_network = [['b', ['a']], ['c', ['a', 'b']]]
+
+    dense = construct_noisy_conditional_distributions(bayesian_network, encoded_dataset, epsilon=0)
+    sparse = construct_noisy_conditional_distributions(bayesian_network, encoded_dataset, epsilon=0,
+                                                       max_dense_domain_size=100)
+    assert len(dense['c']) == 50 * 40
+    assert 0 < len(sparse['c']) < len(dense['c'])
+    for parents_instance, dist in sparse['c'].items():
+        assert np.allclose(dist, dense['c'][parents_instance])
+    assert np.allclose(sparse['a'], dense['a'])
+
+
+def test_sparse_noisy_distribution():
+    rng = np.random.default_rng(0)
+    encoded_dataset = DataFrame({'a': rng.choice([0, 99], 5000), 'b': rng.choice([0, 99], 5000),
+                                 'c': rng.integers(0, 10, 5000)})
+    attributes = ['a', 'b', 'c']
+    occupied_cells = np.unique(np.ravel_multi_index(encoded_dataset.to_numpy().T, (100, 100, 10)))
+
+    np.random.seed(0)
+    cells, counts, shape = get_sparse_noisy_distribution_of_attributes(attributes, encoded_dataset, epsilon=1)
+    noise_para = laplace_noise_parameter(2, 3, 5000, 1)
+    threshold = noise_para * np.log(100 * 100 * 10 / (2 * 5000))
+    assert shape == (100, 100, 10)
+    assert np.array_equal(cells, np.unique(cells))
+    assert np.all(counts > threshold)
+
+    # the 40 occupied cells of about 125 tuples are all kept with their noisy counts.
+    occupied = np.isin(cells, occupied_cells)
+    assert occupied.sum() == occupied_cells.size
+    assert abs(counts[occupied].sum() - 5000) < 10 * noise_para * np.sqrt(2 * occupied_cells.size)
+
+    # about num_tuples empty cells cross the threshold, with the threshold plus exponential noises.
+    rate = 0.5 * np.exp(-threshold / noise_para)
+    num_empty_cells = 100 * 100 * 10 - occupied_cells.size
+    expected = num_empty_cells * rate
+    assert abs((~occupied).sum() - expected) < 5 * np.sqrt(expected * (1 - rate))
+    assert abs(counts[~occupied].mean() - threshold - noise_para) < 0.1 * noise_para
+
+
+def test_scores_cached_across_rounds():
+    rng = np.random.default_rng(0)
+    parent = rng.integers(0, 4, 3000)
+    encoded_dataset = DataFrame({'a': parent,
+                                 'b': np.where(rng.random(3000) < 0.7, parent, rng.integers(0, 4, 3000)),
+                                 'c': rng.integers(0, 3, 3000),
+                                 'd': rng.integers(0, 2, 3000),
+                                 'e': (parent + rng.integers(0, 2, 3000)) % 4,
+                                 'f': rng.integers(0, 5, 3000)})
+
+    for epsilon in [0, 1]:
+        tracer = RoundRecorder()
+        network = greedy_bayes(encoded_dataset, 2, epsilon, processes=1, best_first=False, tracer=tracer)
+        assert greedy_bayes(encoded_dataset, 2, epsilon, processes=1, best_first=False, cache_scores=False) == network
+
+        # once V has more than k attributes, only the parent sets including the last added attribute are scored, i.e.,
+        # k / |V| of the candidates, where V has as many attributes as the number of the round.
+        for record in tracer.rounds:
+            if record['round'] > 2:
+                assert record['scored'] < record['candidates']
+                assert record['scored'] == record['candidates'] * 2 // record['round']
+            else:
+                assert record['scored'] == record['candidates']
+
+
+def test_parent_selection_in_worker_processes(tmp_path):
+    rng = np.random.default_rng(0)
+    parent = rng.integers(0, 4, 3000)
+    encoded_dataset = DataFrame({'a': parent,
+                                 'b': np.where(rng.random(3000) < 0.7, parent, rng.integers(0, 4, 3000)),
+                                 'c': rng.integers(0, 3, 3000),
+                                 'd': (parent + rng.integers(0, 2, 3000)) % 4})
+    network = greedy_bayes(encoded_dataset, 2, 0, processes=1)
+
+    # the encoded dataset is copied into shared memory, or mapped from its file by the worker processes.
+    assert greedy_bayes(encoded_dataset, 2, 0, processes=2) == network
+    mapped = np.lib.format.open_memmap(tmp_path / 'encoded.npy', mode='w+', dtype=np.uint8,
+                                       shape=encoded_dataset.shape[::-1])
+    mapped[:] = encoded_dataset.to_numpy().T
+    mapped_dataset = DataFrame(mapped.T, columns=encoded_dataset.columns, copy=False)
+    assert greedy_bayes(mapped_dataset, 2, 0, processes=2) == network
+
+
+def test_streaming_parent_selection():
+    rng = np.random.default_rng(0)
+    parent = rng.integers(0, 4, 3000)
+    encoded_dataset = DataFrame({'a': parent,
+                                 'b': np.where(rng.random(3000) < 0.7, parent, rng.integers(0, 4, 3000)),
+                                 'c': rng.integers(0, 3, 3000),
+                                 'd': rng.integers(0, 2, 3000),
+                                 'e': (parent + rng.integers(0, 2, 3000)) % 4})
+
+    network = greedy_bayes(encoded_dataset, 2, 0, processes=1)
+    assert greedy_bayes(encoded_dataset, 2, 0, processes=1, streaming=True, block_size=3) == network
+    assert greedy_bayes(encoded_dataset, 2, 0, processes=1, streaming=True, cache_scores=True) == network
+
+    # streaming keeps no scores across rounds by default, so every candidate of a round is scored.
+    tracer = RoundRecorder()
+    assert greedy_bayes(encoded_dataset, 2, 0, processes=1, streaming=True, tracer=tracer) == network
+    assert all(record['scored'] == record['candidates'] for record in tracer.rounds)
+
+    # exponential_mechanism does not overflow, and Gumbel-max choices follow its distribution.
+    candidates = [('a', ['b']), ('a', ['c']), ('c', ['b']), ('b', ['c', 'a'])]
+    mutual_info = [0.0, 0.1, 0.2, 0.05]
+    attr_to_is_binary = {'a': False, 'b': True, 'c': False}
+    distribution = exponential_mechanism(0.1, mutual_info, candidates, attr_to_is_binary, 1000, 3)
+    assert np.array_equal(exponential_mechanism(1, [1e4, 0], candidates[:2], attr_to_is_binary, 1000, 3), [1, 0])
+
+    np.random.seed(0)
+    choices = [gumbel_max_mechanism(0.1, iter(candidates), lambda block: [mutual_info[candidates.index(c)] for c in block],
+                                    attr_to_is_binary, 1000, 3, block_size=3)[0] for _ in range(10000)]
+    frequencies = np.bincount([candidates.index(choice) for choice in choices], minlength=4) / len(choices)
+    assert np.abs(frequencies - distribution).max() < 0.02
+
+
+def test_best_first_parent_selection():
+    rng = np.random.default_rng(0)
+    chain = [rng.integers(0, 16, 2000)]
+    for _ in range(3):
+        chain.append((chain[-1] + rng.integers(0, 2, 2000)) % 16)
+    encoded_dataset = DataFrame({**{f'g{i}': codes for i, codes in enumerate(chain)},
+                                 **{f'x{i}': rng.integers(0, 2, 2000) for i in range(4)},
+                                 'copy': chain[0], 'constant': np.zeros(2000, dtype=int)})
+
+    for k in [1, 2, 3]:
+        network = greedy_bayes(encoded_dataset, k, 0, seed=k, processes=1, best_first=False)
+        assert greedy_bayes(encoded_dataset, k, 0, seed=k, processes=1) == network
+        assert greedy_bayes(encoded_dataset, k, 0, seed=k, processes=1, cache_scores=False) == network
+
+    # binary children are not scored once a child of the chain beats their bound of H(child) <= log(2).
+    codes, cardinalities = encode_columns_into_integer_codes(encoded_dataset)
+    scorer = MutualInformationScorer(codes, cardinalities)
+    attr_to_idx = {attr: idx for idx, attr in enumerate(encoded_dataset.columns)}
+    candidates = [(child, ['g0']) for child in encoded_dataset.columns if child != 'g0']
+    scored = []
+
+    def score(pairs):
+        scored.extend(pairs)
+        return [scorer.score(attr_to_idx[child], [attr_to_idx[p] for p in parents]) for child, parents in pairs]
+
+    mutual_info = [scorer.score(attr_to_idx[child], [attr_to_idx[p] for p in parents]) for child, parents in candidates]
+    assert best_first_argmax(candidates, score, scorer, attr_to_idx, batch_size=1) == candidates.index(('copy', ['g0']))
+    assert mutual_info.index(max(mutual_info)) == candidates.index(('copy', ['g0']))
+    assert not any(child.startswith('x') or child == 'constant' for child, _ in scored)
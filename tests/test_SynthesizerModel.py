@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+
+from DataSynthesizer.DataDescriber import DataDescriber
+from DataSynthesizer.SynthesizerModel import SynthesizerModel
+from DataSynthesizer.lib.utils import parse_conditional_distributions
+
+
+def test_sample_in_chunks():
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(dataset_file=input_data,
+                                                            epsilon=1,
+                                                            k=2,
+                                                            attribute_to_is_candidate_key={'age': True})
+
+    model = SynthesizerModel(describer.data_description, 'correlated')
+    synthetic_dataset = model.sample(2500, seed=1, processes=1, chunk_size=1000)
+    assert synthetic_dataset.shape == (2500, 6)
+    assert synthetic_dataset['age'].is_unique
+    assert synthetic_dataset.equals(model.sample(2500, seed=1, processes=2, chunk_size=1000))
+
+
+def test_sample_child_without_conditional_distributions():
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(dataset_file=input_data, epsilon=0, k=2)
+    description = describer.data_description
+
+    # thresholding sparse conditional distributions may drop every cell of a child.
+    child, parents = description['bayesian_network'][-1]
+    parents_instances, dists = parse_conditional_distributions({}, len(parents), 4)
+    assert parents_instances.shape == (0, len(parents)) and dists.shape == (0, 4)
+    description['conditional_probabilities'][child] = {}
+
+    model = SynthesizerModel(description, 'correlated')
+    encoded_dataset = model.generate_encoded_dataset(20000, rng=np.random.default_rng(0))
+    marginal = description['attribute_description'][child]['distribution_probabilities']
+    frequencies = np.bincount(encoded_dataset[child], minlength=len(marginal)) / 20000
+    assert np.abs(frequencies - marginal).max() < 0.02
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from DataSynthesizer.DataDescriber import DataDescriber
+from DataSynthesizer.DataGenerator import DataGenerator
+from DataSynthesizer.lib.file_io import SyntheticDataWriter
+
+
+@pytest.fixture(scope='module')
+def description_file(tmp_path_factory):
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    describer = DataDescriber(category_threshold=20)
+    describer.describe_dataset_in_correlated_attribute_mode(dataset_file=input_data, epsilon=1, k=2,
+                                                            attribute_to_is_candidate_key={'age': True})
+    description_file = tmp_path_factory.mktemp('description') / 'description.json'
+    describer.save_dataset_description_to_file(description_file)
+    return description_file
+
+
+@pytest.mark.parametrize('file_name, required_module', [('synthetic.csv', None),
+                                                        ('synthetic.csv.gz', None),
+                                                        ('synthetic.csv.zst', 'zstandard'),
+                                                        ('synthetic.parquet', 'pyarrow')])
+def test_write_synthetic_data_in_chunks(tmp_path, description_file, file_name, required_module):
+    if required_module:
+        pytest.importorskip(required_module)
+    to_file = tmp_path / file_name
+    DataGenerator.save_synthetic_data_in_chunks(2500, description_file, to_file, chunk_size=1000)
+
+    if to_file.suffix == '.parquet':
+        synthetic_dataset = pd.read_parquet(to_file)
+    else:
+        synthetic_dataset = pd.read_csv(to_file)
+    assert synthetic_dataset.shape == (2500, 6)
+    assert synthetic_dataset['age'].is_unique
+
+
+def test_missing_optional_dependency(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+    with pytest.raises(ImportError, match=r'DataSynthesizer\[zstd\]'):
+        with SyntheticDataWriter(tmp_path / 'synthetic.csv.zst') as writer:
+            writer.write(pd.DataFrame({'a': [1, 2]}))
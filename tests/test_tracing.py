@@ -0,0 +1,41 @@
+import json
+import logging
+from pathlib import Path
+
+from DataSynthesizer.DataDescriber import DataDescriber
+from DataSynthesizer.DataGenerator import DataGenerator
+from DataSynthesizer.lib.tracing import NO_OP_PHASE, LoggingTracer, Tracer
+
+
+def test_trace_phases_of_describing_and_generating(tmp_path, caplog):
+    input_data = Path(__file__).parent / 'data' / 'adult_tiny.csv'
+    tracer = LoggingTracer()
+    with caplog.at_level(logging.INFO, logger='DataSynthesizer'):
+        describer = DataDescriber(category_threshold=20, tracer=tracer)
+        describer.describe_dataset_in_correlated_attribute_mode(input_data, k=2, epsilon=1, chunk_size=97)
+        describer.save_dataset_description_to_file(tmp_path / 'description.json')
+        DataGenerator.save_synthetic_data_in_chunks(300, tmp_path / 'description.json', tmp_path / 'synthetic.csv',
+                                                    chunk_size=100, tracer=tracer)
+
+    entries = [json.loads(record.getMessage()) for record in caplog.records]
+    records = {entry['phase']: entry for entry in entries if entry['event'] == 'phase_ended'}
+    assert list(records) == ['infer_data_types', 'read_dataset', 'attribute_domains', 'attribute_distributions',
+                             'encode_dataset', 'greedy_bayes_round', 'greedy_bayes', 'noisy_distribution',
+                             'conditional_distributions', 'load_model', 'generate']
+    num_tuples = describer.data_description['meta']['num_tuples']
+    assert records['read_dataset']['rows'] == records['encode_dataset']['rows'] == num_tuples
+    assert records['greedy_bayes']['scored'] > 0
+    assert records['generate']['rows'] == 300
+    for record in records.values():
+        assert record['wall_time'] >= 0 and record['cpu_time'] >= 0 and 'error' not in record
+    assert [entry['rows'] for entry in entries if entry['event'] == 'chunk_written'] == [100, 200, 300]
+
+    rounds = [entry for entry in entries if entry.get('phase') == 'greedy_bayes_round' and 'attribute' in entry]
+    assert [entry['attribute'] for entry in rounds] == [child for child, _ in describer.bayesian_network]
+
+
+def test_no_op_tracer():
+    tracer = Tracer()
+    assert tracer.phase('read_dataset', rows=10) is NO_OP_PHASE
+    with tracer.phase('read_dataset') as phase:
+        phase.update(rows=10)
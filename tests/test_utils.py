@@ -0,0 +1,69 @@
+import numpy as np
+from pandas import DataFrame, Series
+
+from DataSynthesizer.lib.HyperLogLog import HyperLogLog
+from DataSynthesizer.lib.utils import (count_distinct_values, cumulative_distributions, encode_columns_into_integer_codes,
+                                       generate_random_strings, is_unique, memory_mapped_file,
+                                       sample_from_cumulative_distributions)
+
+
+def test_sample_from_cumulative_distributions():
+    rng = np.random.default_rng(0)
+    distributions = np.array([[0.0, 0.5, 0.5, 0.0],
+                              [1.0, 0.0, 0.0, 0.0],
+                              [0.0, 0.0, 0.0, 1.0],
+                              [0.1, 0.2, 0.3, 0.4]])
+    rows = rng.integers(0, 4, 100000)
+    values = sample_from_cumulative_distributions(cumulative_distributions(distributions), rows, rng.random(rows.size))
+    for row, distribution in enumerate(distributions):
+        frequencies = np.bincount(values[rows == row], minlength=4) / (rows == row).sum()
+        assert np.allclose(frequencies, distribution, atol=0.02)
+        assert (frequencies[distribution == 0] == 0).all()
+
+
+def test_generate_random_strings():
+    lengths = np.array([0, 3, 1, 10, 0, 7])
+    strings = generate_random_strings(lengths, np.random.default_rng(0))
+    assert strings.str.len().tolist() == lengths.tolist()
+    assert strings.str.fullmatch('[a-z]*').all()
+    assert strings.dtype == 'string'
+    assert generate_random_strings([], np.random.default_rng(0)).empty
+
+
+def test_distinct_values():
+    rng = np.random.default_rng(0)
+    keys = Series(rng.choice(10 ** 12, 100000, replace=False))
+    sketch = HyperLogLog()
+    sketch.update(keys[:50000])
+    other = HyperLogLog()
+    other.update(keys[50000:])
+    sketch.merge(other)
+    assert abs(sketch.estimate() - keys.size) < 3 * sketch.standard_error * keys.size
+    assert sketch.is_likely_unique(keys.size)
+
+    assert is_unique(keys, block_size=1000)
+    assert not is_unique(keys % 90000, block_size=1000)
+    assert not is_unique(Series(['a'] * 10 + ['b']))
+    assert is_unique(Series(['a', None]))
+
+    values = Series(rng.integers(0, 30, 10000)).where(rng.random(10000) > 0.1)
+    assert count_distinct_values(values) == 30
+    assert count_distinct_values(values, limit=20, block_size=100) == 21
+
+
+def test_encode_memory_mapped_columns_without_copy(tmp_path):
+    rng = np.random.default_rng(0)
+    encoded = np.lib.format.open_memmap(tmp_path / 'encoded.npy', mode='w+', dtype=np.uint8, shape=(3, 1000))
+    encoded[:] = rng.integers(0, [[4], [7], [2]], (3, 1000))
+    encoded.flush()
+    mapped = np.load(tmp_path / 'encoded.npy', mmap_mode='r')
+    dataset = DataFrame(mapped.T, columns=['a', 'b', 'c'], copy=False)
+
+    codes, cardinalities = encode_columns_into_integer_codes(dataset)
+    assert np.shares_memory(codes, mapped)
+    assert cardinalities == [4, 7, 2]
+    assert memory_mapped_file(codes) == (tmp_path / 'encoded.npy', mapped.offset)
+
+    copied_codes, copied_cardinalities = encode_columns_into_integer_codes(dataset.astype(np.int64))
+    assert np.array_equal(copied_codes, codes) and copied_cardinalities == cardinalities
+    assert memory_mapped_file(copied_codes) is None